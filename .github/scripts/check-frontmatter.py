@@ -6,24 +6,179 @@ the block must be terminated by a closing '---' and must parse as YAML. an
 unterminated block fails - the loader never sees the metadata, so a truncated
 skill or agent header would otherwise ship unnoticed.
 
-files that do not open with '---' have no frontmatter and are skipped.
+files that do not open with '---' have no frontmatter and are skipped, except
+where a schema requires keys.
+
+plugin documents are also checked against a per-type schema, selected by path:
+skills/<name>/SKILL.md, agents/*.md and commands/*.md. a schema lists required
+keys, the type of every known key, and rejects unknown keys, so a header the
+plugin loader would drop at session start fails here instead. skill names are
+indexed during the walk and a name used by more than one SKILL.md fails too;
+that cross-file check needs the whole tree, so --staged and --watch skip it.
+
+only the head of each file is read: the first line, and when it opens a block,
+everything up to the closing '---'. large generated references cost one line.
+trees with at least PARALLEL_MIN_FILES markdown files are checked on a process
+pool; failures are always reported sorted by path.
+
+results are cached in <root>/.cache/check-frontmatter.json, keyed by path, size,
+mtime and a digest of the frontmatter head. a file whose size and mtime match is
+not read at all; one whose head digest matches is read but not parsed. the cache
+is dropped whole when this script or the yaml loader changes.
+
+--staged and --since check the git index instead of the working tree: one
+`git diff --cached --raw` lists the changed markdown blobs and a single
+`git cat-file --batch` process streams their staged content, so a pre-commit
+hook costs time proportional to the change and sees exactly what will commit.
+
+--watch runs the full check once, then revalidates only the markdown files that
+are created, written, moved or deleted, printing each pass/fail transition as it
+happens. linux uses inotify through libc (one watch per directory); elsewhere,
+or when inotify is unavailable, the tree is re-stat'ed every half second.
 
 usage:
-    check-frontmatter.py [root]     validate tree (default: current directory)
-    check-frontmatter.py --test     run unit tests
+    check-frontmatter.py [root]             validate tree (default: current directory)
+    check-frontmatter.py --staged [root]    validate markdown staged in root's git repo
+    check-frontmatter.py --since REF [root] validate markdown the index changes relative to REF
+    check-frontmatter.py --jobs N [root]    worker processes (default: CPU count)
+    check-frontmatter.py --no-cache [root]  ignore and do not write the result cache
+    check-frontmatter.py --watch [root]     check, then revalidate files as they change
+    check-frontmatter.py --test             run unit tests
 """
 
+import hashlib
+import json
 import os
+import re
 import sys
+import time
+from collections.abc import Callable
 from pathlib import Path
 
 import yaml
 
+# libyaml's loader when pyyaml was built with it; same safe subset, parsed in C
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# below this many files a process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 256
+
+CACHE_FILE = os.path.join(".cache", "check-frontmatter.json")
+# a file written in the same mtime tick as a run that cached it would still match by stat,
+# so entries this close to the run start are stored without a stat key and re-hashed next run
+RACY_WINDOW_NS = 2_000_000_000
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+
+# frontmatter schemas by document type. each key maps to the accepted value types;
+# a list type means a list of strings. keys not listed are rejected.
+TOOLS = (str, list)
+SCHEMAS = {
+    "skill": {
+        "required": ("name", "description"),
+        "keys": {
+            "name": str, "description": str, "allowed-tools": TOOLS, "argument-hint": str,
+            "model": str, "disable-model-invocation": bool, "user-invocable": bool, "license": str,
+            "metadata": dict, "version": str, "when_to_use": str, "context": str, "agent": str,
+            "hooks": dict, "effort": str, "paths": TOOLS,
+        },
+    },
+    "agent": {
+        "required": ("name", "description"),
+        "keys": {
+            "name": str, "description": str, "tools": TOOLS, "disallowedTools": TOOLS, "model": str,
+            "color": str, "permissionMode": str, "skills": TOOLS, "hooks": dict, "mcpServers": (dict, list),
+            "memory": str, "maxTurns": int, "background": bool, "isolation": str, "effort": str,
+            "initialPrompt": str,
+        },
+    },
+    "command": {
+        "required": (),
+        "keys": {
+            "description": str, "argument-hint": str, "allowed-tools": TOOLS, "model": str,
+            "disable-model-invocation": bool,
+        },
+    },
+}
+# path patterns selecting a schema, matched against the '/'-separated path
+DOC_KINDS = (
+    ("skill", r"(?:^|/)skills/[^/]+/SKILL\.md$"),
+    ("agent", r"(?:^|/)agents/[^/]+\.md$"),
+    ("command", r"(?:^|/)commands/[^/]+\.md$"),
+)
+# lowercase words joined by single hyphens, as plugin skill and agent names are written
+NAME_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+def compile_schemas() -> tuple[re.Pattern, dict[str, tuple[tuple[str, ...], dict[str, tuple[type, ...]]]]]:
+    """fold the path patterns into one regex with a named group per kind, and normalize key types to tuples."""
+    pattern = re.compile("|".join(f"(?P<{kind}>{regex})" for kind, regex in DOC_KINDS))
+    compiled = {}
+    for kind, schema in SCHEMAS.items():
+        types = schema["keys"]
+        compiled[kind] = (schema["required"], {k: t if isinstance(t, tuple) else (t,) for k, t in types.items()})
+    return pattern, compiled
+
+
+DOC_KIND_RE, COMPILED_SCHEMAS = compile_schemas()
+
+
+def doc_kind(path: str) -> str | None:
+    """schema name for a path, or None for markdown with no schema."""
+    match = DOC_KIND_RE.search(path.replace(os.sep, "/"))
+    return match.lastgroup if match else None
+
+
+def validate_schema(kind: str, data: object) -> str | None:
+    """check parsed frontmatter against a compiled schema. returns every violation joined, or None."""
+    required, types = COMPILED_SCHEMAS[kind]
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        return f"{kind} frontmatter must be a mapping, got {type(data).__name__}"
+
+    problems = [f"missing required key '{key}'" for key in required if key not in data]
+    for key, value in data.items():
+        accepted = types.get(key)
+        if accepted is None:
+            problems.append(f"unknown key '{key}'")
+        elif (isinstance(value, bool) and bool not in accepted) or not isinstance(value, accepted):
+            # bool is an int subclass, so 'maxTurns: true' has to be rejected explicitly
+            names = " or ".join("list of str" if t is list else t.__name__ for t in accepted)
+            problems.append(f"'{key}' must be {names}, got {type(value).__name__}")
+        elif isinstance(value, list) and not all(isinstance(v, str) for v in value):
+            problems.append(f"'{key}' must be a list of str")
+        elif isinstance(value, str) and key in required and not value.strip():
+            problems.append(f"'{key}' is empty")
+    name = data.get("name")
+    if kind in ("skill", "agent") and isinstance(name, str) and name.strip() and not NAME_RE.match(name):
+        problems.append(f"'name' must be lowercase words joined by hyphens, got '{name}'")
+    if problems:
+        return f"{kind} frontmatter: " + "; ".join(problems)
+    return None
+
 
-def check_content(content: str) -> str | None:
+def check_content(content: str, kind: str | None = None) -> str | None:
     """validate frontmatter of a markdown document. returns error text or None when valid."""
+    return inspect_content(content, kind)[0]
+
+
+def inspect_content(content: str, kind: str | None = None) -> tuple[str | None, object]:
+    """validate frontmatter, against the kind's schema when given. returns (error, parsed frontmatter)."""
     if not content.startswith("---\n"):
-        return None
+        if kind and COMPILED_SCHEMAS[kind][0]:
+            return f"{kind} has no frontmatter; required: {', '.join(COMPILED_SCHEMAS[kind][0])}", None
+        return None, None
 
     # closing delimiter starts at index 3 so an empty block ('---\n---\n') is accepted
     end = content.find("\n---\n", 3)
@@ -35,42 +190,454 @@ def check_content(content: str) -> str | None:
             return (
                 "unterminated frontmatter: no closing '---'. "
                 "if the document deliberately opens with a horizontal rule, write it as '***'"
-            )
+            ), None
 
     try:
-        yaml.safe_load(content[4:end])
+        data = yaml.load(content[4:end], Loader=SafeLoader)
     except yaml.YAMLError as e:
-        return str(e)
-    return None
+        return str(e), None
+    return (validate_schema(kind, data) if kind else None), data
 
 
-def check_tree(root: str = ".") -> list[tuple[str, str]]:
-    """walk root and validate every markdown file. returns (path, error) pairs."""
-    failures = []
+def read_head(path: str) -> str:
+    """read a markdown file up to and including its closing frontmatter delimiter.
+    a file that does not open with '---' yields its first line only; an unterminated
+    block yields the whole file, which check_content reports as unterminated."""
+    with open(path) as f:
+        first = f.readline()
+        if first != "---\n":
+            return first
+        lines = [first]
+        for line in f:
+            lines.append(line)
+            if line in ("---\n", "---"):
+                break
+        return "".join(lines)
+
+
+def skill_name(path: str, data: object) -> str:
+    """name a skill registers under: its frontmatter name, else its directory."""
+    if isinstance(data, dict) and isinstance(data.get("name"), str):
+        return data["name"]
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def inspect_head(path: str, head: str) -> tuple[str | None, str | None]:
+    """validate a file head against its path's schema. returns (error, skill name for SKILL.md files)."""
+    kind = doc_kind(path)
+    error, data = inspect_content(head, kind)
+    return error, skill_name(path, data) if kind == "skill" else None
+
+
+def check_file(path: str) -> str | None:
+    """validate the frontmatter of one markdown file. returns error text or None when valid."""
+    return inspect_head(path, read_head(path))[0]
+
+
+def inspect_file(path: str) -> tuple[str | None, str | None]:
+    """validate one markdown file. returns (error, skill name for SKILL.md files)."""
+    return inspect_head(path, read_head(path))
+
+
+def scan_file(path: str, cached: tuple[str, str | None, str | None] | None = None) -> tuple[str, str | None, str | None, bool]:
+    """read one file's head and validate it. returns (head digest, error, skill name, parsed).
+    cached is a previous (digest, error, skill name) for the path; a matching digest reuses it unparsed."""
+    head = read_head(path)
+    digest = hashlib.sha256(head.encode()).hexdigest()
+    if cached and cached[0] == digest:
+        return digest, cached[1], cached[2], False
+    return digest, *inspect_head(path, head), True
+
+
+def find_markdown(root: str) -> list[str]:
+    """markdown files under root, skipping .git, in walk order."""
+    paths = []
     for dirpath, dirnames, filenames in os.walk(root):
         dirnames[:] = sorted(d for d in dirnames if d != ".git")
-        for name in sorted(filenames):
-            if not name.endswith(".md"):
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith(".md"))
+    return paths
+
+
+def map_files(func: Callable[..., object], jobs: int, paths: list[str], *extra: list) -> list:
+    """func over paths (zipped with extra argument lists), on a process pool for large batches."""
+    if jobs > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # several chunks per worker keeps them busy when a few files are slow to parse
+        chunksize = max(1, len(paths) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(func, paths, *extra, chunksize=chunksize))
+    return list(map(func, paths, *extra))
+
+
+def checker_version() -> str:
+    """identity of this checker: its own source plus the yaml loader in use."""
+    with open(__file__, "rb") as f:
+        source = f.read()
+    return hashlib.sha256(source + f"\0{yaml.__version__}\0{SafeLoader.__name__}".encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    """per-file check results persisted under <root>/.cache between runs."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.path = os.path.join(root, CACHE_FILE)
+        self.version = checker_version()
+        self.started_ns = time.time_ns()
+        self.entries: dict[str, dict] = {}
+        self.from_stat = 0
+        self.from_digest = 0
+        self.parsed = 0
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data["version"] == self.version:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def check(self, paths: list[str], jobs: int) -> list[tuple[str | None, str | None]]:
+        """validate paths, serving unchanged files from the cache. returns (error, skill name) in path order."""
+        results: list[tuple[str | None, str | None]] = [(None, None)] * len(paths)
+        fresh: dict[str, dict] = {}
+        todo = []
+        for i, path in enumerate(paths):
+            st = os.stat(path)
+            key = os.path.relpath(path, self.root)
+            entry = self.entries.get(key)
+            if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+                results[i] = (entry["error"], entry["name"])
+                fresh[key] = entry
+                self.from_stat += 1
                 continue
-            path = os.path.join(dirpath, name)
-            error = check_content(Path(path).read_text())
+            todo.append((i, key, st, path, (entry["digest"], entry["error"], entry["name"]) if entry else None))
+
+        scanned = map_files(scan_file, jobs, [t[3] for t in todo], [t[4] for t in todo])
+        for (i, key, st, _, _), (digest, error, name, parsed) in zip(todo, scanned):
+            results[i] = (error, name)
+            racy = st.st_mtime_ns >= self.started_ns - RACY_WINDOW_NS
+            fresh[key] = {
+                "size": st.st_size, "mtime": None if racy else st.st_mtime_ns,
+                "digest": digest, "error": error, "name": name,
+            }
+            if parsed:
+                self.parsed += 1
+            else:
+                self.from_digest += 1
+        # rebuilt from this walk, so deleted files drop out
+        self.entries = fresh
+        return results
+
+    def save(self) -> None:
+        """write the cache through a temp file and rename. best-effort: a read-only tree just stays uncached."""
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"version": self.version, "entries": self.entries}, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def stats(self) -> str:
+        """one-line summary of how the last check was served."""
+        total = self.from_stat + self.from_digest + self.parsed
+        return (
+            f"{total} files: {self.parsed} checked, {self.from_stat + self.from_digest} served from cache "
+            f"({self.from_digest} re-read with unchanged frontmatter)"
+        )
+
+
+def staged_markdown(root: str, since: str | None = None) -> list[tuple[str, str]]:
+    """(path, blob id) of markdown files added or modified in the index, against HEAD or since.
+    paths are relative to the repository top. raises RuntimeError when git fails."""
+    import subprocess
+
+    # renames are listed as additions so each record has one path; symlinks and submodules are skipped
+    cmd = ["git", "-C", root, "diff", "--cached", "--raw", "-z", "--no-renames", "--diff-filter=AMT"]
+    cmd += [since, "--"] if since else ["--"]
+    result = subprocess.run(cmd + ["*.md"], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip() or "git diff failed")
+
+    fields = result.stdout.split(b"\0")
+    blobs = []
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        _, dst_mode, _, dst_blob, _ = meta.decode().split(" ")
+        if dst_mode in ("100644", "100755"):
+            blobs.append((path.decode(errors="surrogateescape"), dst_blob))
+    return blobs
+
+
+def check_blobs(root: str, blobs: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """validate blob contents streamed from one `git cat-file --batch`. returns (path, error) pairs sorted by path."""
+    import subprocess
+
+    if not blobs:
+        return []
+    failures = []
+    proc = subprocess.Popen(["git", "-C", root, "cat-file", "--batch"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        # one request, one reply: the pipe never holds more than a single blob
+        for path, blob in blobs:
+            proc.stdin.write(blob.encode() + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) != 3:
+                raise RuntimeError(f"git cat-file: unexpected reply for {path}: {b' '.join(header).decode()}")
+            data = proc.stdout.read(int(header[2]) + 1)[:-1]
+            # same newline translation open() applies on the working tree route
+            content = data.decode().replace("\r\n", "\n").replace("\r", "\n")
+            error = check_content(content, doc_kind(path))
             if error:
                 failures.append((path, error))
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return sorted(failures)
+
+
+def duplicate_skills(paths: list[str], names: list[str | None]) -> list[tuple[str, str]]:
+    """(path, error) for every SKILL.md whose skill name another SKILL.md also uses."""
+    index: dict[str, list[str]] = {}
+    for path, name in zip(paths, names):
+        if name is not None:
+            index.setdefault(name, []).append(path)
+    failures = []
+    for name, owners in index.items():
+        for path in owners if len(owners) > 1 else ():
+            others = ", ".join(p for p in owners if p != path)
+            failures.append((path, f"duplicate skill name '{name}', also used by {others}"))
     return failures
 
 
+def check_tree(root: str = ".", jobs: int | None = None, cache: ResultCache | None = None) -> list[tuple[str, str]]:
+    """walk root and validate every markdown file. returns (path, error) pairs sorted by path."""
+    paths = find_markdown(root)
+    jobs = jobs or os.cpu_count() or 1
+    results = cache.check(paths, jobs) if cache else map_files(inspect_file, jobs, paths)
+    failures = [(path, error) for path, (error, _) in zip(paths, results) if error]
+    failures += duplicate_skills(paths, [name for _, name in results])
+    return sorted(failures)
+
+
+class PollingWatcher:
+    """portable change source: re-stats every markdown file on each poll."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for path in find_markdown(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout: float) -> set[str]:
+        """wait timeout seconds, then return markdown paths created, changed or removed since the last poll."""
+        time.sleep(timeout)
+        current = self.scan()
+        changed = {p for p in current.keys() | self.snapshot.keys() if current.get(p) != self.snapshot.get(p)}
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """linux change source: an inotify watch on every directory, added as directories appear.
+    a directory moved away is reported as its path plus a trailing separator."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, root: str) -> None:
+        import ctypes
+        import ctypes.util
+
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, str] = {}
+        self.add_tree(root)
+
+    def add_tree(self, top: str) -> set[str]:
+        """watch top and every directory below it. returns the markdown files already there."""
+        found = set()
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d != ".git"]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self.dirs[wd] = dirpath
+            found.update(os.path.join(dirpath, name) for name in filenames if name.endswith(".md"))
+        return found
+
+    def drop_tree(self, top: str) -> None:
+        """stop watching top and everything below it; their watches would report stale paths."""
+        prefix = top + os.sep
+        for wd, path in list(self.dirs.items()):
+            if path == top or path.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.dirs[wd]
+
+    def poll(self, timeout: float) -> set[str]:
+        """wait up to timeout seconds for events. returns markdown paths created, written, moved or removed."""
+        import select
+        import struct
+
+        changed: set[str] = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            buf = os.read(self.fd, 65536)
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = struct.unpack_from("iIII", buf, offset)
+                name = buf[offset + 16:offset + 16 + length].rstrip(b"\0")
+                offset += 16 + length
+                if mask & IN_Q_OVERFLOW:
+                    # events were dropped; recheck everything on disk
+                    changed.update(find_markdown(self.root))
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, os.fsdecode(name))
+                if not mask & IN_ISDIR:
+                    if path.endswith(".md"):
+                        changed.add(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO) and name != b".git":
+                    changed.update(self.add_tree(path))
+                elif mask & IN_MOVED_FROM:
+                    self.drop_tree(path)
+                    changed.add(path + os.sep)
+            # an editor save is a short burst of events; collect the rest of it
+            ready, _, _ = select.select([self.fd], [], [], 0.02)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(root: str) -> InotifyWatcher | PollingWatcher:
+    """inotify on linux when libc provides it, polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root)
+
+
+def recheck(failures: dict[str, str], changed: set[str]) -> list[str]:
+    """revalidate changed paths, updating failures in place. returns report lines for each transition.
+    a path ending in a separator stands for a directory that went away and everything under it."""
+    paths = set()
+    for path in changed:
+        if path.endswith(os.sep):
+            paths.update(p for p in failures if p.startswith(path))
+        else:
+            paths.add(path)
+
+    lines = []
+    for path in sorted(paths):
+        if not os.path.isfile(path):
+            if failures.pop(path, None) is not None:
+                lines.append(f"GONE: {path}")
+            continue
+        try:
+            error = check_file(path)
+        except (OSError, ValueError) as e:
+            # caught mid-write or not utf-8; the next save revalidates it
+            error = str(e)
+        if error:
+            if failures.get(path) != error:
+                lines += [f"FAIL: {path}", f"  {error}"]
+            failures[path] = error
+        elif failures.pop(path, None) is not None:
+            lines.append(f"PASS: {path}")
+    return lines
+
+
+def run_watch(root: str, jobs: int | None, cache: ResultCache | None) -> int:
+    """full check, then revalidate changed files until interrupted."""
+    failures = dict(check_tree(root, jobs, cache))
+    if cache:
+        cache.save()
+    for path, error in sorted(failures.items()):
+        print(f"FAIL: {path}")
+        print(f"  {error}")
+
+    watcher = make_watcher(root)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"watching {root} ({kind}): {len(failures)} failing, ctrl-c to stop", flush=True)
+    try:
+        while True:
+            lines = recheck(failures, watcher.poll(0.5))
+            if lines:
+                stamp = time.strftime("%H:%M:%S")
+                print("\n".join(lines))
+                print(f"[{stamp}] {len(failures)} failing", flush=True)
+    except KeyboardInterrupt:
+        return 1 if failures else 0
+    finally:
+        watcher.close()
+
+
 def main(argv: list[str]) -> int:
-    if argv and argv[0] == "--test":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="validate YAML frontmatter in markdown files")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    parser.add_argument("--jobs", "-j", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help=f"ignore and do not write <root>/{CACHE_FILE}")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--staged", action="store_true", help="check markdown staged in the git index")
+    mode.add_argument("--since", metavar="REF", help="check markdown the index changes relative to REF")
+    mode.add_argument("--watch", action="store_true", help="check, then revalidate files as they change")
+    parser.add_argument("root", nargs="?", default=".", help="directory to validate")
+    args = parser.parse_args(argv)
+
+    if args.test:
         run_tests()
         return 0
 
-    failures = check_tree(argv[0] if argv else ".")
+    if args.watch:
+        return run_watch(args.root, args.jobs, None if args.no_cache else ResultCache(args.root))
+
+    if args.staged or args.since:
+        try:
+            blobs = staged_markdown(args.root, args.since)
+            failures = check_blobs(args.root, blobs)
+        except RuntimeError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        print(f"{len(blobs)} markdown files changed in the index")
+    else:
+        cache = None if args.no_cache else ResultCache(args.root)
+        failures = check_tree(args.root, args.jobs, cache)
+        if cache:
+            cache.save()
+            print(cache.stats())
     for path, error in failures:
         print(f"FAIL: {path}")
         print(f"  {error}")
     if failures:
         return 1
-    print("all markdown frontmatter is valid YAML")
+    print("all markdown frontmatter is valid")
     return 0
 
 
@@ -111,6 +678,83 @@ def run_tests() -> None:
         def test_tab_indent_is_invalid_yaml(self) -> None:
             self.assertIsNotNone(check_content("---\nname: thing\n\tbad: indent\n---\n"))
 
+    class TestSchemas(unittest.TestCase):
+        def test_doc_kind_by_path(self) -> None:
+            self.assertEqual(doc_kind("plugins/p/skills/s/SKILL.md"), "skill")
+            self.assertEqual(doc_kind("./plugins/p/agents/a.md"), "agent")
+            self.assertEqual(doc_kind("commands/c.md"), "command")
+            self.assertIsNone(doc_kind("plugins/p/skills/s/references/guide.md"))
+            self.assertIsNone(doc_kind("plugins/p/agents/nested/a.md"))
+            self.assertIsNone(doc_kind("README.md"))
+
+        def test_valid_documents(self) -> None:
+            skill = "---\nname: my-skill\ndescription: does it\nallowed-tools: Bash, Read\n---\n"
+            agent = "---\nname: reviewer\ndescription: reviews\ntools: [Read, Grep]\nmaxTurns: 5\n---\n"
+            command = "---\ndescription: run it\nargument-hint: <file>\n---\n"
+            self.assertIsNone(check_content(skill, "skill"))
+            self.assertIsNone(check_content(agent, "agent"))
+            self.assertIsNone(check_content(command, "command"))
+
+        def test_missing_required(self) -> None:
+            error = check_content("---\nname: my-skill\n---\n", "skill")
+            self.assertIn("missing required key 'description'", error)
+
+        def test_missing_frontmatter(self) -> None:
+            self.assertIn("no frontmatter", check_content("# Skill\n", "skill"))
+            self.assertIsNone(check_content("# Command\n", "command"))
+
+        def test_unknown_key(self) -> None:
+            error = check_content("---\ndescription: x\nallowed_tools: Bash\n---\n", "command")
+            self.assertIn("unknown key 'allowed_tools'", error)
+
+        def test_wrong_types(self) -> None:
+            error = check_content("---\nname: a\ndescription: [x]\nmaxTurns: true\ntools: [1]\n---\n", "agent")
+            self.assertIn("'description' must be str, got list", error)
+            self.assertIn("'maxTurns' must be int, got bool", error)
+            self.assertIn("'tools' must be a list of str", error)
+
+        def test_name_format_and_empty_description(self) -> None:
+            error = check_content("---\nname: My Skill\ndescription: ' '\n---\n", "skill")
+            self.assertIn("lowercase words joined by hyphens", error)
+            self.assertIn("'description' is empty", error)
+
+        def test_frontmatter_must_be_mapping(self) -> None:
+            self.assertIn("must be a mapping", check_content("---\n- a\n---\n", "agent"))
+
+        def test_yaml_only_without_kind(self) -> None:
+            self.assertIsNone(check_content("---\nanything: goes\n---\n"))
+
+    class TestReadHead(unittest.TestCase):
+        def head(self, content: str) -> str:
+            with tempfile.TemporaryDirectory() as root:
+                path = Path(root) / "doc.md"
+                path.write_text(content)
+                return read_head(str(path))
+
+        def test_stops_at_closing_delimiter(self) -> None:
+            self.assertEqual(self.head("---\nname: x\n---\n\nbody\n---\nmore\n"), "---\nname: x\n---\n")
+
+        def test_no_frontmatter_reads_first_line(self) -> None:
+            self.assertEqual(self.head("# Title\n" + "body\n" * 1000), "# Title\n")
+
+        def test_unterminated_reads_whole_file(self) -> None:
+            content = "---\nname: x\n\nbody\n"
+            self.assertEqual(self.head(content), content)
+
+        def test_closing_delimiter_at_eof(self) -> None:
+            self.assertEqual(self.head("---\nname: x\n---"), "---\nname: x\n---")
+
+        def test_head_matches_full_content_check(self) -> None:
+            for content in ["---\n---\nbody\n", "---\nname: [x\n---\n", "---\nname: x\n", "text\n---\n"]:
+                with self.subTest(content=content):
+                    self.assertEqual(check_content(self.head(content)), check_content(content))
+
+        def test_body_past_head_is_not_decoded(self) -> None:
+            with tempfile.TemporaryDirectory() as root:
+                path = Path(root) / "doc.md"
+                path.write_bytes(b"---\nname: x\n---\n" + b"a" * 65536 + b"\xff\xfe\n")
+                self.assertIsNone(check_file(str(path)))
+
     class TestCheckTree(unittest.TestCase):
         def write(self, root: str, rel: str, content: str) -> None:
             path = Path(root) / rel
@@ -142,9 +786,290 @@ def run_tests() -> None:
                 self.write(root, "broken.txt", "---\nname: broken\n\nbody\n")
                 self.assertEqual(check_tree(root), [])
 
+        def test_schema_checked_in_walk(self) -> None:
+            with tempfile.TemporaryDirectory() as root:
+                self.write(root, "plugins/p/agents/a.md", "---\nname: a\n---\n")
+                self.write(root, "docs/a.md", "---\nname: a\n---\n")
+                failures = check_tree(root, jobs=1)
+                self.assertEqual(len(failures), 1)
+                self.assertIn("missing required key 'description'", failures[0][1])
+
+        def test_duplicate_skill_names(self) -> None:
+            with tempfile.TemporaryDirectory() as root:
+                self.write(root, "plugins/a/skills/x/SKILL.md", "---\nname: shared\ndescription: a\n---\n")
+                self.write(root, "plugins/b/skills/y/SKILL.md", "---\nname: shared\ndescription: b\n---\n")
+                self.write(root, "plugins/c/skills/shared/SKILL.md", "---\ndescription: c\nname: other\n---\n")
+                failures = check_tree(root, jobs=1)
+                self.assertEqual(len(failures), 2)
+                self.assertTrue(all("duplicate skill name 'shared'" in e for _, e in failures))
+                # the index is rebuilt from cached names on an unchanged rerun
+                cache = ResultCache(root)
+                check_tree(root, jobs=1, cache=cache)
+                cache.save()
+                cache = ResultCache(root)
+                self.assertEqual(check_tree(root, jobs=1, cache=cache), failures)
+
+        def test_failures_sorted_by_path(self) -> None:
+            # the walk visits a directory's files before its subdirectories
+            with tempfile.TemporaryDirectory() as root:
+                self.write(root, "b/z.md", "---\nname: broken\n")
+                self.write(root, "b/a/y.md", "---\nname: broken\n")
+                self.write(root, "a.md", "---\nname: broken\n")
+                paths = [os.path.relpath(p, root) for p, _ in check_tree(root)]
+                self.assertEqual(paths, sorted(paths))
+
+        def test_process_pool_matches_serial(self) -> None:
+            global PARALLEL_MIN_FILES
+            with tempfile.TemporaryDirectory() as root:
+                for i in range(40):
+                    self.write(root, f"d{i % 4}/good{i}.md", f"---\nname: good{i}\n---\n")
+                    if i % 7 == 0:
+                        self.write(root, f"d{i % 4}/bad{i}.md", "---\nname: [x\n---\n")
+                serial = check_tree(root, jobs=1)
+                old_min = PARALLEL_MIN_FILES
+                PARALLEL_MIN_FILES = 1
+                try:
+                    parallel = check_tree(root, jobs=2)
+                finally:
+                    PARALLEL_MIN_FILES = old_min
+                self.assertEqual(len(serial), 6)
+                self.assertEqual(parallel, serial)
+
+    class TestResultCache(unittest.TestCase):
+        def setUp(self) -> None:
+            self._dir = tempfile.TemporaryDirectory()
+            self.root = self._dir.name
+
+        def tearDown(self) -> None:
+            self._dir.cleanup()
+
+        def write(self, rel: str, content: str, age: float = 3600) -> str:
+            # files default to an hour old so they fall outside the racy window
+            path = Path(self.root) / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            stamp = time.time() - age
+            os.utime(path, (stamp, stamp))
+            return str(path)
+
+        def run_cached(self) -> tuple[list[tuple[str, str]], ResultCache]:
+            cache = ResultCache(self.root)
+            failures = check_tree(self.root, jobs=1, cache=cache)
+            cache.save()
+            return failures, cache
+
+        def test_unchanged_tree_served_by_stat(self) -> None:
+            self.write("good.md", "---\nname: good\n---\n")
+            self.write("bad.md", "---\nname: [x\n---\n")
+            first, cache = self.run_cached()
+            self.assertEqual(cache.parsed, 2)
+            second, cache = self.run_cached()
+            self.assertEqual((cache.from_stat, cache.from_digest, cache.parsed), (2, 0, 0))
+            self.assertEqual(second, first)
+            self.assertEqual(len(second), 1)
+
+        def test_body_edit_reuses_frontmatter_result(self) -> None:
+            self.write("doc.md", "---\nname: doc\n---\nbody\n")
+            self.run_cached()
+            self.write("doc.md", "---\nname: doc\n---\nlonger body\n", age=1800)
+            _, cache = self.run_cached()
+            self.assertEqual((cache.from_stat, cache.from_digest, cache.parsed), (0, 1, 0))
+
+        def test_frontmatter_edit_is_rechecked(self) -> None:
+            self.write("doc.md", "---\nname: doc\n---\n")
+            self.run_cached()
+            self.write("doc.md", "---\nname: [doc\n---\n", age=1800)
+            failures, cache = self.run_cached()
+            self.assertEqual(cache.parsed, 1)
+            self.assertEqual(len(failures), 1)
+
+        def test_checker_version_change_drops_cache(self) -> None:
+            self.write("doc.md", "---\nname: doc\n---\n")
+            _, cache = self.run_cached()
+            data = json.loads(Path(cache.path).read_text())
+            data["version"] = "older"
+            Path(cache.path).write_text(json.dumps(data))
+            _, cache = self.run_cached()
+            self.assertEqual(cache.parsed, 1)
+
+        def test_recent_file_is_not_trusted_by_stat(self) -> None:
+            self.write("doc.md", "---\nname: doc\n---\n", age=0)
+            self.run_cached()
+            _, cache = self.run_cached()
+            self.assertEqual((cache.from_stat, cache.from_digest), (0, 1))
+
+        def test_deleted_file_dropped(self) -> None:
+            path = self.write("doc.md", "---\nname: doc\n---\n")
+            self.write("keep.md", "---\nname: keep\n---\n")
+            self.run_cached()
+            os.unlink(path)
+            _, cache = self.run_cached()
+            self.assertEqual(list(cache.entries), ["keep.md"])
+
+        def test_corrupt_cache_ignored(self) -> None:
+            self.write("doc.md", "---\nname: [doc\n---\n")
+            os.makedirs(os.path.join(self.root, ".cache"))
+            Path(self.root, CACHE_FILE).write_text("{not json")
+            failures, cache = self.run_cached()
+            self.assertEqual((cache.parsed, len(failures)), (1, 1))
+
+    class TestStaged(unittest.TestCase):
+        def setUp(self) -> None:
+            import subprocess
+
+            self._dir = tempfile.TemporaryDirectory()
+            self.root = self._dir.name
+            self.run_git = lambda *a: subprocess.run(["git", "-C", self.root, *a], check=True, capture_output=True)
+            self.run_git("init", "-q")
+            self.run_git("config", "user.email", "test@example.com")
+            self.run_git("config", "user.name", "test")
+
+        def tearDown(self) -> None:
+            self._dir.cleanup()
+
+        def write(self, rel: str, content: str) -> None:
+            path = Path(self.root) / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+        def test_checks_staged_content_not_worktree(self) -> None:
+            self.write("docs/doc.md", "---\nname: [broken\n---\n")
+            self.run_git("add", "docs/doc.md")
+            self.write("docs/doc.md", "---\nname: fixed\n---\n")  # unstaged fix
+            failures = check_blobs(self.root, staged_markdown(self.root))
+            self.assertEqual([p for p, _ in failures], ["docs/doc.md"])
+
+        def test_only_changed_markdown_listed(self) -> None:
+            self.write("old.md", "---\nname: [broken\n---\n")
+            self.write("notes.txt", "---\nname: [broken\n")
+            self.run_git("add", ".")
+            self.run_git("commit", "-q", "-m", "init")
+            self.write("new.md", "---\nname: new\n---\n")
+            self.write("other.txt", "x\n")
+            self.run_git("add", ".")
+            self.assertEqual([p for p, _ in staged_markdown(self.root)], ["new.md"])
+            self.assertEqual(check_blobs(self.root, staged_markdown(self.root)), [])
+
+        def test_since_ref(self) -> None:
+            self.write("a.md", "---\nname: a\n---\n")
+            self.run_git("add", ".")
+            self.run_git("commit", "-q", "-m", "one")
+            self.write("b.md", "---\nname: [b\n")
+            self.run_git("add", ".")
+            self.run_git("commit", "-q", "-m", "two")
+            self.assertEqual(staged_markdown(self.root), [])
+            failures = check_blobs(self.root, staged_markdown(self.root, "HEAD~1"))
+            self.assertEqual(len(failures), 1)
+            self.assertIn("unterminated", failures[0][1])
+
+        def test_deleted_and_odd_paths(self) -> None:
+            self.write("gone.md", "---\nname: gone\n---\n")
+            self.run_git("add", ".")
+            self.run_git("commit", "-q", "-m", "init")
+            self.run_git("rm", "-q", "gone.md")
+            self.write("with space\nnewline.md", "---\nname: [x\n---\n")
+            self.run_git("add", ".")
+            failures = check_blobs(self.root, staged_markdown(self.root))
+            self.assertEqual([p for p, _ in failures], ["with space\nnewline.md"])
+
+        def test_bad_ref_raises(self) -> None:
+            with self.assertRaises(RuntimeError):
+                staged_markdown(self.root, "no-such-ref")
+
+    class TestRecheck(unittest.TestCase):
+        def setUp(self) -> None:
+            self._dir = tempfile.TemporaryDirectory()
+            self.root = self._dir.name
+
+        def tearDown(self) -> None:
+            self._dir.cleanup()
+
+        def write(self, rel: str, content: str) -> str:
+            path = Path(self.root) / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            return str(path)
+
+        def test_transitions(self) -> None:
+            failures: dict[str, str] = {}
+            path = self.write("doc.md", "---\nname: [x\n---\n")
+            lines = recheck(failures, {path})
+            self.assertEqual(lines[0], f"FAIL: {path}")
+            self.assertIn(path, failures)
+            # same error again is not a transition
+            self.assertEqual(recheck(failures, {path}), [])
+            self.write("doc.md", "---\nname: x\n---\n")
+            self.assertEqual(recheck(failures, {path}), [f"PASS: {path}"])
+            self.assertEqual(failures, {})
+
+        def test_deleted_failure_reported_gone(self) -> None:
+            path = self.write("doc.md", "---\nname: [x\n---\n")
+            failures = {path: "bad"}
+            os.unlink(path)
+            self.assertEqual(recheck(failures, {path}), [f"GONE: {path}"])
+            self.assertEqual(recheck(failures, {path}), [])
+
+        def test_directory_moved_away(self) -> None:
+            path = self.write("sub/doc.md", "---\nname: [x\n---\n")
+            failures = {path: "bad"}
+            os.rename(os.path.join(self.root, "sub"), os.path.join(self.root, "moved"))
+            lines = recheck(failures, {os.path.join(self.root, "sub") + os.sep})
+            self.assertEqual(lines, [f"GONE: {path}"])
+
+    class TestWatchers(unittest.TestCase):
+        def setUp(self) -> None:
+            self._dir = tempfile.TemporaryDirectory()
+            self.root = self._dir.name
+            Path(self.root, "keep.md").write_text("---\nname: keep\n---\n")
+
+        def tearDown(self) -> None:
+            self._dir.cleanup()
+
+        def exercise(self, watcher: "InotifyWatcher | PollingWatcher") -> None:
+            try:
+                edited = os.path.join(self.root, "keep.md")
+                Path(edited).write_text("---\nname: edited\n---\n")
+                os.utime(edited, (1, 1))  # distinct stat for the polling watcher
+                self.assertIn(edited, watcher.poll(0.5))
+
+                # atomic save: write a temp file, rename over the target
+                nested = os.path.join(self.root, "new", "dir")
+                os.makedirs(nested)
+                target = os.path.join(nested, "doc.md")
+                Path(nested, ".doc.tmp").write_text("---\nname: doc\n---\n")
+                os.rename(os.path.join(nested, ".doc.tmp"), target)
+                changed = watcher.poll(0.5)
+                self.assertIn(target, changed)
+                self.assertFalse(any(p.endswith(".tmp") for p in changed))
+
+                os.unlink(target)
+                self.assertIn(target, watcher.poll(0.5))
+                self.assertEqual(watcher.poll(0.05), set())
+            finally:
+                watcher.close()
+
+        def test_polling_watcher(self) -> None:
+            self.exercise(PollingWatcher(self.root))
+
+        @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is linux-only")
+        def test_inotify_watcher(self) -> None:
+            self.exercise(InotifyWatcher(self.root))
+
+        @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is linux-only")
+        def test_inotify_reports_moved_directory(self) -> None:
+            os.makedirs(os.path.join(self.root, "sub"))
+            watcher = InotifyWatcher(self.root)
+            try:
+                os.rename(os.path.join(self.root, "sub"), os.path.join(self.root, "gone"))
+                changed = watcher.poll(0.5)
+                self.assertIn(os.path.join(self.root, "sub") + os.sep, changed)
+            finally:
+                watcher.close()
+
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    for tc in [TestCheckContent, TestCheckTree]:
+    for tc in [TestCheckContent, TestSchemas, TestReadHead, TestCheckTree, TestResultCache, TestStaged,
+               TestRecheck, TestWatchers]:
         suite.addTests(loader.loadTestsFromTestCase(tc))
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
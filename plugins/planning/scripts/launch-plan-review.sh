@@ -2,6 +2,9 @@
 # launch revdiff for plan file review via terminal overlay.
 # usage: launch-plan-review.sh <plan-file-path>
 # output: annotations from revdiff stdout (empty if no annotations)
+# env PLAN_REVIEW_OUTPUT: caller-owned path for revdiff's --output file. the launcher
+#   never deletes it, so annotations revdiff writes after the caller was killed (hook
+#   timeout, crashed session) survive for the caller to recover on its next run
 # supports: agterm, tmux, zellij, herdr, orca, kitty, wezterm/kaku, cmux, ghostty, iTerm2, emacs vterm
 
 set -euo pipefail
@@ -38,8 +41,17 @@ CWD="$(pwd)"
 # keep sq() local so this launcher stays self-contained when the plugin
 # is installed from the marketplace without the repo's shared helpers.
 sq() { printf "'%s'" "$(printf '%s' "$1" | sed "s/'/'\\\\''/g")"; }
-OUTPUT_FILE=$(mktemp "$TMPBASE/plan-review-output-XXXXXX")
-trap 'rm -f "$OUTPUT_FILE"' EXIT
+# OUTPUT_TMP names the output file only when the launcher owns it; every cleanup trap
+# removes OUTPUT_TMP, so a caller-owned PLAN_REVIEW_OUTPUT is left in place
+if [ -n "${PLAN_REVIEW_OUTPUT:-}" ]; then
+    OUTPUT_FILE="$PLAN_REVIEW_OUTPUT"
+    OUTPUT_TMP=""
+    [ -e "$OUTPUT_FILE" ] || : > "$OUTPUT_FILE"
+else
+    OUTPUT_FILE=$(mktemp "$TMPBASE/plan-review-output-XXXXXX")
+    OUTPUT_TMP="$OUTPUT_FILE"
+fi
+trap 'rm -f "$OUTPUT_TMP"' EXIT
 
 # make plan path absolute for the overlay shell
 PLAN_ABS=$(cd "$(dirname "$PLAN_FILE")" && echo "$(pwd)/$(basename "$PLAN_FILE")")
@@ -74,7 +86,7 @@ if [ -n "${AGTERM_SESSION_ID:-}" ] && command -v agtermctl >/dev/null 2>&1; then
     esac
     AGTERM_OVERLAY+=(--cwd "$CWD" --block)
     agtermctl "${AGTERM_STATUS[@]}" >/dev/null 2>&1 || true
-    trap 'agtermctl session status active "${AGTERM_TARGET[@]}" >/dev/null 2>&1 || true; rm -f "$OUTPUT_FILE"' EXIT
+    trap 'agtermctl session status active "${AGTERM_TARGET[@]}" >/dev/null 2>&1 || true; rm -f "$OUTPUT_TMP"' EXIT
     trap 'exit 130' INT
     trap 'exit 143' TERM
     agtermctl "${AGTERM_OVERLAY[@]}" >/dev/null || true
@@ -103,7 +115,7 @@ if [ -n "${ZELLIJ:-}" ] && command -v zellij >/dev/null 2>&1; then
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch '$SENTINEL'
@@ -131,7 +143,7 @@ if [ "${HERDR_ENV:-}" = "1" ] && command -v herdr >/dev/null 2>&1; then
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch $(sq "$SENTINEL")
@@ -199,7 +211,7 @@ if [ "${TERM_PROGRAM:-}" = "Orca" ] && command -v orca >/dev/null 2>&1; then
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch $(sq "$SENTINEL")
@@ -293,7 +305,7 @@ if [ -n "${CMUX_SURFACE_ID:-}" ] && command -v cmux >/dev/null 2>&1; then
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch $(sq "$SENTINEL")
@@ -329,7 +341,7 @@ if [ "${TERM_PROGRAM:-}" = "ghostty" ] && command -v osascript >/dev/null 2>&1;
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch $(sq "$SENTINEL")
@@ -374,7 +386,7 @@ if [ -n "${ITERM_SESSION_ID:-}" ] && command -v osascript >/dev/null 2>&1; then
     rm -f "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; touch "\$1"
@@ -449,7 +461,7 @@ if [ "${INSIDE_EMACS:-}" = "vterm" ] && command -v emacsclient >/dev/null 2>&1;
     rm -f "$SENTINEL" && mkfifo "$SENTINEL"
 
     LAUNCH_SCRIPT=$(mktemp "$TMPBASE/plan-review-launch-XXXXXX")
-    trap 'rm -f "$OUTPUT_FILE" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
+    trap 'rm -f "$OUTPUT_TMP" "$SENTINEL" "$LAUNCH_SCRIPT"' EXIT
     cat > "$LAUNCH_SCRIPT" <<LAUNCHER
 #!/bin/sh
 $REVDIFF_CMD; echo d > $(sq "$SENTINEL"); exit
@@ -53,21 +53,41 @@ opens a copy of the plan file in $EDITOR. if user makes changes, outputs
 the unified diff to stdout (no JSON wrapping). Claude reads the diff,
 revises the plan file, and calls again - looping until no changes.
 
+batch file mode:
+
+    plan-annotate.py docs/plans/a.md docs/plans/b.md
+    plan-annotate.py 'docs/plans/*.md'
+
+several paths (or quoted glob patterns) open together in one editor session.
+the plans are concatenated into a single file, each section starting with a
+marker line (<!-- plan-annotate: <path> -->) that must be left intact. on
+close the file is split back on those markers and one unified diff per
+changed plan is printed, headed with the plan's path.
+
+startup: hook mode runs on every ExitPlanMode fallback, so module scope imports only os
+and sys. everything heavier (json, difflib, subprocess, tempfile, pathlib, argparse, ...)
+is imported inside the function that needs it, and the fast exits (review disabled, empty
+event) answer before any of it loads. tests/test-planning-hook-startup.sh holds the
+import budget.
+
 usage:
     plan-annotate.py [--test]           # hook mode (stdin JSON)
+    plan-annotate.py --plan-path <file> # hook mode, plan staged on disk by plan-review-hook.py
     plan-annotate.py <plan-file>        # file mode (opens file copy in editor)
+    plan-annotate.py <plan-file|glob>...  # batch file mode (one editor, diff per file)
 """
 
-import difflib
-import json
+from __future__ import annotations
+
 import os
-import shlex
-import shutil
-import subprocess
 import sys
-import tempfile
-import time
-from pathlib import Path
+
+# typing itself imports re, so the checker-only flag is spelled out instead of imported
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
+
+BATCH_MARKER = "<!-- plan-annotate: {} -->"
 
 
 def read_plan_from_stdin() -> str:
@@ -75,6 +95,8 @@ def read_plan_from_stdin() -> str:
     raw = sys.stdin.read()
     if not raw.strip():
         return ""
+    import json
+
     try:
         event = json.loads(raw)
         return event.get("tool_input", {}).get("plan", "")
@@ -89,8 +111,22 @@ def review_disabled() -> bool:
     return bool(os.environ.get("PLANNING_DISABLE_REVDIFF"))
 
 
+def is_plain(text: str) -> bool:
+    """report whether text can sit inside a JSON string literal without escaping."""
+    return text.isascii() and text.isprintable() and '"' not in text and "\\" not in text
+
+
 def make_response(decision: str, reason: str = "") -> str:
-    """build PreToolUse hook JSON response."""
+    """build PreToolUse hook JSON response.
+    the fixed reasons on the fast exits need no escaping, so they are laid out by hand in
+    json.dumps(indent=2) form and those exits never import json; a diff goes through json."""
+    if is_plain(decision) and is_plain(reason):
+        fields = ['    "hookEventName": "PreToolUse"', f'    "permissionDecision": "{decision}"']
+        if reason:
+            fields.append(f'    "permissionDecisionReason": "{reason}"')
+        return "{\n  \"hookSpecificOutput\": {\n" + ",\n".join(fields) + "\n  }\n}"
+    import json
+
     resp: dict = {
         "hookSpecificOutput": {
             "hookEventName": "PreToolUse",
@@ -102,11 +138,45 @@ def make_response(decision: str, reason: str = "") -> str:
     return json.dumps(resp, indent=2)
 
 
-def get_diff(original: str, edited: str) -> str:
+def plan_label(plan_content: str) -> str:
+    """short plan identity for review stats: the first markdown heading, else the first non-blank line."""
+    lines = [line.strip() for line in plan_content.splitlines() if line.strip()]
+    heading = next((line for line in lines if line.startswith("#")), lines[0] if lines else "")
+    return heading[:120]
+
+
+def record_review(event: dict) -> None:
+    """hand a finished review round to plan-review-stats.py without waiting for it.
+    the recorder runs detached, so the SQLite write never delays the hook response. no-op
+    when CLAUDE_PLUGIN_DATA is unset or the recorder is not installed next to this script."""
+    import json
+    import subprocess
+    from pathlib import Path
+
+    data_dir = os.environ.get("CLAUDE_PLUGIN_DATA")
+    recorder = Path(__file__).resolve().parent / "plan-review-stats.py"
+    if not data_dir or not recorder.exists():
+        return
+    event = {"project": os.getcwd(), **event}
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, str(recorder), "record", "--db", str(Path(data_dir) / "plan-reviews.db")],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        proc.stdin.write(json.dumps(event).encode())
+        proc.stdin.close()
+    except OSError:
+        pass
+
+
+def get_diff(original: str, edited: str, fromfile: str = "original", tofile: str = "annotated") -> str:
     """get unified diff between original and edited content."""
+    import difflib
+
     orig_lines = original.splitlines(keepends=True)
     edit_lines = edited.splitlines(keepends=True)
-    diff = difflib.unified_diff(orig_lines, edit_lines, fromfile="original", tofile="annotated", n=2)
+    diff = difflib.unified_diff(orig_lines, edit_lines, fromfile=fromfile, tofile=tofile, n=2)
     return "".join(diff)
 
 
@@ -118,6 +188,9 @@ def build_editor_cmd(editor: str) -> str:
     /opt/homebrew/bin etc.), and re-quotes each part. quoting the whole string as one
     token would exec a bogus binary name. falls back to vi on an empty or malformed
     (unbalanced-quote) $EDITOR instead of raising."""
+    import shlex
+    import shutil
+
     try:
         parts = shlex.split(editor) or ["vi"]  # guard set-but-empty $EDITOR
     except ValueError:
@@ -135,6 +208,13 @@ def open_editor(filepath: Path, target_window: bool = True) -> int:
     when target_window is True (hook mode), targets the kitty window from KITTY_WINDOW_ID.
     when False (file mode), opens in the currently focused window. agterm always targets the
     current session via $AGTERM_SESSION_ID, so target_window does not affect it."""
+    import shlex
+    import shutil
+    import subprocess
+    import tempfile
+    import time
+    from pathlib import Path
+
     editor_cmd = build_editor_cmd(os.environ.get("EDITOR", "vi"))
 
     # agterm: `agtermctl session overlay open <cmd> --block` opens the editor in a full-pane
@@ -231,6 +311,10 @@ def open_editor(filepath: Path, target_window: bool = True) -> int:
 
 def run_file_mode(plan_file: Path) -> None:
     """file mode: open plan copy in editor, output diff to stdout."""
+    import tempfile
+    import time
+    from pathlib import Path
+
     if review_disabled():
         return
     if not plan_file.exists():
@@ -245,12 +329,18 @@ def run_file_mode(plan_file: Path) -> None:
         tmp_path = Path(tmp.name)
 
     try:
+        started = time.time()
         if open_editor(tmp_path, target_window=False) != 0:
             print("error: no overlay terminal available (requires agterm, tmux, kitty, or wezterm)", file=sys.stderr)
             sys.exit(1)
 
         edited_content = tmp_path.read_text()
         diff = get_diff(plan_content, edited_content)
+        record_review({
+            "ts": started, "duration": time.time() - started, "plan": str(plan_file), "tool": "editor",
+            "mode": "file", "decision": "deny" if diff else "ask",
+            "plan_bytes": len(plan_content.encode()), "annotation_bytes": len(diff.encode()),
+        })
 
         if diff:
             print(diff)
@@ -258,28 +348,150 @@ def run_file_mode(plan_file: Path) -> None:
         tmp_path.unlink(missing_ok=True)
 
 
-def run_hook_mode() -> None:
-    """hook mode: read plan from stdin JSON, output hook response."""
+def expand_plan_args(args: list[str]) -> list[Path]:
+    """expand plan file arguments into a de-duplicated list of paths.
+    arguments containing glob magic are expanded (with ** support) and sorted; a pattern
+    matching nothing is kept as-is so the missing-file check reports it. plain paths pass through."""
+    import glob
+    from pathlib import Path
+
+    paths: list[Path] = []
+    seen: set[str] = set()
+    for arg in args:
+        matches = sorted(glob.glob(arg, recursive=True)) if glob.has_magic(arg) else []
+        for item in matches or [arg]:
+            key = os.path.normpath(item)
+            if key not in seen:
+                seen.add(key)
+                paths.append(Path(item))
+    return paths
+
+
+def join_plans(plans: list[tuple[str, str]]) -> str:
+    """concatenate (label, content) pairs into one document, each section opened by a marker line.
+    a section without a trailing newline gets one so the next marker stays on its own line."""
+    parts = []
+    for label, content in plans:
+        parts.append(BATCH_MARKER.format(label) + "\n")
+        parts.append(content if not content or content.endswith("\n") else content + "\n")
+    return "".join(parts)
+
+
+def split_plans(document: str, plans: list[tuple[str, str]]) -> list[str]:
+    """split an edited batch document back into per-plan content, in the order of plans.
+    raises ValueError when a marker line was removed, duplicated, or reordered - guessing
+    section boundaries would attribute annotations to the wrong plan."""
+    markers = [BATCH_MARKER.format(label) for label, _ in plans]
+    lines = document.splitlines(keepends=True)
+    found = [i for i, line in enumerate(lines) if line.rstrip("\n") in markers]
+    if [lines[i].rstrip("\n") for i in found] != markers or (found and found[0] != 0):
+        raise ValueError("plan section markers (<!-- plan-annotate: ... -->) were edited, moved, or removed")
+    sections = []
+    for n, (label, original) in enumerate(plans):
+        start = found[n] + 1
+        end = found[n + 1] if n + 1 < len(found) else len(lines)
+        text = "".join(lines[start:end])
+        # undo the newline join_plans added to a section that had none
+        if original and not original.endswith("\n") and text.endswith("\n"):
+            text = text[:-1]
+        sections.append(text)
+    return sections
+
+
+def run_batch_file_mode(plan_files: list[Path]) -> None:
+    """batch file mode: open several plans in one editor session, output one diff per changed file."""
+    import tempfile
+    import time
+    from pathlib import Path
+
+    if review_disabled():
+        return
+    missing = [str(p) for p in plan_files if not p.is_file()]
+    if missing:
+        print(f"error: file not found: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    plans = [(str(p), p.read_text()) for p in plan_files]
+    for label, content in plans:
+        if any(line.startswith("<!-- plan-annotate: ") for line in content.splitlines()):
+            print(f"error: {label} already contains a plan-annotate section marker", file=sys.stderr)
+            sys.exit(1)
+
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".md", prefix="plan-review-batch-", delete=False) as tmp:
+        tmp.write(join_plans(plans))
+        tmp_path = Path(tmp.name)
+
+    try:
+        started = time.time()
+        if open_editor(tmp_path, target_window=False) != 0:
+            print("error: no overlay terminal available (requires agterm, tmux, kitty, or wezterm)", file=sys.stderr)
+            sys.exit(1)
+        duration = time.time() - started
+
+        try:
+            edited = split_plans(tmp_path.read_text(), plans)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        diffs = [get_diff(original, text, fromfile=f"{label} (original)", tofile=f"{label} (annotated)")
+                 for (label, original), text in zip(plans, edited)]
+
+        # one session covers every plan, so each row carries the full session duration
+        for (label, content), diff in zip(plans, diffs):
+            record_review({
+                "ts": started, "duration": duration, "plan": label, "tool": "editor", "mode": "batch",
+                "decision": "deny" if diff else "ask",
+                "plan_bytes": len(content.encode()), "annotation_bytes": len(diff.encode()),
+            })
+
+        for diff in diffs:
+            if diff:
+                print(diff)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def run_hook_mode(plan_path: Path | None = None) -> None:
+    """hook mode: read plan from stdin JSON, output hook response.
+    plan_path is a plan already staged on disk by plan-review-hook.py; it is read instead
+    of stdin so the plan is not re-encoded as JSON and piped through a second process."""
     if review_disabled():
         print(make_response("ask", "plan review disabled via PLANNING_DISABLE_REVDIFF"))
         return
-    plan_content = read_plan_from_stdin()
+    if plan_path is not None:
+        try:
+            plan_content = plan_path.read_text()
+        except OSError:
+            plan_content = ""
+    else:
+        plan_content = read_plan_from_stdin()
     if not plan_content:
         print(make_response("ask", "no plan content in hook event"))
         return
 
+    import tempfile
+    import time
+    from pathlib import Path
+
     # write plan to temp file for editing
     with tempfile.NamedTemporaryFile(mode="w", suffix=".md", prefix="plan-review-", delete=False) as tmp:
         tmp.write(plan_content)
         tmp_path = Path(tmp.name)
 
     try:
+        started = time.time()
         if open_editor(tmp_path) != 0:
             print(make_response("ask", "no overlay terminal available (requires agterm, tmux, kitty, or wezterm), skipping plan annotation"))
             return
 
         edited_content = tmp_path.read_text()
         diff = get_diff(plan_content, edited_content)
+        record_review({
+            "ts": started, "duration": time.time() - started, "plan": plan_label(plan_content),
+            "tool": "editor", "mode": "hook", "decision": "deny" if diff else "ask",
+            "plan_bytes": len(plan_content.encode()), "annotation_bytes": len(diff.encode()),
+        })
 
         if not diff:
             print(make_response("ask", "plan reviewed, no changes"))
@@ -301,26 +513,44 @@ def run_hook_mode() -> None:
 
 
 def main() -> None:
+    # bare invocation is the hook: answer without paying for argparse
+    if len(sys.argv) == 1:
+        run_hook_mode()
+        return
+
     import argparse
+    from pathlib import Path
 
     parser = argparse.ArgumentParser(description="plan annotation hook for ExitPlanMode")
     parser.add_argument("--test", action="store_true", help="run unit tests")
-    parser.add_argument("plan_file", nargs="?", help="plan file path (file mode)")
+    parser.add_argument("--plan-path", help="hook mode with the plan read from this staged file instead of stdin")
+    parser.add_argument("plan_files", nargs="*", metavar="plan_file",
+                        help="plan file paths or glob patterns (file mode; several open in one editor)")
     args = parser.parse_args()
 
     if args.test:
         run_tests()
         return
 
-    if args.plan_file:
-        run_file_mode(Path(args.plan_file))
+    plan_files = expand_plan_args(args.plan_files)
+    if args.plan_path:
+        run_hook_mode(Path(args.plan_path))
+    elif len(plan_files) == 1:
+        run_file_mode(plan_files[0])
+    elif plan_files:
+        run_batch_file_mode(plan_files)
     else:
         run_hook_mode()
 
 
 def run_tests() -> None:
     """run embedded unit tests."""
+    import json
+    import shutil
+    import tempfile
+    import time
     import unittest
+    from pathlib import Path
 
     class TestGetDiff(unittest.TestCase):
         def test_no_changes(self) -> None:
@@ -392,6 +622,42 @@ def run_tests() -> None:
             finally:
                 sys.stdin = old_stdin
 
+    class TestStagedPlanPath(unittest.TestCase):
+        def run_hook(self, plan_path: Path) -> dict:
+            import io
+            buf, old = io.StringIO(), sys.stdout
+            sys.stdout = buf
+            try:
+                run_hook_mode(plan_path)
+            finally:
+                sys.stdout = old
+            return json.loads(buf.getvalue())["hookSpecificOutput"]
+
+        def test_reads_staged_file_not_stdin(self) -> None:
+            global open_editor
+            tmp = Path(tempfile.mktemp(suffix=".md"))
+            tmp.write_text("# Plan\n- task 1\n")
+            seen: list[str] = []
+
+            def fake_editor(path: Path, target_window: bool = True) -> int:
+                seen.append(path.read_text())
+                path.write_text("# Plan\n- task 1\nadd tests\n")
+                return 0
+
+            orig_editor, open_editor = open_editor, fake_editor
+            try:
+                out = self.run_hook(tmp)
+            finally:
+                open_editor = orig_editor
+                tmp.unlink(missing_ok=True)
+            self.assertEqual(seen, ["# Plan\n- task 1\n"])
+            self.assertEqual(out["permissionDecision"], "deny")
+            self.assertIn("+add tests", out["permissionDecisionReason"])
+
+        def test_missing_staged_file_asks(self) -> None:
+            out = self.run_hook(Path("/tmp/nonexistent-staged-plan-12345.md"))
+            self.assertEqual(out["permissionDecision"], "ask")
+
     class TestResponses(unittest.TestCase):
         def test_ask_response(self) -> None:
             result = json.loads(make_response("ask", "reviewed"))
@@ -405,6 +671,21 @@ def run_tests() -> None:
             self.assertEqual(out["permissionDecision"], "deny")
             self.assertIn("fix this", out["permissionDecisionReason"])
 
+        def test_plain_layout_matches_json_dumps(self) -> None:
+            # the hand-built fast-exit layout must be byte-identical to the json.dumps form
+            for decision, reason in [("ask", "plan review disabled via PLANNING_DISABLE_REVDIFF"), ("ask", "")]:
+                resp: dict = {"hookSpecificOutput": {"hookEventName": "PreToolUse", "permissionDecision": decision}}
+                if reason:
+                    resp["hookSpecificOutput"]["permissionDecisionReason"] = reason
+                self.assertEqual(make_response(decision, reason), json.dumps(resp, indent=2))
+
+        def test_is_plain(self) -> None:
+            self.assertTrue(is_plain("plan reviewed, no changes"))
+            self.assertFalse(is_plain('has "quotes"'))
+            self.assertFalse(is_plain("back\\slash"))
+            self.assertFalse(is_plain("new\nline"))
+            self.assertFalse(is_plain("caf\u00e9"))
+
         def test_special_chars_in_json(self) -> None:
             result = make_response("deny", 'has "quotes" and\nnewlines')
             parsed = json.loads(result)
@@ -427,6 +708,118 @@ def run_tests() -> None:
             finally:
                 tmp.unlink(missing_ok=True)
 
+    class TestBatchFileMode(unittest.TestCase):
+        def test_join_split_roundtrip(self) -> None:
+            plans = [("a.md", "# A\n- task\n"), ("b.md", "# B\n- no trailing newline")]
+            self.assertEqual(split_plans(join_plans(plans), plans), ["# A\n- task\n", "# B\n- no trailing newline"])
+
+        def test_split_attributes_edits_to_sections(self) -> None:
+            plans = [("a.md", "# A\n"), ("b.md", "# B\n")]
+            doc = join_plans(plans).replace("# B\n", "# B\nuse JWT\n")
+            sections = split_plans(doc, plans)
+            self.assertEqual(sections[0], "# A\n")
+            self.assertEqual(sections[1], "# B\nuse JWT\n")
+
+        def test_split_rejects_removed_marker(self) -> None:
+            plans = [("a.md", "# A\n"), ("b.md", "# B\n")]
+            doc = join_plans(plans).replace(BATCH_MARKER.format("b.md") + "\n", "")
+            with self.assertRaises(ValueError):
+                split_plans(doc, plans)
+
+        def test_split_rejects_text_before_first_marker(self) -> None:
+            plans = [("a.md", "# A\n"), ("b.md", "# B\n")]
+            with self.assertRaises(ValueError):
+                split_plans("note\n" + join_plans(plans), plans)
+
+        def test_expand_glob_sorted_and_deduped(self) -> None:
+            root = Path(tempfile.mkdtemp(prefix="plan-annotate-test-"))
+            try:
+                for name in ("b.md", "a.md", "c.txt"):
+                    (root / name).write_text("x\n")
+                paths = expand_plan_args([str(root / "*.md"), str(root / "a.md")])
+                self.assertEqual([p.name for p in paths], ["a.md", "b.md"])
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+
+        def test_expand_unmatched_glob_kept(self) -> None:
+            self.assertEqual(expand_plan_args(["/nonexistent-dir-zzz/*.md"]), [Path("/nonexistent-dir-zzz/*.md")])
+
+        def test_batch_missing_file(self) -> None:
+            with self.assertRaises(SystemExit) as ctx:
+                run_batch_file_mode([Path("/tmp/nonexistent-plan-a-12345.md"), Path("/tmp/nonexistent-plan-b-12345.md")])
+            self.assertEqual(ctx.exception.code, 1)
+
+        def test_batch_diff_per_file(self) -> None:
+            import io
+            root = Path(tempfile.mkdtemp(prefix="plan-annotate-test-"))
+            a, b = root / "a.md", root / "b.md"
+            a.write_text("# A\n- task\n")
+            b.write_text("# B\n- task\n")
+
+            def fake_editor(path: Path, target_window: bool = True) -> int:
+                path.write_text(path.read_text().replace("# B\n", "# B\nsplit this\n"))
+                return 0
+
+            global open_editor
+            orig_editor, open_editor = open_editor, fake_editor
+            buf, old = io.StringIO(), sys.stdout
+            sys.stdout = buf
+            try:
+                run_batch_file_mode([a, b])
+            finally:
+                sys.stdout = old
+                open_editor = orig_editor
+                shutil.rmtree(root, ignore_errors=True)
+            out = buf.getvalue()
+            self.assertIn(f"--- {b} (original)", out)
+            self.assertIn("+split this", out)
+            self.assertNotIn(f"{a} (original)", out)
+
+    class TestRecordReview(unittest.TestCase):
+        def test_plan_label_prefers_heading(self) -> None:
+            self.assertEqual(plan_label("\nintro\n# Auth rewrite\n- task\n"), "# Auth rewrite")
+
+        def test_plan_label_falls_back_to_first_line(self) -> None:
+            self.assertEqual(plan_label("\n  just text\nmore\n"), "just text")
+            self.assertEqual(plan_label(""), "")
+
+        def test_records_into_plugin_data(self) -> None:
+            import sqlite3
+            data_dir = Path(tempfile.mkdtemp(prefix="plan-annotate-test-"))
+            old = os.environ.get("CLAUDE_PLUGIN_DATA")
+            os.environ["CLAUDE_PLUGIN_DATA"] = str(data_dir)
+            try:
+                if not (Path(__file__).resolve().parent / "plan-review-stats.py").exists():
+                    self.skipTest("plan-review-stats.py not installed next to this script")
+                record_review({"ts": time.time(), "duration": 1.5, "plan": "# P", "tool": "editor",
+                               "mode": "file", "decision": "ask", "plan_bytes": 3, "annotation_bytes": 0})
+                db = data_dir / "plan-reviews.db"
+                deadline = time.time() + 10
+                rows = 0
+                while time.time() < deadline and not rows:
+                    time.sleep(0.05)
+                    try:
+                        conn = sqlite3.connect(db)
+                        rows = conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                self.assertEqual(rows, 1)
+            finally:
+                if old is None:
+                    os.environ.pop("CLAUDE_PLUGIN_DATA", None)
+                else:
+                    os.environ["CLAUDE_PLUGIN_DATA"] = old
+                shutil.rmtree(data_dir, ignore_errors=True)
+
+        def test_no_plugin_data_is_noop(self) -> None:
+            old = os.environ.pop("CLAUDE_PLUGIN_DATA", None)
+            try:
+                record_review({"plan": "# P"})  # would fail validation if it reached the recorder
+            finally:
+                if old is not None:
+                    os.environ["CLAUDE_PLUGIN_DATA"] = old
+
     class TestDisableReview(unittest.TestCase):
         def setUp(self) -> None:
             os.environ["PLANNING_DISABLE_REVDIFF"] = "1"
@@ -491,8 +884,8 @@ def run_tests() -> None:
 
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    for tc in [TestGetDiff, TestReadPlanFromStdin, TestResponses, TestFileMode, TestDisableReview,
-               TestBuildEditorCmd]:
+    for tc in [TestGetDiff, TestReadPlanFromStdin, TestStagedPlanPath, TestResponses, TestFileMode, TestBatchFileMode,
+               TestRecordReview, TestDisableReview, TestBuildEditorCmd]:
         suite.addTests(loader.loadTestsFromTestCase(tc))
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
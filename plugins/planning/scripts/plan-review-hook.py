@@ -15,22 +15,37 @@ requirements:
   - revdiff path: agterm, tmux, zellij, herdr, orca, kitty, wezterm, kaku,
     cmux, ghostty, iTerm2, or emacs vterm
   - $EDITOR fallback (plan-annotate.py): agterm, tmux, kitty, or wezterm
+
+recovery: revdiff's output file lives in the plan spool next to the staged plan and
+is only removed once the round completes. if the hook is killed while revdiff is open,
+the annotations saved there are delivered on the next ExitPlanMode with the same plan.
+staged files carry the hook's pid besides the content hash, so concurrent sessions
+reviewing the same plan never share or remove each other's files.
+
+startup: this runs on every ExitPlanMode, so module scope imports only os and sys.
+everything heavier (json, subprocess, tempfile, pathlib, ...) is imported inside the
+function that needs it, and the fast exits (review disabled, CLAUDE_PLUGIN_ROOT unset,
+empty event) answer before any of it loads. tests/test-planning-hook-startup.sh holds
+the import budget.
 """
 
-import json
+from __future__ import annotations
+
 import os
-import shutil
-import subprocess
 import sys
-import tempfile
-from pathlib import Path
 
+# typing itself imports re, so the checker-only flag is spelled out instead of imported
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from pathlib import Path
 
-def read_plan_from_stdin() -> str:
-    """read plan content from hook event JSON on stdin."""
-    raw = sys.stdin.read()
+
+def parse_plan(raw: str) -> str:
+    """extract plan content from raw hook event JSON."""
     if not raw.strip():
         return ""
+    import json
+
     try:
         event = json.loads(raw)
         return event.get("tool_input", {}).get("plan", "")
@@ -38,13 +53,32 @@ def read_plan_from_stdin() -> str:
         return ""
 
 
+def read_plan_from_stdin() -> str:
+    """read plan content from hook event JSON on stdin."""
+    return parse_plan(sys.stdin.read())
+
+
+def is_plain(text: str) -> bool:
+    """report whether text can sit inside a JSON string literal without escaping."""
+    return text.isascii() and text.isprintable() and '"' not in text and "\\" not in text
+
+
 def make_response(decision: str, reason: str = "") -> None:
     """output PreToolUse hook response and exit with appropriate code.
     deny: plain text to stderr + exit 2 (Claude Code blocks the tool and shows the text).
-    ask/allow: JSON to stdout + exit 0."""
+    ask/allow: JSON to stdout + exit 0. the fixed reasons on the fast exits need no escaping,
+    so they are laid out by hand in json.dumps(indent=2) form and those exits never import json."""
     if decision == "deny":
         print(reason, file=sys.stderr)
         sys.exit(2)
+    if is_plain(decision) and is_plain(reason):
+        fields = ['    "hookEventName": "PreToolUse"', f'    "permissionDecision": "{decision}"']
+        if reason:
+            fields.append(f'    "permissionDecisionReason": "{reason}"')
+        print("{\n  \"hookSpecificOutput\": {\n" + ",\n".join(fields) + "\n  }\n}")
+        return
+    import json
+
     resp: dict = {
         "hookSpecificOutput": {
             "hookEventName": "PreToolUse",
@@ -56,8 +90,136 @@ def make_response(decision: str, reason: str = "") -> None:
     print(json.dumps(resp, indent=2))
 
 
-def try_revdiff(plan_content: str, plugin_root: str) -> str | None:
-    """try reviewing plan with revdiff. returns annotations or None if revdiff unavailable."""
+def plan_label(plan_content: str) -> str:
+    """short plan identity for review stats: the first markdown heading, else the first non-blank line."""
+    lines = [line.strip() for line in plan_content.splitlines() if line.strip()]
+    heading = next((line for line in lines if line.startswith("#")), lines[0] if lines else "")
+    return heading[:120]
+
+
+def record_review(event: dict) -> None:
+    """hand a finished review round to plan-review-stats.py without waiting for it.
+    the recorder runs detached, so the SQLite write never delays the hook response. no-op
+    when CLAUDE_PLUGIN_DATA is unset or the recorder is not installed next to this script."""
+    import json
+    import subprocess
+    from pathlib import Path
+
+    data_dir = os.environ.get("CLAUDE_PLUGIN_DATA")
+    recorder = Path(__file__).resolve().parent / "plan-review-stats.py"
+    if not data_dir or not recorder.exists():
+        return
+    event = {"project": os.getcwd(), **event}
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, str(recorder), "record", "--db", str(Path(data_dir) / "plan-reviews.db")],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        proc.stdin.write(json.dumps(event).encode())
+        proc.stdin.close()
+    except OSError:
+        pass
+
+
+SPOOL_MAX_AGE = 86400  # seconds; spool files older than this are leftovers of a killed hook
+
+
+def spool_dir() -> Path:
+    """per-user directory holding staged plan files."""
+    import tempfile
+    from pathlib import Path
+
+    path = Path(tempfile.gettempdir()) / f"plan-review-spool-{os.getuid()}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    return path
+
+
+def stage_plan(plan_content: str) -> Path:
+    """write the plan once to a spool file, plan-<sha256>-<pid>.md, and return its path.
+    every tool in the review chain (revdiff launcher, plan-annotate.py fallback, diff) reads
+    this file by path instead of receiving the plan through another pipe or temp copy.
+    the pid keeps the path this hook's own: another session reviewing the same plan text
+    stages its own copy, and each hook removes only the file it created.
+    the write goes through a temp file + rename, so a reader never sees a partial plan.
+    stale plans and annotation files left by a hook that was killed before its cleanup ran
+    are swept here."""
+    import hashlib
+    import tempfile
+    import time
+    from pathlib import Path
+
+    spool = spool_dir()
+    now = time.time()
+    for old in spool.glob("plan-*"):
+        try:
+            if now - old.stat().st_mtime > SPOOL_MAX_AGE:
+                old.unlink()
+        except OSError:
+            pass
+
+    data = plan_content.encode()
+    path = spool / f"plan-{hashlib.sha256(data).hexdigest()[:16]}-{os.getpid()}.md"
+    fd, tmp = tempfile.mkstemp(dir=spool, prefix=".plan-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+
+def read_annotations(path: Path) -> str:
+    """annotations left in a revdiff output file, or "" when the file is missing or empty."""
+    try:
+        return path.read_text(errors="replace").strip()
+    except OSError:
+        return ""
+
+
+def pid_alive(pid: int) -> bool:
+    """whether a process with this pid still runs."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, but owned by someone else
+    return True
+
+
+def recover_annotations(plan_path: Path) -> str:
+    """annotations a killed earlier round on the same plan left in the spool, or "".
+    a round is over when the pid in its file names is gone; rounds still running in
+    another session are left alone. the file is claimed by renaming it to this hook's
+    own output path, so two hooks never deliver the same annotations, and the dead
+    round's staged plan is removed with it."""
+    digest, _, own_pid = plan_path.stem.rpartition("-")
+    own = plan_path.with_suffix(".annotations")
+    for path in sorted(plan_path.parent.glob(f"{digest}-*.annotations")):
+        pid = path.stem.rpartition("-")[2]
+        if pid == own_pid or not pid.isdigit() or pid_alive(int(pid)):
+            continue
+        try:
+            os.rename(path, own)
+        except OSError:
+            continue  # claimed by another hook first
+        path.with_suffix(".md").unlink(missing_ok=True)
+        recovered = read_annotations(own)
+        own.unlink(missing_ok=True)
+        if recovered:
+            return recovered
+    return ""
+
+
+def try_revdiff(plan_path: Path, plugin_root: str) -> str | None:
+    """try reviewing the staged plan with revdiff. returns annotations or None if revdiff unavailable."""
+    import shutil
+    import subprocess
+    from pathlib import Path
+
     if not shutil.which("revdiff"):
         return None
 
@@ -65,54 +227,54 @@ def try_revdiff(plan_content: str, plugin_root: str) -> str | None:
     if not launcher.exists():
         return None
 
-    # write plan to temp file
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".md", prefix="plan-review-", delete=False
-    ) as tmp:
-        tmp.write(plan_content)
-        tmp_path = Path(tmp.name)
-
-    try:
-        result = subprocess.run(
-            [str(launcher), str(tmp_path)],
-            capture_output=True, text=True, timeout=345600,
-            env={**os.environ},
-        )
-        annotations = result.stdout.strip()
-        if not annotations:
-            return ""
+    # revdiff writes its output file next to the staged plan, under the same name.
+    # if a previous round on this exact plan was killed (hook timeout, closed session) after
+    # revdiff saved annotations, they are still there: deliver them instead of reopening
+    annotations_path = plan_path.with_suffix(".annotations")
+    recovered = recover_annotations(plan_path)
+    if recovered:
         return (
-            "user reviewed the plan in revdiff and added annotations. "
-            "each annotation references a specific line and contains the user's feedback.\n\n"
-            f"{annotations}\n\n"
+            "recovered annotations from an earlier revdiff review of this plan that ended "
+            "before they were delivered. each annotation references a specific line and "
+            "contains the user's feedback.\n\n"
+            f"{recovered}\n\n"
             "adjust the plan to address each annotation, then call ExitPlanMode again."
         )
-    finally:
-        tmp_path.unlink(missing_ok=True)
-
 
-def main() -> None:
-    plan_content = read_plan_from_stdin()
-    if not plan_content:
-        make_response("ask", "no plan content in hook event")
-        return
+    result = subprocess.run(
+        [str(launcher), str(plan_path)],
+        capture_output=True, text=True, timeout=345600,
+        env={**os.environ, "PLAN_REVIEW_OUTPUT": str(annotations_path)},
+    )
+    # removed only once the round completed; a kill above leaves the file for recovery
+    annotations_path.unlink(missing_ok=True)
+    annotations = result.stdout.strip()
+    if not annotations:
+        return ""
+    return (
+        "user reviewed the plan in revdiff and added annotations. "
+        "each annotation references a specific line and contains the user's feedback.\n\n"
+        f"{annotations}\n\n"
+        "adjust the plan to address each annotation, then call ExitPlanMode again."
+    )
 
-    # skip interactive review entirely when disabled (e.g. claude /remote-control, where
-    # a host terminal overlay would be invisible to the remote client and block the
-    # session). falls through to the normal ExitPlanMode confirmation, which the remote
-    # client can see and act on. covers both revdiff and the plan-annotate.py fallback.
-    if os.environ.get("PLANNING_DISABLE_REVDIFF"):
-        make_response("ask", "plan review disabled via PLANNING_DISABLE_REVDIFF")
-        return
 
-    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", "")
-    if not plugin_root:
-        make_response("ask", "CLAUDE_PLUGIN_ROOT not set")
-        return
+def review_staged_plan(plan_content: str, plan_path: Path, plugin_root: str) -> None:
+    """run revdiff, or the plan-annotate.py fallback, over the staged plan and output the response."""
+    import subprocess
+    import time
+    from pathlib import Path
 
     # try revdiff first
-    result = try_revdiff(plan_content, plugin_root)
+    started = time.time()
+    result = try_revdiff(plan_path, plugin_root)
     if result is not None:
+        # the $EDITOR fallback below records its own rounds, so only revdiff is recorded here
+        record_review({
+            "ts": started, "duration": time.time() - started, "plan": plan_label(plan_content),
+            "tool": "revdiff", "mode": "hook", "decision": "deny" if result else "ask",
+            "plan_bytes": len(plan_content.encode()), "annotation_bytes": len(result.encode()),
+        })
         if not result:
             make_response("ask", "plan reviewed, no annotations")
         else:
@@ -120,16 +282,15 @@ def main() -> None:
         return
 
     # fall back to plan-annotate.py — it handles its own editor overlay and diffing.
-    # since we already consumed stdin, we need to re-feed the JSON to it.
+    # stdin is already consumed, so it reads the staged plan by path rather than re-fed JSON
     annotate_script = Path(plugin_root) / "scripts" / "plan-annotate.py"
     if not annotate_script.exists():
         make_response("ask", "no review tool available (revdiff not installed, plan-annotate.py not found)")
         return
 
-    stdin_data = json.dumps({"tool_input": {"plan": plan_content}})
     fallback = subprocess.run(
-        [sys.executable, str(annotate_script)],
-        input=stdin_data, capture_output=True, text=True, timeout=345600,
+        [sys.executable, str(annotate_script), "--plan-path", str(plan_path)],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=345600,
         env={**os.environ},
     )
 
@@ -141,6 +302,41 @@ def main() -> None:
         make_response("ask", "plan reviewed, no changes")
 
 
+def main() -> None:
+    # stdin is drained up front so Claude Code never writes into a closed pipe, but it is
+    # only parsed once the env-only fast exits below have been ruled out
+    raw = sys.stdin.read()
+    if not raw.strip():
+        make_response("ask", "no plan content in hook event")
+        return
+
+    # skip interactive review entirely when disabled (e.g. claude /remote-control, where
+    # a host terminal overlay would be invisible to the remote client and block the
+    # session). falls through to the normal ExitPlanMode confirmation, which the remote
+    # client can see and act on. covers both revdiff and the plan-annotate.py fallback.
+    if os.environ.get("PLANNING_DISABLE_REVDIFF"):
+        make_response("ask", "plan review disabled via PLANNING_DISABLE_REVDIFF")
+        return
+
+    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", "")
+    if not plugin_root:
+        make_response("ask", "CLAUDE_PLUGIN_ROOT not set")
+        return
+
+    plan_content = parse_plan(raw)
+    if not plan_content:
+        make_response("ask", "no plan content in hook event")
+        return
+
+    # stage the plan once; revdiff and the plan-annotate.py fallback both read it by path,
+    # and the finally below removes it however the review ends
+    plan_path = stage_plan(plan_content)
+    try:
+        review_staged_plan(plan_content, plan_path, plugin_root)
+    finally:
+        plan_path.unlink(missing_ok=True)
+
+
 if __name__ == "__main__":
     try:
         main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""plan-review-stats.py - local analytics store for the plan review loop.
+
+records one row per plan review round in a SQLite database and summarizes how
+the loop behaves: rounds per plan, time spent in the reviewer, annotation size,
+revdiff vs $EDITOR usage, and how often a round ends in "ask" vs "deny".
+
+plan-review-hook.py and plan-annotate.py hand each finished round to `record`
+through a detached child process, so the hook never waits on the database. the
+database lives at ${CLAUDE_PLUGIN_DATA}/plan-reviews.db unless --db is given;
+without either, record is a no-op and report exits with an error.
+
+event fields (JSON object on stdin for `record`):
+    ts          unix time the round started (float)
+    duration    seconds the reviewer was open (float)
+    project     working directory of the session
+    plan        plan identity: file path in file mode, first heading in hook mode
+    tool        "revdiff" or "editor"
+    mode        "hook", "file", or "batch"
+    decision    "ask" (no feedback) or "deny" (feedback sent back)
+    plan_bytes, annotation_bytes   sizes of the plan and of the returned feedback
+
+usage:
+    plan-review-stats.py record [--db PATH]    # read one event JSON from stdin
+    plan-review-stats.py report [--db PATH]    # per-project and per-plan summary
+    plan-review-stats.py --test                # run unit tests
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    duration REAL NOT NULL,
+    project TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    decision TEXT NOT NULL,
+    plan_bytes INTEGER NOT NULL,
+    annotation_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_project_plan ON reviews (project, plan);
+"""
+
+FIELDS = ("ts", "duration", "project", "plan", "tool", "mode", "decision", "plan_bytes", "annotation_bytes")
+
+
+def default_db() -> Path | None:
+    """database path under the plugin data dir, or None when CLAUDE_PLUGIN_DATA is unset."""
+    data_dir = os.environ.get("CLAUDE_PLUGIN_DATA")
+    return Path(data_dir) / "plan-reviews.db" if data_dir else None
+
+
+def connect(db: Path) -> sqlite3.Connection:
+    """open the database, creating it and the schema on first use.
+    WAL lets a report read while a hook writes; the busy timeout covers two rounds finishing together."""
+    db.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_event(db: Path, event: dict) -> None:
+    """insert one review event. missing fields raise KeyError rather than storing a partial row."""
+    row = tuple(event[f] for f in FIELDS)
+    with connect(db) as conn:
+        conn.execute(f"INSERT INTO reviews ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})", row)
+    conn.close()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """nearest-rank percentile of values; 0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without importing math
+    return ordered[int(rank) - 1]
+
+
+def fmt_duration(seconds: float) -> str:
+    """compact human duration: 42s, 3m05s, 1h02m."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+def md_cell(text: str) -> str:
+    """text safe inside a markdown table cell: pipes escaped, line breaks flattened."""
+    return " ".join(str(text).splitlines()).replace("|", "\\|")
+
+
+def summarize(rows: list[tuple]) -> dict:
+    """aggregate (ts, duration, tool, decision, annotation_bytes) rows into one summary."""
+    durations = [r[1] for r in rows]
+    annotations = [r[4] for r in rows if r[3] == "deny"]
+    days = max(1.0, (max(r[0] for r in rows) - min(r[0] for r in rows)) / 86400) if rows else 1.0
+    return {
+        "rounds": len(rows),
+        "deny": sum(1 for r in rows if r[3] == "deny"),
+        "ask": sum(1 for r in rows if r[3] == "ask"),
+        "revdiff": sum(1 for r in rows if r[2] == "revdiff"),
+        "editor": sum(1 for r in rows if r[2] == "editor"),
+        "per_day": len(rows) / days,
+        "p50": percentile(durations, 50),
+        "p90": percentile(durations, 90),
+        "max": max(durations, default=0.0),
+        "ann_p50": percentile(annotations, 50),
+        "ann_max": max(annotations, default=0),
+    }
+
+
+def format_report(conn: sqlite3.Connection) -> str:
+    """render per-project and per-plan markdown tables from the reviews table."""
+    rows = conn.execute(
+        "SELECT project, plan, ts, duration, tool, decision, annotation_bytes FROM reviews ORDER BY project, plan, ts"
+    ).fetchall()
+    if not rows:
+        return "no plan reviews recorded"
+
+    by_project: dict[str, list[tuple]] = {}
+    by_plan: dict[tuple[str, str], list[tuple]] = {}
+    for project, plan, *rest in rows:
+        by_project.setdefault(project, []).append(tuple(rest))
+        by_plan.setdefault((project, plan), []).append(tuple(rest))
+
+    out = [
+        "## Plan review loop by project",
+        "",
+        "| Project | Rounds | Rounds/day | Deny | Ask | revdiff | editor | Time p50 | Time p90 | Time max | Annotation p50 | Annotation max |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for project, items in by_project.items():
+        s = summarize(items)
+        out.append(
+            f"| {md_cell(project)} | {s['rounds']} | {s['per_day']:.1f} | {s['deny']} | {s['ask']} | {s['revdiff']} | "
+            f"{s['editor']} | {fmt_duration(s['p50'])} | {fmt_duration(s['p90'])} | {fmt_duration(s['max'])} | "
+            f"{int(s['ann_p50'])}B | {int(s['ann_max'])}B |"
+        )
+
+    out += [
+        "",
+        "## Plan review loop by plan",
+        "",
+        "| Project | Plan | Rounds | Deny | Ask | Time p50 | Time max | Total time |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for (project, plan), items in by_plan.items():
+        s = summarize(items)
+        total = sum(r[1] for r in items)
+        out.append(
+            f"| {md_cell(project)} | {md_cell(plan)} | {s['rounds']} | {s['deny']} | {s['ask']} | "
+            f"{fmt_duration(s['p50'])} | {fmt_duration(s['max'])} | {fmt_duration(total)} |"
+        )
+    return "\n".join(out)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="plan review loop analytics")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    parser.add_argument("command", nargs="?", choices=["record", "report"], help="record an event or print a report")
+    parser.add_argument("--db", help="database path (default: ${CLAUDE_PLUGIN_DATA}/plan-reviews.db)")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+
+    db = Path(args.db) if args.db else default_db()
+    if args.command == "record":
+        # best-effort: runs detached from the hook, so there is nobody to report a failure to
+        if db:
+            try:
+                record_event(db, json.loads(sys.stdin.read()))
+            except (OSError, sqlite3.Error, ValueError, KeyError):
+                sys.exit(1)
+        return
+
+    if args.command == "report":
+        if not db:
+            print("error: no database: pass --db or set CLAUDE_PLUGIN_DATA", file=sys.stderr)
+            sys.exit(1)
+        if not db.exists():
+            print("no plan reviews recorded")
+            return
+        conn = connect(db)
+        try:
+            print(format_report(conn))
+        finally:
+            conn.close()
+        return
+
+    parser.print_usage(sys.stderr)
+    sys.exit(1)
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import tempfile
+    import unittest
+
+    def event(**overrides: object) -> dict:
+        base = {"ts": 1_700_000_000.0, "duration": 30.0, "project": "/src/app", "plan": "# Plan A",
+                "tool": "revdiff", "mode": "hook", "decision": "deny", "plan_bytes": 100, "annotation_bytes": 40}
+        base.update(overrides)
+        return base
+
+    class TestRecord(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="plan-review-stats-test-"))
+            self.db = self.dir / "nested" / "plan-reviews.db"
+
+        def tearDown(self) -> None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def test_creates_db_and_inserts(self) -> None:
+            record_event(self.db, event())
+            record_event(self.db, event(decision="ask", annotation_bytes=0))
+            conn = connect(self.db)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0], 2)
+            conn.close()
+
+        def test_missing_field_rejected(self) -> None:
+            bad = event()
+            del bad["tool"]
+            with self.assertRaises(KeyError):
+                record_event(self.db, bad)
+
+        def test_default_db_needs_plugin_data(self) -> None:
+            old = os.environ.pop("CLAUDE_PLUGIN_DATA", None)
+            try:
+                self.assertIsNone(default_db())
+                os.environ["CLAUDE_PLUGIN_DATA"] = str(self.dir)
+                self.assertEqual(default_db(), self.dir / "plan-reviews.db")
+            finally:
+                os.environ.pop("CLAUDE_PLUGIN_DATA", None)
+                if old is not None:
+                    os.environ["CLAUDE_PLUGIN_DATA"] = old
+
+    class TestReport(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="plan-review-stats-test-"))
+            self.db = self.dir / "plan-reviews.db"
+
+        def tearDown(self) -> None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def test_empty(self) -> None:
+            conn = connect(self.db)
+            self.assertEqual(format_report(conn), "no plan reviews recorded")
+            conn.close()
+
+        def test_groups_by_project_and_plan(self) -> None:
+            record_event(self.db, event(duration=10.0))
+            record_event(self.db, event(duration=90.0, decision="ask", tool="editor"))
+            record_event(self.db, event(plan="# Plan B", project="/src/other"))
+            conn = connect(self.db)
+            report = format_report(conn)
+            conn.close()
+            self.assertIn("| /src/app | 2 |", report)
+            self.assertIn("| /src/other | 1 |", report)
+            self.assertIn("| /src/app | # Plan A | 2 | 1 | 1 |", report)
+
+        def test_pipes_escaped_in_every_text_cell(self) -> None:
+            record_event(self.db, event(plan="# a | b", project="/src/x|y"))
+            conn = connect(self.db)
+            report = format_report(conn)
+            conn.close()
+            self.assertIn("| /src/x\\|y | 1 |", report)
+            self.assertIn("| /src/x\\|y | # a \\| b | 1 |", report)
+            # 12 columns in the project table, 8 in the plan table, so 13 and 9 cell borders
+            rows = [line for line in report.splitlines() if line.startswith("| /src/x")]
+            self.assertEqual([row.replace("\\|", "").count("|") for row in rows], [13, 9])
+
+    class TestHelpers(unittest.TestCase):
+        def test_percentile(self) -> None:
+            self.assertEqual(percentile([], 50), 0.0)
+            self.assertEqual(percentile([5.0], 90), 5.0)
+            self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.0)
+            self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 90), 4.0)
+
+        def test_fmt_duration(self) -> None:
+            self.assertEqual(fmt_duration(42), "42s")
+            self.assertEqual(fmt_duration(185), "3m05s")
+            self.assertEqual(fmt_duration(3720), "1h02m")
+
+        def test_summarize_counts(self) -> None:
+            s = summarize([(0.0, 10.0, "revdiff", "deny", 20), (60.0, 20.0, "editor", "ask", 0)])
+            self.assertEqual((s["rounds"], s["deny"], s["ask"], s["revdiff"], s["editor"]), (2, 1, 1, 1, 1))
+            self.assertEqual(s["ann_max"], 20)
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestRecord, TestReport, TestHelpers]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
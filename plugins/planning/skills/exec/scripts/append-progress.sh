@@ -1,23 +1,79 @@
 #!/bin/bash
 # append to the progress file with timestamp
-# usage: append-progress.sh <progress-file> [message]
+# usage: append-progress.sh [--events] <progress-file> [message]
 # if message is provided, appends single timestamped line
 # if no message, reads stdin and appends all lines (for multi-line content)
+# with --events, each stdin line is its own timestamped line, all in one call
+# every append also records JSON events in the .jsonl sidecar, see progress-events.sh
+
+# shellcheck disable=SC2154 # the progress_* state is shared with progress-events.sh
 
 set -e
 
+events=""
+if [ "$1" = "--events" ]; then
+    events=1
+    shift
+fi
+
 if [ $# -lt 1 ]; then
-    echo "error: usage: append-progress.sh <file> [message]" >&2
+    echo "error: usage: append-progress.sh [--events] <file> [message]" >&2
     exit 1
 fi
 
 file="$1"
 shift
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/progress-events.sh"
+progress_open "$file"
+
+# read stdin before taking the lock, so a slow writer does not hold up the others
+lines=()
+block=""
 if [ $# -gt 0 ]; then
-    # single line with timestamp
-    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $*" >> "$file"
+    lines=("$*")
+elif [ -n "$events" ]; then
+    while IFS= read -r line || [ -n "$line" ]; do
+        lines+=("$line")
+    done
 else
-    # multi-line from stdin
-    cat >> "$file"
+    IFS= read -r -d '' block || true
+fi
+
+progress_clock
+markdown=""
+progress_events=""
+progress_lock
+progress_load
+progress_tick
+if [ ${#lines[@]} -gt 0 ]; then
+    for line in "${lines[@]}"; do
+        # blank lines carry no entry
+        [[ $line == *[![:space:]]* ]] || continue
+        markdown+="$progress_stamp $line"$'\n'
+        progress_classify "$line"
+        progress_event "$kind" "$task" "$line"
+    done
+elif [ -n "$block" ]; then
+    # a verbatim multi-line block (findings, reports) is one event, its kind taken
+    # from the first line
+    first=${block#"${block%%[![:space:]]*}"}
+    progress_classify "${first%%$'\n'*}"
+    if [ "$kind" = note ]; then
+        kind=block
+    fi
+    markdown=$block
+    text=$block
+    while [ "${text%$'\n'}" != "$text" ]; do
+        text=${text%$'\n'}
+    done
+    progress_event "$kind" "$task" "$text"
+fi
+
+if [ -n "$progress_events" ]; then
+    printf '%s' "$markdown" >>"$file"
+    printf '%s' "$progress_events" >>"$progress_sidecar"
+    progress_save
 fi
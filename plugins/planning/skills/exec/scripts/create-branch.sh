@@ -41,6 +41,9 @@ if [ -z "${1:-}" ]; then
 fi
 
 vcs=$(bash "$SCRIPT_DIR/detect-vcs.sh")
+# hg calls below go through chg when installed, see hg-client.sh
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/hg-client.sh"
 
 do_git() {
     local plan_file="$1"
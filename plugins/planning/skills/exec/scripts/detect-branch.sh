@@ -8,20 +8,78 @@ set -e
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 vcs=$(bash "$SCRIPT_DIR/detect-vcs.sh")
+# hg calls below go through chg when installed, see hg-client.sh
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/hg-client.sh"
+
+# the git answer is cached in <git-common-dir>/default-branch.cache, shared with the
+# review plugin's git-review.py, which reads and writes the same file. line 1 is a key
+# built from what the answer depends on: the content of refs/remotes/origin/HEAD and
+# which candidate branches exist as loose refs under refs/heads/ and
+# refs/remotes/origin/. line 2 is the branch, empty when even the remote had no
+# answer. refs that exist only in packed-refs are covered by requiring packed-refs to
+# be no newer than the cache. every check is a file test or a read, so a hit starts
+# no git process beyond the rev-parse that locates the git dir; it also never repeats
+# the `git remote show` round trip, which hangs on an unreachable remote.
+# reftable repos keep refs in binary tables these tests cannot see, so they skip
+# the cache.
+CANDIDATES="main master trunk develop"
+
+# usage: cache_key <git-common-dir> — print the cache key of the current refs
+cache_key() {
+    local common="$1" head="" c key
+    if [ -f "$common/refs/remotes/origin/HEAD" ]; then
+        IFS= read -r head <"$common/refs/remotes/origin/HEAD" || true
+    fi
+    key="v1|$head|"
+    for c in $CANDIDATES; do
+        if [ -f "$common/refs/heads/$c" ]; then key+="h"; else key+="-"; fi
+        if [ -f "$common/refs/remotes/origin/$c" ]; then key+="r,"; else key+="-,"; fi
+    done
+    echo "$key"
+}
 
 do_git() {
-    local branch
+    local common cache="" key="" cached_key branch="" c refs patterns=()
+    common=$(git rev-parse --path-format=absolute --git-common-dir 2>/dev/null) || common=""
+    if [ -n "$common" ] && [ ! -d "$common/reftable" ]; then
+        cache="$common/default-branch.cache"
+        key=$(cache_key "$common")
+        if [ -f "$cache" ] && ! [ "$common/packed-refs" -nt "$cache" ]; then
+            cached_key=""
+            { IFS= read -r cached_key && IFS= read -r branch; } <"$cache" || true
+            if [ "$cached_key" = "$key" ]; then
+                echo "${branch:-main}"
+                return 0
+            fi
+            branch=""
+        fi
+    fi
+
     # 1. check cached remote HEAD (local, fast)
-    branch=$(git symbolic-ref refs/remotes/origin/HEAD 2>/dev/null | sed 's@^refs/remotes/origin/@@')
+    branch=$(git symbolic-ref -q refs/remotes/origin/HEAD 2>/dev/null | sed 's@^refs/remotes/origin/@@')
 
-    # 2. check for common default branch names locally
+    # 2. check for common default branch names, local branches first, then the
+    # remote-tracking ones a fresh clone without origin/HEAD still has
     if [ -z "$branch" ]; then
-        for candidate in main master trunk develop; do
-            if git show-ref --verify --quiet "refs/heads/$candidate" 2>/dev/null; then
-                branch="$candidate"
+        for c in $CANDIDATES; do
+            patterns+=("refs/heads/$c" "refs/remotes/origin/$c")
+        done
+        refs=" $(git for-each-ref --format='%(refname)' "${patterns[@]}" 2>/dev/null | tr '\n' ' ')"
+        for c in $CANDIDATES; do
+            if [[ "$refs" == *" refs/heads/$c "* ]]; then
+                branch="$c"
                 break
             fi
         done
+        if [ -z "$branch" ]; then
+            for c in $CANDIDATES; do
+                if [[ "$refs" == *" refs/remotes/origin/$c "* ]]; then
+                    branch="$c"
+                    break
+                fi
+            done
+        fi
     fi
 
     # 3. last resort: ask remote (may block if network is unreachable)
@@ -29,12 +87,15 @@ do_git() {
         branch=$(git remote show origin 2>/dev/null | grep 'HEAD branch' | sed 's/.*: //')
     fi
 
-    # 4. fallback
-    if [ -z "$branch" ]; then
-        branch="main"
+    # best-effort: an unwritable git dir only costs the next call a fresh resolution
+    if [ -n "$cache" ]; then
+        if ! { printf '%s\n%s\n' "$key" "$branch" >"$cache.$$" && mv -f "$cache.$$" "$cache"; } 2>/dev/null; then
+            rm -f "$cache.$$"
+        fi
     fi
 
-    echo "$branch"
+    # 4. fallback
+    echo "${branch:-main}"
 }
 
 do_hg() {
@@ -2,12 +2,55 @@
 # detect the VCS of the current working directory
 # outputs "git" or "hg" on stdout; exits 1 if neither
 # precedence: git first, hg second; if both colocated, git wins
+#
+# the git probe is cheap and always runs, so git precedence holds even against a
+# cached answer. `hg root` costs a full mercurial startup, so an hg answer is cached
+# per working directory under $TMPDIR/exec-vcs-<uid>/ and reused while the recorded
+# root still has its .hg directory and still contains the working directory.
 
 set -e
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
 if git rev-parse --git-dir >/dev/null 2>&1; then
     echo "git"
-elif command -v hg >/dev/null 2>&1 && hg root >/dev/null 2>&1; then
+    exit 0
+fi
+
+if ! command -v hg >/dev/null 2>&1 && ! command -v chg >/dev/null 2>&1; then
+    echo "error: not a git or mercurial repository" >&2
+    exit 1
+fi
+
+cwd="$(pwd -P)"
+cache_dir="${TMPDIR:-/tmp}"
+cache_dir="${cache_dir%/}/exec-vcs-$(id -u)"
+cache_file="$cache_dir/$(printf '%s' "$cwd" | cksum | cut -d' ' -f1)"
+
+if [ -f "$cache_file" ]; then
+    IFS= read -r cached_cwd < "$cache_file" || true
+    cached_root="$(sed -n 2p "$cache_file")"
+    # cksum can collide, so the file records the directory it answers for
+    if [ "$cached_cwd" = "$cwd" ] && [ -n "$cached_root" ] && [ -d "$cached_root/.hg" ]; then
+        case "$cwd/" in
+        "$cached_root"/*)
+            echo "hg"
+            exit 0
+            ;;
+        esac
+    fi
+fi
+
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/hg-client.sh"
+if root="$(hg root 2>/dev/null)"; then
+    # best-effort: an unwritable $TMPDIR only costs the next call its hg startup
+    if [ -d "$cache_dir" ] || mkdir -m 700 "$cache_dir" 2>/dev/null; then
+        tmp="$cache_file.$$"
+        if ! { printf '%s\n%s\n' "$cwd" "$root" > "$tmp" && mv -f "$tmp" "$cache_file"; } 2>/dev/null; then
+            rm -f "$tmp"
+        fi
+    fi
     echo "hg"
 else
     echo "error: not a git or mercurial repository" >&2
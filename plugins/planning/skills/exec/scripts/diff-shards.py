@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""diff-shards.py - branch diff computed once and split into per-reviewer shards.
+
+the review fan-out runs five agents in parallel, and each used to run
+`git diff <base>...HEAD` itself and read all of it. this computes the diff once,
+in the cleaned format of the review plugin's git-review.py (one
+"=== path (status) ===" header per file, hunk headers reduced to "···"), and
+writes an artifact the agents read from instead:
+
+    index.md        every changed file with status, +/- counts and its shard,
+                    so a reviewer can follow a change into another shard
+    full.diff       the whole cleaned diff
+    <shard>.diff    one slice of it, e.g. code-1.diff, tests-1.diff, docs-1.diff
+    manifest.json   files, shards and which shards each reviewer gets
+
+files are split by relevance first: tests go to the testing reviewer, docs to the
+documentation reviewer, everything else to quality, implementation and
+simplification. a category larger than --max-bytes is split further into
+size-balanced shards (largest file first into the lightest shard), and a file
+never spans two shards. a reviewer with several shards gets one agent per shard;
+one with none still gets the index.
+
+the artifact lives in <git-common-dir>/exec-review/<merge-base>-<head>-<max-bytes>/
+and is reused while both commits are unchanged: a branch diff depends on nothing else.
+a fixer commit moves HEAD, so the next review phase builds a fresh one. only
+the newest KEEP_ARTIFACTS artifacts are kept.
+
+usage:
+    diff-shards.py build <base> [--max-bytes N] [--json]
+    diff-shards.py --test                       # run unit tests
+
+build prints the artifact directory, the index path and one
+"<reviewer>: <shard path> ..." line per reviewer; --json prints the manifest.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 150_000
+KEEP_ARTIFACTS = 5
+MANIFEST_VERSION = 1
+REVIEWERS = {
+    "quality": "code",
+    "implementation": "code",
+    "simplification": "code",
+    "testing": "tests",
+    "documentation": "docs",
+}
+TEST_DIRS = {"test", "tests", "__tests__", "spec", "specs", "testdata"}
+TEST_NAME_RE = re.compile(r"^test_.*\.py$|_test\.\w+$|\.(test|spec)\.\w+$|^test-.*\.sh$|Tests?\.(java|cs|kt)$")
+DOC_DIRS = {"doc", "docs"}
+DOC_SUFFIXES = {".md", ".rst", ".adoc", ".markdown"}
+DOC_NAMES = {"readme", "changelog", "contributing", "license", "notice"}
+HEADER_PREFIXES = ("index ", "--- ", "+++ ", "old mode", "new mode", "new file mode", "deleted file mode",
+                   "similarity index", "rename from", "rename to", "copy from", "copy to")
+
+
+def git(*args: str) -> str:
+    """run a git command and return stdout; raises CalledProcessError on failure."""
+    return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout
+
+
+def category(path: str) -> str:
+    """tests, docs or code, by location and name."""
+    parts = path.split("/")
+    name = parts[-1]
+    if TEST_DIRS.intersection(parts[:-1]) or TEST_NAME_RE.search(name):
+        return "tests"
+    stem, dot, suffix = name.rpartition(".")
+    if DOC_DIRS.intersection(parts[:-1]) or (dot and f".{suffix.lower()}" in DOC_SUFFIXES):
+        return "docs"
+    if (stem if dot else name).lower() in DOC_NAMES:
+        return "docs"
+    return "code"
+
+
+def file_statuses(diff_args: list[str]) -> dict[str, str]:
+    """path -> new/modified/deleted/renamed/copied/changed, as git-review.py labels them."""
+    statuses = {}
+    fields = git("diff", "--name-status", "-z", *diff_args).split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        code = fields[i]
+        if code[0] in "RC":
+            statuses[fields[i + 2]] = "renamed" if code[0] == "R" else "copied"
+            i += 3
+            continue
+        statuses[fields[i + 1]] = {"A": "new", "M": "modified", "D": "deleted"}.get(code[0], "changed")
+        i += 2
+    return statuses
+
+
+def clean_sections(raw: str, statuses: dict[str, str]) -> list[dict]:
+    """split a raw diff into per-file cleaned sections with their +/- counts."""
+    sections: list[dict] = []
+    current = None
+    skip_header = True
+    for line in raw.splitlines():
+        if line.startswith("diff --git "):
+            match = re.search(r" b/(.+)$", line)
+            path = match.group(1) if match else line[len("diff --git "):]
+            current = {"path": path, "status": statuses.get(path, "changed"), "added": 0, "deleted": 0,
+                       "lines": [f"=== {path} ({statuses.get(path, 'changed')}) ===", ""]}
+            sections.append(current)
+            skip_header = True
+            continue
+        if current is None:
+            continue
+        if skip_header and line.startswith(HEADER_PREFIXES):
+            continue
+        if line.startswith("@@"):
+            skip_header = False
+            context = re.search(r"@@ .+? @@\s*(.+)", line)
+            current["lines"].append(f"··· {context.group(1)}" if context else "···")
+            continue
+        skip_header = False
+        if line.startswith("+"):
+            current["added"] += 1
+        elif line.startswith("-"):
+            current["deleted"] += 1
+        current["lines"].append(line)
+    for section in sections:
+        section["text"] = "\n".join(section.pop("lines")) + "\n"
+        section["bytes"] = len(section["text"].encode())
+        section["category"] = category(section["path"])
+    return sections
+
+
+def balance(sections: list[dict], max_bytes: int) -> list[list[dict]]:
+    """size-balanced shards of at most ~max_bytes each; a file is never split."""
+    total = sum(s["bytes"] for s in sections)
+    count = max(1, -(-total // max_bytes))
+    bins: list[list[dict]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for section in sorted(sections, key=lambda s: s["bytes"], reverse=True):
+        lightest = loads.index(min(loads))
+        bins[lightest].append(section)
+        loads[lightest] += section["bytes"]
+    order = {s["path"]: i for i, s in enumerate(sections)}
+    return [sorted(b, key=lambda s: order[s["path"]]) for b in bins if b]
+
+
+def render_index(manifest: dict) -> str:
+    lines = [
+        "# Branch diff index",
+        "",
+        f"Base: {manifest['base']} (merge-base {manifest['merge_base'][:12]}) | Head: {manifest['head'][:12]}"
+        f" | Files: {len(manifest['files'])} | +{manifest['added']}/-{manifest['deleted']}",
+        "",
+        "Every changed file is listed; your shard holds the diff of some of them. For a file in another shard,"
+        " read it from full.diff or run `git diff " + f"{manifest['base']}...HEAD -- <file>`.",
+        "",
+        "| File | Status | +/- | Shard |",
+        "|---|---|---|---|",
+    ]
+    for f in manifest["files"]:
+        lines.append(f"| {f['path']} | {f['status']} | +{f['added']}/-{f['deleted']} | {f['shard']} |")
+    return "\n".join(lines) + "\n"
+
+
+def write_artifact(work: Path, out: Path, base: str, merge_base: str, head: str, sections: list[dict],
+                   max_bytes: int) -> dict:
+    """write the shards, index, full diff and manifest into work; recorded paths point at out,
+    where work is renamed to once complete."""
+    work.mkdir(parents=True)
+    shards: dict[str, dict] = {}
+    files = []
+    for cat in ("code", "tests", "docs"):
+        members = [s for s in sections if s["category"] == cat]
+        if not members:
+            continue
+        for n, shard in enumerate(balance(members, max_bytes), 1):
+            name = f"{cat}-{n}"
+            header = f"# shard {name} of {base}...{head[:12]}: {len(shard)} files; index.md lists all changed files\n\n"
+            (work / f"{name}.diff").write_text(header + "\n".join(s["text"] for s in shard))
+            shards[name] = {"path": str(out / f"{name}.diff"), "files": len(shard), "bytes": sum(s["bytes"] for s in shard)}
+            for s in shard:
+                s["shard"] = name
+    for s in sections:
+        files.append({k: s[k] for k in ("path", "status", "category", "shard", "added", "deleted", "bytes")})
+    (work / "full.diff").write_text("\n".join(s["text"] for s in sections))
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "base": base,
+        "merge_base": merge_base,
+        "head": head,
+        "dir": str(out),
+        "index": str(out / "index.md"),
+        "full": str(out / "full.diff"),
+        "added": sum(s["added"] for s in sections),
+        "deleted": sum(s["deleted"] for s in sections),
+        "files": files,
+        "shards": shards,
+        "reviewers": {r: sorted((n for n in shards if n.startswith(f"{cat}-")), key=lambda n: int(n.rsplit("-", 1)[1]))
+                      for r, cat in REVIEWERS.items()},
+    }
+    (work / "index.md").write_text(render_index(manifest))
+    (work / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def prune(root: Path, keep: Path) -> None:
+    """drop all but the newest KEEP_ARTIFACTS artifacts; keep and in-progress builds are never dropped."""
+    import shutil
+
+    dirs = sorted((d for d in root.iterdir() if d.is_dir() and d != keep and not d.name.startswith(".")), key=lambda d: d.stat().st_mtime, reverse=True)
+    for old in dirs[KEEP_ARTIFACTS - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def build(base: str, max_bytes: int) -> dict:
+    """return the artifact manifest for base...HEAD, building it if needed."""
+    head = git("rev-parse", "--verify", "HEAD^{commit}").strip()
+    merge_base = git("merge-base", base, head).strip()
+    common = Path(git("rev-parse", "--path-format=absolute", "--git-common-dir").strip())
+    root = common / "exec-review"
+    out = root / f"{merge_base[:12]}-{head[:12]}-{max_bytes}"
+    try:
+        manifest = json.loads((out / "manifest.json").read_text())
+        if manifest.get("version") == MANIFEST_VERSION and manifest.get("base") == base:
+            manifest["cached"] = True
+            return manifest
+    except (OSError, ValueError):
+        pass
+
+    diff_args = [f"{merge_base}..{head}"]
+    sections = clean_sections(git("diff", "--no-ext-diff", *diff_args), file_statuses(diff_args))
+    root.mkdir(parents=True, exist_ok=True)
+    # build beside the final path and rename, so a parallel caller never sees half an artifact
+    import shutil
+
+    work = root / f".{out.name}.{os.getpid()}"
+    shutil.rmtree(work, ignore_errors=True)
+    manifest = write_artifact(work, out, base, merge_base, head, sections, max_bytes)
+    shutil.rmtree(out, ignore_errors=True)
+    try:
+        work.rename(out)
+    except OSError:
+        shutil.rmtree(work, ignore_errors=True)  # a parallel build won the rename
+    prune(root, out)
+    manifest["cached"] = False
+    return manifest
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="branch diff split into per-reviewer shards")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    sub = parser.add_subparsers(dest="cmd")
+    p_build = sub.add_parser("build", help="build or reuse the artifact for <base>...HEAD")
+    p_build.add_argument("base", help="base branch or ref, e.g. the default branch")
+    p_build.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="shard size limit")
+    p_build.add_argument("--json", action="store_true", help="print the manifest")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+    if args.cmd != "build":
+        parser.print_usage(sys.stderr)
+        sys.exit(1)
+    if args.max_bytes <= 0:
+        print("error: --max-bytes must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        manifest = build(args.base, args.max_bytes)
+    except subprocess.CalledProcessError as e:
+        print(f"error: git {' '.join(e.cmd[1:])}: {e.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(manifest))
+        return
+    if not manifest["files"]:
+        print("no changes to review")
+        return
+    print(f"artifact: {manifest['dir']}{' (cached)' if manifest['cached'] else ''}")
+    print(f"index: {manifest['index']}")
+    for reviewer, names in manifest["reviewers"].items():
+        paths = " ".join(manifest["shards"][n]["path"] for n in names) or "(index only)"
+        print(f"{reviewer}: {paths}")
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import tempfile
+    import unittest
+
+    class TestCategory(unittest.TestCase):
+        def test_categories(self) -> None:
+            cases = {
+                "pkg/server.go": "code", "pkg/server_test.go": "tests", "tests/test-exec.sh": "tests",
+                "src/test_api.py": "tests", "web/app.spec.ts": "tests", "pkg/testdata/in.json": "tests",
+                "README.md": "docs", "docs/usage.txt": "docs", "LICENSE": "docs", "CHANGELOG.md": "docs",
+                "agents/quality.txt": "code", "latest.go": "code", "contest/main.go": "code",
+            }
+            for path, cat in cases.items():
+                self.assertEqual(category(path), cat, path)
+
+    class TestBalance(unittest.TestCase):
+        def test_no_shard_exceeds_limit_unless_one_file_does(self) -> None:
+            sections = [{"path": f"f{i}", "bytes": b} for i, b in enumerate([70, 10, 40, 30, 60, 20, 50])]
+            shards = balance(sections, 100)
+            self.assertEqual(len(shards), 3)
+            self.assertEqual(sorted(s["path"] for shard in shards for s in shard), sorted(s["path"] for s in sections))
+            self.assertTrue(all(sum(s["bytes"] for s in shard) <= 100 for shard in shards))
+            for shard in shards:  # diff order is kept inside a shard
+                self.assertEqual([s["path"] for s in shard], sorted(s["path"] for s in shard))
+            self.assertEqual(len(balance([{"path": "big", "bytes": 500}], 100)), 1)
+
+    class TestCleanSections(unittest.TestCase):
+        def test_matches_git_review_format(self) -> None:
+            raw = ("diff --git a/a.py b/a.py\nindex 1..2 100644\n--- a/a.py\n+++ b/a.py\n"
+                   "@@ -1,2 +1,2 @@ def f():\n-    return 1\n+    return 2\n     pass\n"
+                   "diff --git a/new.md b/new.md\nnew file mode 100644\n--- /dev/null\n+++ b/new.md\n@@ -0,0 +1 @@\n+hi\n")
+            sections = clean_sections(raw, {"a.py": "modified", "new.md": "new"})
+            self.assertEqual(sections[0]["text"], "=== a.py (modified) ===\n\n··· def f():\n-    return 1\n+    return 2\n     pass\n")
+            self.assertEqual((sections[0]["added"], sections[0]["deleted"]), (1, 1))
+            self.assertEqual(sections[1]["text"], "=== new.md (new) ===\n\n···\n+hi\n")
+            self.assertEqual(sections[1]["category"], "docs")
+
+    class TestBuild(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="diff-shards-test-"))
+            self.old_cwd = os.getcwd()
+            os.chdir(self.dir)
+            for cmd in (["init", "-q", "-b", "master"], ["config", "user.email", "t@t"], ["config", "user.name", "t"],
+                        ["config", "commit.gpgsign", "false"]):
+                git(*cmd)
+            Path("main.go").write_text("package main\n")
+            git("add", "-A")
+            git("commit", "-q", "-m", "init")
+            git("checkout", "-q", "-b", "feature")
+            Path("main.go").write_text("package main\n\nfunc main() {}\n")
+            for i in range(4):
+                Path(f"lib{i}.go").write_text(f"package main\n// {'x' * 200}\nvar v{i} = {i}\n")
+            Path("lib_test.go").write_text("package main\n")
+            Path("README.md").write_text("# readme\n")
+            git("add", "-A")
+            git("commit", "-q", "-m", "feature")
+
+        def tearDown(self) -> None:
+            os.chdir(self.old_cwd)
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def test_shards_index_and_reuse(self) -> None:
+            manifest = build("master", 600)
+            self.assertFalse(manifest["cached"])
+            out = Path(manifest["dir"])
+            self.assertEqual(out.parent, self.dir / ".git" / "exec-review")
+            self.assertEqual(manifest["reviewers"]["quality"], ["code-1", "code-2"])
+            self.assertEqual(manifest["reviewers"]["testing"], ["tests-1"])
+            self.assertEqual(manifest["reviewers"]["documentation"], ["docs-1"])
+            code = "".join((out / f"code-{n}.diff").read_text() for n in (1, 2))
+            for name in ("main.go", "lib0.go", "lib3.go"):
+                self.assertEqual(code.count(f"=== {name} ("), 1)
+            self.assertNotIn("lib_test.go", code)
+            self.assertIn("=== lib_test.go (new) ===", (out / "tests-1.diff").read_text())
+            index = (out / "index.md").read_text()
+            self.assertIn("| README.md | new | +1/-0 | docs-1 |", index)
+            self.assertIn("| main.go | modified | +2/-0 |", index)
+            self.assertEqual((out / "full.diff").read_text().count("=== "), 7)
+            self.assertEqual(json.loads((out / "manifest.json").read_text())["index"], str(out / "index.md"))
+            self.assertEqual(list(out.parent.glob(".*")), [])
+            self.assertTrue(build("master", 600)["cached"])
+
+        def test_new_head_builds_new_artifact_and_prunes(self) -> None:
+            first = build("master", DEFAULT_MAX_BYTES)
+            self.assertEqual(first["reviewers"]["quality"], ["code-1"])
+            for i in range(KEEP_ARTIFACTS + 1):
+                Path("main.go").write_text(f"package main\n// {i}\n")
+                git("commit", "-q", "-am", f"fix {i}")
+                latest = build("master", DEFAULT_MAX_BYTES)
+                self.assertFalse(latest["cached"])
+            self.assertTrue(Path(latest["dir"]).is_dir())
+            self.assertFalse(Path(first["dir"]).exists())
+            self.assertEqual(len(list((self.dir / ".git" / "exec-review").iterdir())), KEEP_ARTIFACTS)
+
+        def test_no_changes(self) -> None:
+            git("checkout", "-q", "master")
+            manifest = build("master", DEFAULT_MAX_BYTES)
+            self.assertEqual((manifest["files"], manifest["reviewers"]["testing"]), ([], []))
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestCategory, TestBalance, TestCleanSections, TestBuild]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
@@ -0,0 +1,20 @@
+# shellcheck shell=bash
+# sourced by the exec scripts that run hg; not executed on its own.
+# every hg startup pays 150-400 ms of python import before doing any work, and the
+# exec skill runs these helpers for every task. chg is mercurial's own command-server
+# client: the first call forks a persistent `hg serve --cmdserver chgunix` daemon and
+# later calls hand their argv to it over a unix socket, so the startup cost is paid
+# once per session instead of once per command. the daemon reloads itself when the
+# repo config or extensions change and exits after chgserver.idletimeout.
+# EXEC_HG overrides the choice (e.g. EXEC_HG=hg to bypass chg).
+
+if [ -z "${EXEC_HG:-}" ]; then
+    if command -v chg >/dev/null 2>&1; then
+        EXEC_HG=chg
+    else
+        EXEC_HG=hg
+    fi
+fi
+
+# shadow hg for the sourcing script so its hg calls read as plain hg
+hg() { command "$EXEC_HG" "$@"; }
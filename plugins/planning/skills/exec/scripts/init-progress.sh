@@ -1,7 +1,9 @@
 #!/bin/bash
-# initialize the progress file with a header
+# initialize the progress file with a header, and its .jsonl event sidecar
 # usage: init-progress.sh <progress-file> <plan-path> <branch-name>
 
+# shellcheck disable=SC2034,SC2154 # the progress_* state is shared with progress-events.sh
+
 set -e
 
 file="$1"
@@ -13,12 +15,28 @@ if [ -z "$file" ] || [ -z "$plan" ] || [ -z "$branch" ]; then
     exit 1
 fi
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/progress-events.sh"
+progress_open "$file"
+
+progress_clock
+progress_lock
+progress_seq=0
+progress_start=$progress_now
+progress_t=0
+progress_tasks=""
+progress_events=""
+progress_event start null "plan $plan on branch $branch"
+
 cat > "$file" <<EOF
 # progress
 Plan: $plan
 Branch: $branch
-Started: $(date '+%Y-%m-%d %H:%M:%S')
+Started: $progress_date
 ---
 EOF
+printf '%s' "$progress_events" >"$progress_sidecar"
+progress_save
 
 echo "$file"
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""plan-status.py - compact progress status of a plan file for the exec task loop.
+
+parses the plan's task sections (`### Task N: <title>` or `### Iteration N: <title>`,
+each running to the next heading of level 1-3) and prints one line of JSON:
+
+    total       number of task sections
+    complete    sections with no `[ ]` checkbox left
+    next        first section with a `[ ]` checkbox left: {"id", "title", "pending"},
+                pending being the text of its open items; null when all are done
+    ready       ids of the open sections whose dependencies are all complete, the
+                ones that may run at the same time
+    tasks       per section {"id", "done", "open"} checkbox counts
+    changed     ids of sections whose content differs from the previous call for
+                this plan, every id on the first call; "removed" lists ids gone since
+
+checkboxes inside fenced code blocks are examples, not progress, and are skipped.
+
+a section may declare what it needs with a `**Depends on:** Task 1, Task 3` line
+(`none` for nothing, bare numbers for sections of the same kind). a section without
+one depends on every section before it, so a plan with no annotations runs strictly
+in order and `ready` only ever holds `next`. unknown ids are dropped and reported
+under "warnings".
+
+with --take SRC --task ID, the section ID of the plan is replaced by the section ID
+of SRC, a worktree's copy of the plan, and the status is printed afterwards. this
+is the single writer of checkbox updates for tasks run in parallel worktrees
+(see task-worktree.sh): writes are serialized under a lock and land with one
+rename, so the plan is never left half written. exits 2 when the taken section
+still has open checkboxes, so the caller can retry the task.
+
+the parse is cached in $TMPDIR/exec-plan-status-<uid>/<hash of the plan path>.json.
+a plan whose size and mtime match the cache is not read at all; one whose mtime is
+within a second of the cache write is re-read anyway, since an edit in the same
+mtime tick would otherwise go unseen (git's "racy" index entries). a plan that was
+read but hashes the same as before is not parsed again.
+
+usage:
+    plan-status.py <plan-file> [--no-cache]
+    plan-status.py <plan-file> --take <src-plan> --task <id>
+    plan-status.py --test                     # run unit tests
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+CACHE_VERSION = 2
+RACY_NS = 1_000_000_000
+HEADER_RE = re.compile(r"^###\s+(Task|Iteration)\s+([^:\s]+)\s*:\s*(.*?)\s*$")
+HEADING_RE = re.compile(r"^#{1,3}\s")
+CHECKBOX_RE = re.compile(r"^\s*[-*+]\s+\[([ xX])\]\s*(.*?)\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+DEPENDS_RE = re.compile(r"^\s*(?:[-*+]\s+)?\**depends on\s*:?\**\s*:?\s*(.*?)\s*$", re.IGNORECASE)
+DEP_REF_RE = re.compile(r"(?:(Task|Iteration)\s+)?([0-9][^,\s]*)", re.IGNORECASE)
+
+
+def parse_plan(text: str) -> list[dict]:
+    """task sections in plan order: {"id", "title", "done", "open", "pending", "deps", "sha"},
+    deps being the ids of a `Depends on:` line, None without one."""
+    tasks: list[dict] = []
+    current = None
+    lines: list[str] = []
+    fence = None
+
+    def close() -> None:
+        if current is not None:
+            current["sha"] = hashlib.sha1("\n".join(lines).encode()).hexdigest()[:16]
+            tasks.append(current)
+
+    for line in text.splitlines():
+        m = FENCE_RE.match(line)
+        if m:
+            fence = None if fence == m.group(1) else fence or m.group(1)
+        elif fence is None:
+            header = HEADER_RE.match(line)
+            if header or HEADING_RE.match(line):
+                close()
+                current, lines = None, []
+                if header:
+                    current = {"id": f"{header.group(1)} {header.group(2)}", "title": header.group(3),
+                               "done": 0, "open": 0, "pending": [], "deps": None}
+            elif current is not None:
+                box = CHECKBOX_RE.match(line)
+                depends = None if box else DEPENDS_RE.match(line)
+                refs = DEP_REF_RE.findall(depends.group(1)) if depends else []
+                # prose that merely mentions "depends on" names no section and is not "none"
+                if refs or (depends and depends.group(1).strip("*. ").lower() == "none"):
+                    kind = current["id"].split()[0]
+                    current["deps"] = [f"{(k or kind).capitalize()} {n.rstrip('.')}" for k, n in refs]
+                if box and box.group(1) == " ":
+                    current["open"] += 1
+                    current["pending"].append(box.group(2))
+                elif box:
+                    current["done"] += 1
+        if current is not None:
+            lines.append(line)
+    close()
+    return tasks
+
+
+def ready_tasks(tasks: list[dict]) -> tuple[list[str], list[str]]:
+    """(ids of open sections whose dependencies are complete, warnings about unknown ids)."""
+    ids = [t["id"] for t in tasks]
+    complete = {t["id"] for t in tasks if not t["open"]}
+    ready, warnings = [], []
+    for i, t in enumerate(tasks):
+        deps = ids[:i] if t["deps"] is None else t["deps"]
+        unknown = [d for d in deps if d not in ids]
+        if unknown:
+            warnings.append(f"{t['id']}: unknown dependency {', '.join(unknown)}")
+        if t["open"] and all(d in complete for d in deps if d in ids):
+            ready.append(t["id"])
+    return ready, warnings
+
+
+def section_span(text: str, task_id: str) -> tuple[int, int] | None:
+    """(start, end) line indexes of section task_id in text, None when it has no such section."""
+    lines = text.splitlines(keepends=True)
+    start = None
+    fence = None
+    for i, line in enumerate(lines):
+        m = FENCE_RE.match(line)
+        if m:
+            fence = None if fence == m.group(1) else fence or m.group(1)
+            continue
+        if fence is not None:
+            continue
+        header = HEADER_RE.match(line)
+        if start is not None and (header or HEADING_RE.match(line)):
+            return start, i
+        if header and f"{header.group(1)} {header.group(2)}" == task_id:
+            start = i
+    return (start, len(lines)) if start is not None else None
+
+
+def take_section(plan: Path, src: Path, task_id: str) -> bool:
+    """replace section task_id of plan with the one in src under a lock; False when either lacks it."""
+    import fcntl
+
+    src_text = src.read_text()
+    src_span = section_span(src_text, task_id)
+    lock = cache_file(plan).with_suffix(".lock")
+    lock.parent.mkdir(mode=0o700, exist_ok=True)
+    with lock.open("w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        text = plan.read_text()
+        span = section_span(text, task_id)
+        if src_span is None or span is None:
+            return False
+        lines = text.splitlines(keepends=True)
+        section = src_text.splitlines(keepends=True)[src_span[0]:src_span[1]]
+        if span[1] < len(lines) and section and not section[-1].endswith("\n"):
+            section[-1] += "\n"
+        tmp = plan.with_name(f".{plan.name}.{os.getpid()}")
+        tmp.write_text("".join(lines[:span[0]] + section + lines[span[1]:]))
+        os.chmod(tmp, plan.stat().st_mode & 0o7777)
+        tmp.replace(plan)
+    return True
+
+
+def cache_file(plan: Path) -> Path:
+    base = Path(os.environ.get("TMPDIR") or "/tmp") / f"exec-plan-status-{os.getuid()}"
+    return base / f"{hashlib.sha1(str(plan).encode()).hexdigest()[:16]}.json"
+
+
+def load_cache(path: Path | None, plan: Path) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION or data.get("plan") != str(plan):
+        return {}
+    return data
+
+
+def save_cache(path: Path | None, data: dict) -> None:
+    """best-effort: an unwritable $TMPDIR only costs the next call a full parse."""
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def plan_status(plan: Path, cache: dict) -> tuple[dict, dict]:
+    """(status, new cache) of plan, reusing cache when the plan has not changed."""
+    st = plan.stat()
+    now = time.time_ns()
+    if (cache.get("size") == st.st_size and cache.get("mtime_ns") == st.st_mtime_ns
+            and st.st_mtime_ns + RACY_NS < cache.get("checked_ns", 0)):
+        tasks = cache["tasks"]
+        sha = cache["sha"]
+    else:
+        text = plan.read_bytes()
+        sha = hashlib.sha256(text).hexdigest()
+        tasks = cache["tasks"] if cache.get("sha") == sha else parse_plan(text.decode("utf-8", "replace"))
+
+    before = {t["id"]: t["sha"] for t in cache.get("tasks", [])}
+    ids = {t["id"] for t in tasks}
+    pending = next((t for t in tasks if t["open"]), None)
+    ready, warnings = ready_tasks(tasks)
+    status = {
+        "total": len(tasks),
+        "complete": sum(1 for t in tasks if not t["open"]),
+        "next": {k: pending[k] for k in ("id", "title", "pending")} if pending else None,
+        "ready": ready,
+        "tasks": [{k: t[k] for k in ("id", "done", "open")} for t in tasks],
+        "changed": [t["id"] for t in tasks if before.get(t["id"]) != t["sha"]],
+    }
+    removed = [i for i in before if i not in ids]
+    if removed:
+        status["removed"] = removed
+    if warnings:
+        status["warnings"] = warnings
+    new_cache = {"version": CACHE_VERSION, "plan": str(plan), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                 "checked_ns": now, "sha": sha, "tasks": tasks}
+    return status, new_cache
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="compact JSON progress status of a plan's task sections")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    parser.add_argument("--no-cache", action="store_true", help="parse the plan in full, leave the cache alone")
+    parser.add_argument("--take", metavar="SRC", help="replace section --task of the plan with the one in SRC")
+    parser.add_argument("--task", metavar="ID", help="section for --take, e.g. \"Task 3\"")
+    parser.add_argument("plan", nargs="?", help="plan file")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+    if not args.plan:
+        parser.error("plan file is required")
+    if bool(args.take) != bool(args.task):
+        parser.error("--take and --task go together")
+
+    plan = Path(args.plan).resolve()
+    if not plan.is_file():
+        print(f"error: plan file not found: {args.plan}", file=sys.stderr)
+        sys.exit(1)
+    if args.take and not take_section(plan, Path(args.take), args.task):
+        print(f"error: no section {args.task} in both {args.plan} and {args.take}", file=sys.stderr)
+        sys.exit(1)
+    path = None if args.no_cache else cache_file(plan)
+    status, cache = plan_status(plan, load_cache(path, plan))
+    save_cache(path, cache)
+    print(json.dumps(status, separators=(",", ":"), ensure_ascii=False))
+    if args.take and any(t["id"] == args.task and t["open"] for t in status["tasks"]):
+        sys.exit(2)
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import subprocess
+    import tempfile
+    import unittest
+
+    plan_text = """# Plan: parser
+
+## Overview
+
+- [ ] not a task item
+
+### Task 1: add parser
+- [x] write parser
+- [x] add tests
+
+### Task 2: wire it up
+- [x] call parser
+- [ ] handle errors
+  - [ ] log and exit
+
+```markdown
+- [ ] example inside a fence
+```
+
+## Notes
+- [ ] not a task item either
+
+### Iteration 3: polish
+* [X] done
+"""
+
+    class TestParse(unittest.TestCase):
+        def test_sections_and_counts(self) -> None:
+            tasks = parse_plan(plan_text)
+            self.assertEqual([(t["id"], t["title"], t["done"], t["open"]) for t in tasks],
+                             [("Task 1", "add parser", 2, 0), ("Task 2", "wire it up", 1, 2),
+                              ("Iteration 3", "polish", 1, 0)])
+            self.assertEqual(tasks[1]["pending"], ["handle errors", "log and exit"])
+
+        def test_fenced_header_is_not_a_section(self) -> None:
+            tasks = parse_plan("### Task 1: a\n- [ ] x\n```\n### Task 2: b\n- [ ] y\n```\n")
+            self.assertEqual([(t["id"], t["open"]) for t in tasks], [("Task 1", 1)])
+
+        def test_section_sha_ignores_other_sections(self) -> None:
+            before = parse_plan(plan_text)
+            after = parse_plan(plan_text.replace("- [ ] handle errors", "- [x] handle errors"))
+            self.assertEqual([a["sha"] == b["sha"] for a, b in zip(before, after)], [True, False, True])
+
+    class TestDependencies(unittest.TestCase):
+        def deps(self, *sections: str) -> list[dict]:
+            return parse_plan("".join(f"### Task {i}: t{i}\n{body}\n" for i, body in enumerate(sections, 1)))
+
+        def test_annotations(self) -> None:
+            tasks = self.deps("**Depends on:** none\n- [ ] a", "Depends on: Task 1, 3.\n- [ ] b",
+                              "- depends on: Iteration 2\n- [ ] c", "This depends on the API.\n- [ ] d")
+            self.assertEqual([t["deps"] for t in tasks], [[], ["Task 1", "Task 3"], ["Iteration 2"], None])
+
+        def test_unannotated_plan_is_strictly_ordered(self) -> None:
+            self.assertEqual(ready_tasks(self.deps("- [ ] a", "- [ ] b", "- [ ] c")), (["Task 1"], []))
+
+        def test_independent_tasks_are_ready_together(self) -> None:
+            tasks = self.deps("- [x] base", "**Depends on:** Task 1\n- [ ] a", "**Depends on:** Task 1\n- [ ] b",
+                              "**Depends on:** Task 2\n- [ ] after a", "- [ ] verify everything")
+            self.assertEqual(ready_tasks(tasks), (["Task 2", "Task 3"], []))
+            tasks[1]["open"] = 0
+            self.assertEqual(ready_tasks(tasks)[0], ["Task 3", "Task 4"], "the barrier task waits for all before it")
+
+        def test_unknown_dependency_is_dropped_with_a_warning(self) -> None:
+            tasks = self.deps("**Depends on:** Task 9\n- [ ] a")
+            self.assertEqual(ready_tasks(tasks), (["Task 1"], ["Task 1: unknown dependency Task 9"]))
+
+    class TestStatus(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="plan-status-test-"))
+            self.addCleanup(shutil.rmtree, self.dir, True)
+            self.plan = self.dir / "plan.md"
+            self.plan.write_text(plan_text)
+
+        def age(self, seconds: int = 10) -> None:
+            # move the plan's mtime out of the racy window so the stat check applies
+            t = time.time() - seconds
+            os.utime(self.plan, (t, t))
+
+        def test_next_and_changed(self) -> None:
+            self.age()
+            status, cache = plan_status(self.plan, {})
+            self.assertEqual(status["next"], {"id": "Task 2", "title": "wire it up",
+                                              "pending": ["handle errors", "log and exit"]})
+            self.assertEqual((status["total"], status["complete"]), (3, 2))
+            self.assertEqual(status["changed"], ["Task 1", "Task 2", "Iteration 3"])
+            status, cache = plan_status(self.plan, cache)
+            self.assertEqual(status["changed"], [])
+            self.plan.write_text(plan_text.replace("- [ ]", "- [x]"))
+            self.age(5)
+            status, _ = plan_status(self.plan, cache)
+            self.assertIsNone(status["next"])
+            self.assertEqual(status["changed"], ["Task 2"])
+
+        def test_unchanged_plan_is_not_read(self) -> None:
+            self.age()
+            _, cache = plan_status(self.plan, {})
+            cache["tasks"][0]["title"] = "from cache"
+            cache["tasks"][0]["open"] = 1
+            status, _ = plan_status(self.plan, cache)
+            self.assertEqual(status["next"]["title"], "from cache", "size and mtime match: served from the cache")
+
+        def test_racy_mtime_is_rehashed(self) -> None:
+            _, cache = plan_status(self.plan, {})
+            self.plan.write_text(plan_text.replace("handle errors", "handle ERRORS"))
+            st = self.plan.stat()
+            cache["size"], cache["mtime_ns"] = st.st_size, st.st_mtime_ns
+            status, _ = plan_status(self.plan, cache)
+            self.assertEqual(status["next"]["pending"][0], "handle ERRORS")
+            self.assertEqual(status["changed"], ["Task 2"])
+
+        def test_removed_sections(self) -> None:
+            _, cache = plan_status(self.plan, {})
+            self.plan.write_text(plan_text.split("## Notes")[0])
+            status, _ = plan_status(self.plan, cache)
+            self.assertEqual(status["removed"], ["Iteration 3"])
+            self.assertEqual(status["changed"], [])
+
+        def test_take_replaces_only_the_section(self) -> None:
+            src = self.dir / "worktree-plan.md"
+            src.write_text(plan_text.replace("- [ ] handle errors", "- [x] handle errors")
+                           .replace("  - [ ] log and exit", "  - [x] log and exit (logged)")
+                           .replace("- [x] write parser", "- [ ] write parser"))
+            self.assertTrue(take_section(self.plan, src, "Task 2"))
+            text = self.plan.read_text()
+            self.assertIn("- [x] log and exit (logged)", text)
+            self.assertIn("- [x] write parser", text, "other sections of the source must not leak in")
+            self.assertEqual(text.replace("- [x] handle errors", "- [ ] handle errors")
+                             .replace("  - [x] log and exit (logged)", "  - [ ] log and exit"), plan_text)
+            self.assertFalse(take_section(self.plan, src, "Task 7"))
+
+        def test_take_cli_exit_codes(self) -> None:
+            env = dict(os.environ, TMPDIR=str(self.dir))
+            src = self.dir / "worktree-plan.md"
+            src.write_text(plan_text.replace("- [ ] handle errors", "- [x] handle errors"))
+            cmd = [sys.executable, str(Path(__file__).resolve()), str(self.plan), "--take", str(src), "--task", "Task 2"]
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 2, "a section with open items left must fail the take")
+            src.write_text(plan_text.replace("- [ ]", "- [x]"))
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 0, out.stderr)
+            self.assertEqual(json.loads(out.stdout)["ready"], [])
+
+        def test_cli_and_cache_file(self) -> None:
+            env = dict(os.environ, TMPDIR=str(self.dir))
+            cmd = [sys.executable, str(Path(__file__).resolve()), str(self.plan)]
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 0, out.stderr)
+            self.assertEqual(json.loads(out.stdout)["next"]["id"], "Task 2")
+            self.assertTrue(cache_file(self.plan.resolve()).name in
+                            os.listdir(self.dir / f"exec-plan-status-{os.getuid()}"))
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            self.assertEqual(json.loads(out.stdout)["changed"], [])
+            out = subprocess.run(cmd + ["--no-cache"], capture_output=True, text=True, env=env)
+            self.assertEqual(len(json.loads(out.stdout)["changed"]), 3)
+            out = subprocess.run([sys.executable, str(Path(__file__).resolve()), str(self.dir / "nope.md")],
+                                 capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 1)
+            self.assertIn("plan file not found", out.stderr)
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestParse, TestDependencies, TestStatus]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
@@ -0,0 +1,155 @@
+# shellcheck shell=bash
+# sourced by init-progress.sh and append-progress.sh; not executed on its own.
+# every entry of the markdown progress file is also recorded as one JSON event in a
+# sidecar beside it (progress-<plan>.txt -> progress-<plan>.jsonl); progress-log.py
+# documents the fields and reads them back. subagents append once per header and
+# once per detail block, so the events are built with shell builtins and an append
+# forks only date and flock, as the plain markdown append did before the sidecar.
+# the running counters (last seq and t, first t of each task) live in a one-line
+# .state file read with `read`; a missing or damaged one is rebuilt from the
+# sidecar by progress-log.py, once.
+# shellcheck disable=SC2034 # progress_* and kind/task are read by the sourcing scripts
+
+PROGRESS_KINDS=" start task decision deviation review fixer phase block end note "
+PROGRESS_TASK_RE='(^|[^[:alnum:]_])[Tt][Aa][Ss][Kk] ([0-9]+)([^[:alnum:]_]|$)'
+PROGRESS_END_RE='(^|[^[:alnum:]_])(completed|FAILED)([^[:alnum:]_]|$)'
+
+# progress_open <progress-file> — set the sidecar and state paths
+progress_open() {
+    progress_file=$1
+    case "${progress_file##*/}" in
+    *.jsonl)
+        echo "error: progress file must not itself be .jsonl: $progress_file" >&2
+        exit 1
+        ;;
+    ?*.*) progress_sidecar="${progress_file%.*}.jsonl" ;;
+    *) progress_sidecar="$progress_file.jsonl" ;;
+    esac
+    progress_state="$progress_sidecar.state"
+}
+
+# progress_clock — one date call gives the markdown stamp, the event ts and the epoch
+progress_clock() {
+    local now
+    now=$(date '+%Y-%m-%d %H:%M:%S %s')
+    progress_date="${now% *}"
+    progress_stamp="[$progress_date]"
+    progress_ts="${progress_date/ /T}"
+    progress_now="${now##* }"
+}
+
+# progress_lock — exclusive lock on the sidecar until the script exits, so parallel
+# subagents never interleave lines or counters
+progress_lock() {
+    local tries=0 stale=$((${PROGRESS_LOCK_WAIT:-10} * 20))
+    exec 9>>"$progress_sidecar"
+    if command -v flock >/dev/null 2>&1; then
+        flock 9
+        return
+    fi
+    # no flock(1) on macOS; mkdir is atomic everywhere. a lock still held after
+    # PROGRESS_LOCK_WAIT seconds (appends hold it for milliseconds) was left by a
+    # killed writer: it is removed and then taken like a free one, so of two
+    # waiters that both find it stale only one mkdir wins. the trap is set only
+    # once the lock is ours, so a writer killed while waiting removes nothing
+    until mkdir "$progress_sidecar.lock" 2>/dev/null; do
+        tries=$((tries + 1))
+        if [ "$tries" -ge "$stale" ]; then
+            rmdir "$progress_sidecar.lock" 2>/dev/null || true
+            tries=0
+        fi
+        sleep 0.05
+    done
+    trap 'rmdir "$progress_sidecar.lock" 2>/dev/null' EXIT
+}
+
+# progress_load — read the counters; progress-log.py rebuilds them when the state
+# file is missing or damaged
+progress_load() {
+    local line=""
+    if [ -f "$progress_state" ]; then
+        IFS= read -r line <"$progress_state" || true
+    fi
+    case "$line" in
+    [0-9]*" "[0-9]*" "[0-9]*) ;;
+    *) line=$(python3 "$SCRIPT_DIR/progress-log.py" state "$progress_file") ;;
+    esac
+    read -r progress_seq progress_start progress_t progress_tasks <<<"$line"
+    if [ "$progress_start" = "-" ]; then
+        progress_start=$progress_now
+    fi
+}
+
+# progress_json <text> — set json to the text as a JSON string
+progress_json() {
+    local s=$1 c hex
+    s=${s//\\/\\\\}
+    s=${s//\"/\\\"}
+    s=${s//$'\n'/\\n}
+    s=${s//$'\t'/\\t}
+    s=${s//$'\r'/\\r}
+    # the other control characters are rare; escape them one by one
+    while [[ $s =~ [[:cntrl:]] ]]; do
+        c=${BASH_REMATCH[0]}
+        printf -v hex '\\u%04x' "'$c"
+        s=${s//"$c"/$hex}
+    done
+    json="\"$s\""
+}
+
+# progress_classify <message> — set kind and task from the prefixes the exec prompts use
+progress_classify() {
+    local m=$1
+    kind=note
+    task=null
+    if [[ $m =~ ^\[([A-Za-z0-9_]+)\] ]] && [[ $PROGRESS_KINDS == *" ${BASH_REMATCH[1]} "* ]]; then
+        kind=${BASH_REMATCH[1]}
+    elif [[ $m =~ ^---\ .*\ ---$ || $m =~ ^review\ phase\ [0-9] ]]; then
+        kind=phase
+    elif [ "$m" = "completed" ]; then
+        kind=end
+    elif [[ $m =~ ^$PROGRESS_TASK_RE ]]; then
+        kind=task
+    fi
+    if [[ $m =~ $PROGRESS_TASK_RE ]]; then
+        task=$((10#${BASH_REMATCH[2]}))
+    fi
+}
+
+# progress_event <kind> <task|null> <text> — add one event to progress_events,
+# advancing the counters; every event of one call shares the clock reading
+progress_event() {
+    local kind=$1 task=$2 text=$3 rest started dur="" json
+    progress_seq=$((progress_seq + 1))
+    if [ "$task" != null ]; then
+        case ",$progress_tasks," in
+        *",$task:"*)
+            rest=",$progress_tasks"
+            rest=${rest#*",$task:"}
+            started=${rest%%,*}
+            ;;
+        *)
+            started=$progress_t
+            progress_tasks="${progress_tasks:+$progress_tasks,}$task:$progress_t"
+            ;;
+        esac
+        if [ "$kind" = task ] && [[ $text =~ $PROGRESS_END_RE ]]; then
+            dur=", \"dur\": $((progress_t - started))"
+        fi
+    fi
+    progress_json "$text"
+    progress_events+="{\"seq\": $progress_seq, \"ts\": \"$progress_ts\", \"t\": $progress_t, \"kind\": \"$kind\", \"task\": $task$dur, \"text\": $json}"$'\n'
+}
+
+# progress_tick — seconds since the log started, never less than the last event's
+progress_tick() {
+    local t=$((progress_now - progress_start))
+    if [ "$t" -gt "$progress_t" ]; then
+        progress_t=$t
+    fi
+}
+
+# progress_save — write the counters back; the caller holds the lock
+progress_save() {
+    printf '%s %s %s %s\n' "$progress_seq" "$progress_start" "$progress_t" "$progress_tasks" >"$progress_state"
+}
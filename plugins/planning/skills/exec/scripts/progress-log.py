@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""progress-log.py - read the JSONL event sidecar of an exec progress file.
+
+the markdown progress file stays what agents and users read: a header, then one
+"[timestamp] message" line per event and verbatim blocks (review findings, fixer
+reports). init-progress.sh and append-progress.sh also write one JSON object per
+event to a sidecar next to it (progress-<plan>.txt -> progress-<plan>.jsonl), so
+the stats and completion steps can pick events by kind or task, or read the
+newest few, without parsing the whole growing markdown file.
+
+event fields:
+    seq     1-based sequence number, gap-free within one log
+    ts      wall-clock time, "YYYY-MM-DDTHH:MM:SS"
+    t       whole seconds since the log was started; never decreases, even if the
+            wall clock steps back between two appends
+    kind    start, task, decision, deviation, review, fixer, phase, block, end or note
+    task    task number the message names ("task 3: ...", "[task] Task 3: ..."), or null
+    dur     on a task's "completed" / "FAILED" event: seconds since that task's first event
+    text    the message, or the whole block for stdin appends
+
+the writers are shell (progress-events.sh), so an append starts no interpreter.
+each one takes an exclusive lock on the sidecar and keeps its running counters
+(last seq and t, first t of each task) in a one-line .state file, so an append
+never reads the sidecar. `state` rebuilds that line from the sidecar when the
+file is missing or damaged.
+
+usage:
+    progress-log.py tail <progress-file> [--last N] [--offset BYTES] [--kind KIND] [--task N]
+    progress-log.py state <progress-file>   # counters line, rebuilt from the sidecar
+    progress-log.py --test                  # run unit tests
+
+tail prints matching events as JSON lines. --last N reads the sidecar backwards
+from its end and stops after N matches. --offset BYTES starts at that byte of the
+sidecar and ends with a {"next_offset": N} line to pass to the next call, so a
+reader polling the log only ever reads what was appended since.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+KINDS = ("start", "task", "decision", "deviation", "review", "fixer", "phase", "block", "end", "note")
+TAIL_BLOCK = 64 * 1024
+
+
+def sidecar_path(progress: Path) -> Path:
+    """JSONL sidecar of a progress file: the same stem with a .jsonl suffix."""
+    if progress.suffix == ".jsonl":
+        raise ValueError(f"progress file must not itself be .jsonl: {progress}")
+    return progress.with_suffix(".jsonl")
+
+
+def state_path(progress: Path) -> Path:
+    """counter file kept beside the sidecar."""
+    return progress.with_suffix(".jsonl.state")
+
+
+def rebuild_state(progress: Path) -> str:
+    """the .state line, "<seq> <start> <t> <task>:<first t>,...", from the sidecar.
+    start is "-" when the sidecar has no events yet."""
+    seq, t, start = 0, 0, None
+    tasks: dict[int, int] = {}
+    try:
+        with sidecar_path(progress).open() as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                    seq, t = int(ev["seq"]), int(ev["t"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if start is None:
+                    start = int(time.mktime(time.strptime(ev["ts"], "%Y-%m-%dT%H:%M:%S"))) - t
+                if ev.get("task") is not None:
+                    tasks.setdefault(ev["task"], t)
+    except OSError:
+        pass
+    first = ",".join(f"{k}:{v}" for k, v in tasks.items())
+    return f"{seq} {'-' if start is None else start} {t} {first}".rstrip()
+
+
+def matches(ev: dict, kind: str | None, task: int | None) -> bool:
+    return (kind is None or ev.get("kind") == kind) and (task is None or ev.get("task") == task)
+
+
+def tail_last(sidecar: Path, n: int, kind: str | None = None, task: int | None = None) -> list[dict]:
+    """the last n matching events, reading the file backwards in blocks from its end."""
+    found: list[dict] = []
+    with sidecar.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0 and len(found) < n:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + rest
+            lines = chunk.split(b"\n")
+            # the first piece may be cut mid-line unless the start of the file was reached
+            rest = lines.pop(0) if pos > 0 else b""
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    continue
+                if matches(ev, kind, task):
+                    found.append(ev)
+                    if len(found) == n:
+                        break
+    return list(reversed(found))
+
+
+def tail_from(sidecar: Path, offset: int, kind: str | None = None, task: int | None = None) -> tuple[list[dict], int]:
+    """matching events from a byte offset on, and the offset after the last complete line.
+    a line still being written is left for the next call."""
+    found = []
+    with sidecar.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue
+            if matches(ev, kind, task):
+                found.append(ev)
+    return found, offset
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="read the JSONL event sidecar of an exec progress file")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    sub = parser.add_subparsers(dest="command")
+    p_tail = sub.add_parser("tail", help="print events as JSON lines")
+    p_tail.add_argument("progress")
+    p_tail.add_argument("--last", type=int, help="only the last N matching events")
+    p_tail.add_argument("--offset", type=int, help="start at this byte of the sidecar; ends with next_offset")
+    p_tail.add_argument("--kind", choices=KINDS)
+    p_tail.add_argument("--task", type=int)
+    p_state = sub.add_parser("state", help="print the append counters rebuilt from the sidecar")
+    p_state.add_argument("progress")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+
+    if args.command == "state":
+        print(rebuild_state(Path(args.progress)))
+        return
+
+    if args.command == "tail":
+        sidecar = sidecar_path(Path(args.progress))
+        if not sidecar.exists():
+            print(f"error: no event log: {sidecar}", file=sys.stderr)
+            sys.exit(1)
+        if args.offset is not None:
+            events, offset = tail_from(sidecar, args.offset, args.kind, args.task)
+            if args.last is not None:
+                events = events[-args.last:] if args.last > 0 else []
+        else:
+            events, offset = tail_last(sidecar, args.last or sys.maxsize, args.kind, args.task), None
+        for ev in events:
+            print(json.dumps(ev, ensure_ascii=False))
+        if offset is not None:
+            print(json.dumps({"next_offset": offset}))
+        return
+
+    parser.print_usage(sys.stderr)
+    sys.exit(1)
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import subprocess
+    import tempfile
+    import unittest
+
+    script_dir = Path(__file__).resolve().parent
+
+    def events_of(progress: Path) -> list[dict]:
+        return [json.loads(line) for line in sidecar_path(progress).read_text().splitlines()]
+
+    def run_script(name: str, *args: str, stdin: str = "", env: dict | None = None) -> str:
+        out = subprocess.run(["bash", str(script_dir / name), *args], input=stdin,
+                             capture_output=True, text=True, check=True, env=env)
+        return out.stdout
+
+    def without_flock(bin_dir: Path) -> dict:
+        """an environment whose PATH holds only the tools the scripts need, flock left out."""
+        bin_dir.mkdir()
+        for tool in ("bash", "date", "dirname", "mkdir", "rmdir", "sleep", "python3"):
+            (bin_dir / tool).symlink_to(shutil.which(tool))
+        return {**os.environ, "PATH": str(bin_dir), "PROGRESS_LOCK_WAIT": "1"}
+
+    def init(progress: Path) -> None:
+        run_script("init-progress.sh", str(progress), "docs/plans/plan.md", "feature")
+
+    def append(progress: Path, *message: str, stdin: str = "", events: bool = False) -> None:
+        run_script("append-progress.sh", *(["--events"] if events else []), str(progress), *message, stdin=stdin)
+
+    def shift_state(progress: Path, seconds: int) -> None:
+        """move the log's start, and every task's first event, back in time."""
+        seq, start, t, *tasks = state_path(progress).read_text().split()
+        state_path(progress).write_text(f"{seq} {int(start) - seconds} {t} {' '.join(tasks)}\n")
+
+    class TestAppend(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="progress-log-test-"))
+            self.progress = self.dir / "progress-plan.txt"
+            init(self.progress)
+
+        def tearDown(self) -> None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def test_init_writes_header_and_start_event(self) -> None:
+            text = self.progress.read_text()
+            self.assertRegex(text, r"^# progress\nPlan: docs/plans/plan.md\nBranch: feature\n"
+                                   r"Started: \d{4}-\d\d-\d\d \d\d:\d\d:\d\d\n---\n$")
+            (ev,) = events_of(self.progress)
+            self.assertEqual((ev["seq"], ev["kind"], ev["t"], ev["task"]), (1, "start", 0, None))
+            self.assertEqual(ev["text"], "plan docs/plans/plan.md on branch feature")
+            self.assertEqual(self.dir / "progress-plan.jsonl", sidecar_path(self.progress))
+
+        def test_prompt_prefixes(self) -> None:
+            lines = [
+                ("task 3: add parser", "task", 3),
+                ("[task] Task 3: add parser — completed", "task", 3),
+                ("[decision] task 2: kept the flag — lint", "decision", 2),
+                ("[deviation] fixer: skipped one — out of scope", "deviation", None),
+                ("--- review phase 1: comprehensive ---", "phase", None),
+                ("review phase 2: findings", "phase", None),
+                ("completed", "end", None),
+                ("finalize: completed", "note", None),
+                ("[bogus] x", "note", None),
+                ("see task 07 again", "note", 7),
+                ("subtask 4 and task 5a", "note", None),
+            ]
+            append(self.progress, stdin="".join(m + "\n" for m, _, _ in lines), events=True)
+            evs = events_of(self.progress)[1:]
+            self.assertEqual([(e["text"], e["kind"], e["task"]) for e in evs], lines)
+
+        def test_batch_keeps_markdown_format(self) -> None:
+            append(self.progress, stdin="task 1: parser\n\n   \n[decision] task 1: kept x — y", events=True)
+            lines = self.progress.read_text().splitlines()[-2:]
+            self.assertRegex(lines[0], r"^\[\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\] task 1: parser$")
+            self.assertTrue(lines[1].endswith("] [decision] task 1: kept x — y"))
+            evs = events_of(self.progress)
+            self.assertEqual([e["seq"] for e in evs], [1, 2, 3])
+            self.assertEqual([e["kind"] for e in evs], ["start", "task", "decision"])
+
+        def test_message_arguments_are_one_line(self) -> None:
+            append(self.progress, "--- review", "phase 1 ---")
+            self.assertTrue(self.progress.read_text().endswith("] --- review phase 1 ---\n"))
+            self.assertEqual(events_of(self.progress)[-1]["kind"], "phase")
+
+        def test_task_duration(self) -> None:
+            append(self.progress, "task 4: x")
+            shift_state(self.progress, 100)
+            append(self.progress, "[task] Task 4: x — completed")
+            first, done = events_of(self.progress)[1:]
+            self.assertNotIn("dur", first)
+            self.assertGreaterEqual(done["t"], 100)
+            self.assertEqual(done["dur"], done["t"] - first["t"])
+
+        def test_time_never_goes_back(self) -> None:
+            shift_state(self.progress, 50)
+            append(self.progress, "a")
+            shift_state(self.progress, -500)
+            append(self.progress, "b")
+            a, b = events_of(self.progress)[1:]
+            self.assertGreaterEqual(a["t"], 50)
+            self.assertEqual(b["t"], a["t"])
+
+        def test_block_is_verbatim(self) -> None:
+            block = "[review] iteration 1 findings:\n- a \"quoted\" \\bug\\ & \tcontrol \x01\n\n"
+            append(self.progress, stdin=block)
+            self.assertTrue(self.progress.read_text().endswith(block))
+            ev = events_of(self.progress)[-1]
+            self.assertEqual((ev["kind"], ev["text"]), ("review", block.rstrip("\n")))
+            append(self.progress, stdin="  plain notes\n")
+            self.assertEqual(events_of(self.progress)[-1]["kind"], "block")
+
+        def test_empty_input_writes_nothing(self) -> None:
+            before = self.progress.read_text()
+            append(self.progress, stdin="")
+            append(self.progress, stdin="\n\n", events=True)
+            self.assertEqual(self.progress.read_text(), before)
+            self.assertEqual(len(events_of(self.progress)), 1)
+
+        def test_state_rebuilt_from_sidecar(self) -> None:
+            append(self.progress, "task 2: a")
+            line = state_path(self.progress).read_text().strip()
+            self.assertEqual(rebuild_state(self.progress), line)
+            state_path(self.progress).unlink()
+            append(self.progress, "[task] Task 2: a — completed")
+            evs = events_of(self.progress)
+            self.assertEqual(evs[-1]["seq"], 3)
+            self.assertIn("dur", evs[-1])
+            state_path(self.progress).write_text("garbage\n")
+            append(self.progress, "b")
+            self.assertEqual(events_of(self.progress)[-1]["seq"], 4)
+
+        def test_parallel_appends_do_not_interleave(self) -> None:
+            procs = [subprocess.Popen(["bash", str(script_dir / "append-progress.sh"), str(self.progress),
+                                       f"task {i}: parallel"]) for i in range(1, 13)]
+            for p in procs:
+                self.assertEqual(p.wait(), 0)
+            evs = events_of(self.progress)
+            self.assertEqual([e["seq"] for e in evs], list(range(1, 14)))
+            self.assertEqual(sorted(e["task"] for e in evs[1:]), list(range(1, 13)))
+
+        def test_mkdir_lock_without_flock(self) -> None:
+            env = without_flock(self.dir / "bin")
+            lock = Path(f"{sidecar_path(self.progress)}.lock")
+            procs = [subprocess.Popen(["bash", str(script_dir / "append-progress.sh"), str(self.progress),
+                                       f"task {i}: parallel"], env=env) for i in range(1, 7)]
+            for p in procs:
+                self.assertEqual(p.wait(), 0)
+            evs = events_of(self.progress)
+            self.assertEqual([e["seq"] for e in evs], list(range(1, 8)))
+            self.assertFalse(lock.exists())
+
+            # a writer killed while waiting leaves the holder's lock alone
+            lock.mkdir()
+            waiter = subprocess.Popen(["bash", str(script_dir / "append-progress.sh"), str(self.progress), "x"],
+                                      env=env)
+            time.sleep(0.3)
+            waiter.terminate()
+            waiter.wait()
+            self.assertTrue(lock.is_dir())
+
+            # a lock outliving PROGRESS_LOCK_WAIT is stale and taken over
+            run_script("append-progress.sh", str(self.progress), "after stale lock", env=env)
+            self.assertEqual(events_of(self.progress)[-1]["text"], "after stale lock")
+            self.assertFalse(lock.exists())
+
+    class TestTail(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="progress-log-test-"))
+            self.progress = self.dir / "progress-plan.txt"
+            init(self.progress)
+            append(self.progress, stdin="".join(f"task {i}: t{i}\n" for i in range(1, 301)), events=True)
+            self.sidecar = sidecar_path(self.progress)
+
+        def tearDown(self) -> None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def test_last_across_blocks(self) -> None:
+            global TAIL_BLOCK
+            old, TAIL_BLOCK = TAIL_BLOCK, 100  # force reads that split lines
+            try:
+                evs = tail_last(self.sidecar, 3)
+                self.assertEqual([e["seq"] for e in evs], [299, 300, 301])
+                self.assertEqual(len(tail_last(self.sidecar, 1000)), 301)
+                self.assertEqual([e["seq"] for e in tail_last(self.sidecar, 2, kind="start")], [1])
+                self.assertEqual([e["task"] for e in tail_last(self.sidecar, 5, task=7)], [7])
+            finally:
+                TAIL_BLOCK = old
+
+        def test_offset_resumes(self) -> None:
+            evs, offset = tail_from(self.sidecar, 0)
+            self.assertEqual(len(evs), 301)
+            self.assertEqual(offset, self.sidecar.stat().st_size)
+            self.assertEqual(tail_from(self.sidecar, offset), ([], offset))
+            append(self.progress, "completed")
+            evs, _ = tail_from(self.sidecar, offset)
+            self.assertEqual([(e["seq"], e["kind"]) for e in evs], [(302, "end")])
+
+        def test_partial_line_left_for_next_read(self) -> None:
+            size = self.sidecar.stat().st_size
+            with self.sidecar.open("a") as f:
+                f.write('{"seq": 302')
+            evs, offset = tail_from(self.sidecar, size)
+            self.assertEqual((evs, offset), ([], size))
+
+        def test_tail_command(self) -> None:
+            out = subprocess.run([sys.executable, __file__, "tail", str(self.progress), "--last", "1"],
+                                 capture_output=True, text=True, check=True).stdout
+            self.assertEqual(json.loads(out)["text"], "task 300: t300")
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestAppend, TestTail]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
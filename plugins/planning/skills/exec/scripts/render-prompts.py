@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""render-prompts.py - resolve and render exec prompts and agents in one call.
+
+resolves every requested file through the same three-layer override chain as
+resolve-file.sh (first match wins):
+    1. .claude/exec-plan/<path>   project override, relative to the working directory
+    2. <data-dir>/<path>          user override (--data-dir, else $CLAUDE_PLUGIN_DATA)
+    3. <skill>/references/<path>  bundled default
+
+then replaces the placeholders it was given and prints every rendered file at
+once. the rules file is resolved the way resolve-rules.sh does it (project
+.claude/<name>, then <data-dir>/<name>, empty files skipped) and fills USER_RULES.
+${CLAUDE_PLUGIN_ROOT}, RESOLVE_SCRIPT and PLUGIN_DATA_DIR are filled from the
+script location and the data dir unless set explicitly. placeholders that were
+not given (phase-specific ones such as FINDINGS_LIST) are left as they are.
+
+substitution is a single pass over each file, so a value that itself contains a
+placeholder name (findings quoting DEFAULT_BRANCH, say) is inserted verbatim.
+
+resolved contents are cached in $TMPDIR/exec-render-<uid>/, one file per working
+directory and data dir, keyed per path by the size and mtime of the candidate in
+all three layers. adding, editing or removing an override in any layer misses.
+
+manifest (JSON, --manifest PATH or - for stdin; merged with the command line):
+    {"files": ["prompts/task.md", ...], "values": {"DEFAULT_BRANCH": "master"},
+     "rules": "planning-rules.md"}
+
+usage:
+    render-prompts.py [--data-dir DIR] [--set KEY=VALUE ...] [--rules NAME]
+                      [--manifest PATH|-] [--all] [--json] [--no-cache] [file ...]
+    render-prompts.py --test                     # run unit tests
+
+text output is one block per file, "=== <path> (<layer>) ===" followed by the
+rendered content; --json prints {"files": {path: {"layer", "source", "content"}}}.
+a file missing from every layer is an error, as with resolve-file.sh.
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+SKILL_ROOT = SCRIPT_DIR.parent
+PLUGIN_ROOT = SKILL_ROOT.parent.parent
+PROJECT_DIR = Path(".claude/exec-plan")
+CACHE_VERSION = 1
+
+
+def layers(path: str, data_dir: str) -> list[tuple[str, Path]]:
+    """candidate files for path, in override order."""
+    found = [("project", PROJECT_DIR / path)]
+    if data_dir:
+        found.append(("user", Path(data_dir) / path))
+    found.append(("bundled", SKILL_ROOT / "references" / path))
+    return found
+
+
+def stat_key(candidates: list[tuple[str, Path]]) -> list:
+    """[size, mtime_ns] of every candidate, None where it is absent."""
+    key = []
+    for _, p in candidates:
+        try:
+            st = p.stat()
+            key.append([st.st_size, st.st_mtime_ns] if p.is_file() else None)
+        except OSError:
+            key.append(None)
+    return key
+
+
+def cache_file(data_dir: str) -> Path:
+    import hashlib
+
+    base = Path(os.environ.get("TMPDIR") or "/tmp") / f"exec-render-{os.getuid()}"
+    ident = hashlib.sha256(f"{Path.cwd()}\0{data_dir}".encode()).hexdigest()[:16]
+    return base / f"{ident}.json"
+
+
+def load_cache(path: Path | None) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text())
+        return data["entries"] if data.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_cache(path: Path | None, entries: dict) -> None:
+    """best-effort: an unwritable $TMPDIR only costs the next call its reads."""
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "entries": entries}))
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def resolve(path: str, data_dir: str, cache: dict) -> tuple[str, Path, str]:
+    """(layer, source, content) of path through the override chain, via the cache when it is current.
+    raises FileNotFoundError when no layer has the file."""
+    if path.startswith("/") or ".." in Path(path).parts:
+        raise FileNotFoundError(f"path must stay inside the override chain: {path}")
+    candidates = layers(path, data_dir)
+    key = stat_key(candidates)
+    hit = cache.get(path)
+    if hit and hit["key"] == key:
+        return hit["layer"], Path(hit["source"]), hit["content"]
+    for (layer, source), present in zip(candidates, key):
+        if present is not None:
+            content = source.read_text()
+            cache[path] = {"key": key, "layer": layer, "source": str(source), "content": content}
+            return layer, source, content
+    raise FileNotFoundError(f"file not found in override chain: {path}")
+
+
+def resolve_rules(name: str, data_dir: str) -> str:
+    """rules content from .claude/<name> or <data-dir>/<name>; empty files do not count."""
+    for candidate in [Path(".claude") / name] + ([Path(data_dir) / name] if data_dir else []):
+        if candidate.is_file() and candidate.stat().st_size > 0:
+            return candidate.read_text()
+    return ""
+
+
+def bundled_files() -> list[str]:
+    """every bundled prompt and agent, as paths relative to references/."""
+    refs = SKILL_ROOT / "references"
+    return sorted(str(p.relative_to(refs)) for p in refs.rglob("*") if p.is_file())
+
+
+def render(content: str, values: dict[str, str]) -> str:
+    """replace every placeholder in one pass; names only match as whole words."""
+    if not values:
+        return content
+    names = sorted(values, key=len, reverse=True)
+    pattern = re.compile("|".join(
+        re.escape(n) if not n[0].isalnum() else rf"(?<![A-Za-z0-9_]){re.escape(n)}(?![A-Za-z0-9_])" for n in names))
+    return pattern.sub(lambda m: values[m.group(0)], content)
+
+
+def default_values(data_dir: str) -> dict[str, str]:
+    return {
+        "${CLAUDE_PLUGIN_ROOT}": str(PLUGIN_ROOT),
+        "RESOLVE_SCRIPT": str(SCRIPT_DIR / "resolve-file.sh"),
+        "PLUGIN_DATA_DIR": data_dir,
+    }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="render exec prompts and agents through the override chain")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    parser.add_argument("files", nargs="*", help="paths relative to the chain, e.g. prompts/task.md")
+    parser.add_argument("--data-dir", help="user override dir (default: $CLAUDE_PLUGIN_DATA)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="placeholder value")
+    parser.add_argument("--rules", help="rules file name resolved into USER_RULES, e.g. planning-rules.md")
+    parser.add_argument("--manifest", help="JSON manifest file, or - for stdin")
+    parser.add_argument("--all", action="store_true", help="every bundled prompt and agent")
+    parser.add_argument("--json", action="store_true", help="print one JSON object instead of text blocks")
+    parser.add_argument("--no-cache", action="store_true", help="read every layer, leave the cache alone")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+
+    manifest: dict = {}
+    if args.manifest:
+        try:
+            manifest = json.loads(sys.stdin.read() if args.manifest == "-" else Path(args.manifest).read_text())
+        except (OSError, ValueError) as e:
+            print(f"error: cannot read manifest: {e}", file=sys.stderr)
+            sys.exit(1)
+    data_dir = args.data_dir or manifest.get("data_dir") or os.environ.get("CLAUDE_PLUGIN_DATA", "")
+    files = list(manifest.get("files", [])) + args.files + (bundled_files() if args.all else [])
+    files = list(dict.fromkeys(files))
+    if not files:
+        parser.print_usage(sys.stderr)
+        sys.exit(1)
+
+    values = default_values(data_dir)
+    values.update({k: str(v) for k, v in manifest.get("values", {}).items()})
+    for item in args.set:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            print(f"error: --set expects KEY=VALUE: {item}", file=sys.stderr)
+            sys.exit(1)
+        values[key] = value
+    rules_name = args.rules or manifest.get("rules")
+    if rules_name and "USER_RULES" not in values:
+        rules = resolve_rules(rules_name, data_dir)
+        values["USER_RULES"] = f"ADDITIONAL CUSTOM RULES:\n{rules}" if rules else ""
+
+    cache_path = None if args.no_cache else cache_file(data_dir)
+    cache = load_cache(cache_path)
+    before = json.dumps(cache, sort_keys=True)
+    rendered = {}
+    for path in files:
+        try:
+            layer, source, content = resolve(path, data_dir, cache)
+        except FileNotFoundError as e:
+            print(f"error: {e}", file=sys.stderr)
+            sys.exit(1)
+        rendered[path] = {"layer": layer, "source": str(source), "content": render(content, values)}
+    if json.dumps(cache, sort_keys=True) != before:
+        save_cache(cache_path, cache)
+
+    if args.json:
+        print(json.dumps({"files": rendered}, ensure_ascii=False))
+        return
+    for path, item in rendered.items():
+        print(f"=== {path} ({item['layer']}) ===")
+        print(item["content"], end="" if item["content"].endswith("\n") else "\n")
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import subprocess
+    import tempfile
+    import unittest
+
+    class ChainCase(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="render-prompts-test-"))
+            self.work = self.dir / "work"
+            self.data = self.dir / "data"
+            (self.work / ".claude/exec-plan/prompts").mkdir(parents=True)
+            (self.data / "prompts").mkdir(parents=True)
+            self.old_cwd = os.getcwd()
+            os.chdir(self.work)
+
+        def tearDown(self) -> None:
+            os.chdir(self.old_cwd)
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def run_cli(self, *args: str, stdin: str = "") -> subprocess.CompletedProcess:
+            env = dict(os.environ, TMPDIR=str(self.dir))
+            env.pop("CLAUDE_PLUGIN_DATA", None)
+            return subprocess.run([sys.executable, str(Path(__file__).resolve()), *args], input=stdin,
+                                  capture_output=True, text=True, env=env)
+
+    class TestResolve(ChainCase):
+        def test_layers_in_order(self) -> None:
+            cache: dict = {}
+            self.assertEqual(resolve("prompts/task.md", str(self.data), cache)[0], "bundled")
+            (self.data / "prompts/task.md").write_text("user\n")
+            self.assertEqual(resolve("prompts/task.md", str(self.data), cache)[:1], ("user",))
+            (self.work / ".claude/exec-plan/prompts/task.md").write_text("project\n")
+            layer, _, content = resolve("prompts/task.md", str(self.data), cache)
+            self.assertEqual((layer, content), ("project", "project\n"))
+
+        def test_cache_follows_every_layer(self) -> None:
+            cache: dict = {}
+            user = self.data / "prompts/task.md"
+            user.write_text("v1\n")
+            resolve("prompts/task.md", str(self.data), cache)
+            cache["prompts/task.md"]["content"] = "from cache\n"
+            self.assertEqual(resolve("prompts/task.md", str(self.data), cache)[2], "from cache\n")
+            user.write_text("v2 longer\n")
+            self.assertEqual(resolve("prompts/task.md", str(self.data), cache)[2], "v2 longer\n")
+            user.unlink()
+            self.assertEqual(resolve("prompts/task.md", str(self.data), cache)[0], "bundled")
+
+        def test_missing_and_escaping_paths(self) -> None:
+            with self.assertRaises(FileNotFoundError):
+                resolve("prompts/nope.md", str(self.data), {})
+            with self.assertRaises(FileNotFoundError):
+                resolve("../scripts/resolve-file.sh", str(self.data), {})
+
+        def test_rules_skip_empty_project_file(self) -> None:
+            (self.work / ".claude/planning-rules.md").write_text("")
+            (self.data / "planning-rules.md").write_text("use tabs\n")
+            self.assertEqual(resolve_rules("planning-rules.md", str(self.data)), "use tabs\n")
+            self.assertEqual(resolve_rules("absent.md", str(self.data)), "")
+
+    class TestRender(unittest.TestCase):
+        def test_whole_words_single_pass(self) -> None:
+            values = {"DEFAULT_BRANCH": "master", "FINDINGS_LIST": "see DEFAULT_BRANCH", "${CLAUDE_PLUGIN_ROOT}": "/p"}
+            out = render("git diff DEFAULT_BRANCH; MY_DEFAULT_BRANCH; FINDINGS_LIST; ${CLAUDE_PLUGIN_ROOT}/x", values)
+            self.assertEqual(out, "git diff master; MY_DEFAULT_BRANCH; see DEFAULT_BRANCH; /p/x")
+
+        def test_unknown_placeholders_kept(self) -> None:
+            self.assertEqual(render("REVIEW_PHASE", {"DEFAULT_BRANCH": "m"}), "REVIEW_PHASE")
+
+    class TestCli(ChainCase):
+        def test_manifest_renders_everything_at_once(self) -> None:
+            (self.data / "planning-rules.md").write_text("rule one\n")
+            (self.work / ".claude/exec-plan/prompts/fixer.md").write_text("fix on DEFAULT_BRANCH\nUSER_RULES\n")
+            manifest = {"files": ["prompts/task.md", "prompts/fixer.md", "agents/quality.txt"],
+                        "values": {"DEFAULT_BRANCH": "main", "PLAN_FILE_PATH": "docs/plans/x.md"},
+                        "rules": "planning-rules.md", "data_dir": str(self.data)}
+            out = self.run_cli("--manifest", "-", "--json", stdin=json.dumps(manifest))
+            self.assertEqual(out.returncode, 0, out.stderr)
+            files = json.loads(out.stdout)["files"]
+            self.assertEqual(list(files), manifest["files"])
+            self.assertEqual(files["prompts/fixer.md"]["layer"], "project")
+            self.assertEqual(files["prompts/fixer.md"]["content"], "fix on main\nADDITIONAL CUSTOM RULES:\nrule one\n\n")
+            task = files["prompts/task.md"]["content"]
+            self.assertIn("docs/plans/x.md", task)
+            self.assertNotIn("PLAN_FILE_PATH", task)
+            self.assertNotIn("${CLAUDE_PLUGIN_ROOT}", task)
+
+        def test_text_blocks_and_all(self) -> None:
+            out = self.run_cli("--all", "--set", "DEFAULT_BRANCH=trunk")
+            self.assertEqual(out.returncode, 0, out.stderr)
+            headers = re.findall(r"^=== (\S+) \((\w+)\) ===$", out.stdout, re.MULTILINE)
+            self.assertEqual([h[0] for h in headers], bundled_files())
+            self.assertIn(("agents/quality.txt", "bundled"), headers)
+
+        def test_missing_file_fails(self) -> None:
+            out = self.run_cli("prompts/nope.md")
+            self.assertEqual(out.returncode, 1)
+            self.assertIn("file not found in override chain: prompts/nope.md", out.stderr)
+
+        def test_cache_written_and_reused(self) -> None:
+            self.assertEqual(self.run_cli("prompts/task.md").returncode, 0)
+            (cache,) = list(self.dir.glob("exec-render-*/*.json"))
+            stamp = cache.stat().st_mtime_ns
+            self.assertEqual(self.run_cli("prompts/task.md").returncode, 0)
+            self.assertEqual(cache.stat().st_mtime_ns, stamp, "an unchanged chain must not rewrite the cache")
+            self.assertEqual(self.run_cli("--no-cache", "prompts/stats.md").returncode, 0)
+            self.assertNotIn("prompts/stats.md", json.loads(cache.read_text())["entries"])
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestResolve, TestRender, TestCli]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""session-stats.py - per-phase token, duration and tool-use table of an exec run.
+
+streams the session's main log and every subagent log under
+~/.claude/projects/<encoded-cwd>/ one line at a time, so memory stays flat however
+large the logs grow, and prints the "Run summary" header and per-phase table the
+stats prompt reports.
+
+per subagent (<session>/subagents/agent-*.jsonl with its agent-*.meta.json):
+    spawn       mtime of the meta file, written when the subagent starts
+    finish      timestamp of the last event in the log
+    tokens      input + cache creation + cache read + output tokens of the last
+                usage block, the size of the subagent's final context
+    tool_uses   tool_use blocks in its assistant messages
+
+subagents are grouped into phases by their meta description. a phase is
+"parallel" when all its spawns fall within PARALLEL_WINDOW seconds, otherwise
+"sequential" with the spread. the header counts the main session too: wall-clock
+is its first to last event, tokens and tool uses add its own to the subagents'.
+
+a checkpoint in $TMPDIR/exec-stats-<uid>/<session-id>.json keeps, per log, the
+byte offset read so far and the running totals, so a repeated run only reads
+lines appended since. a log that shrank or was replaced is read again from the
+start; a half-written last line is left for the next run.
+
+usage:
+    session-stats.py [--project-dir DIR] [--session ID] [--json] [--no-checkpoint]
+    session-stats.py --test                     # run unit tests
+
+--project-dir defaults to the projects directory of the working directory, and
+--session to its newest *.jsonl by mtime, which is the running session.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+PARALLEL_WINDOW = 10
+TS_RE = re.compile(rb'"timestamp":"([^"]+)"')
+
+# first match wins, so the specific fixer and re-check names come before the
+# broad review ones they would otherwise match
+PHASES = [
+    ("Task loop", r"^execute task"),
+    ("Review phase 1 fixer", r"^fixer (for )?phase 1"),
+    ("Review phase 1 critical re-check", r"critical re-check"),
+    ("Review phase 1 comprehensive", r"^(qa|code quality|test|implementation|documentation) review"),
+    ("Review phase 2 smells", r"smells (review|analysis)"),
+    ("Smells fixer", r"^fixer - smells"),
+    ("Review phase 3 codex fixer", r"^fixer - codex|^codex fixer"),
+    ("Review phase 4 critical-only", r"critical pass"),
+    ("Finalize", r"^finalize"),
+]
+OTHER = "Other"
+
+
+def phase_of(description: str) -> str:
+    """phase name for a subagent description, OTHER when none matches."""
+    text = description.strip().lower()
+    for name, pattern in PHASES:
+        if re.search(pattern, text):
+            return name
+    return OTHER
+
+
+def project_dir_for(cwd: str) -> Path:
+    """~/.claude/projects/<cwd with every non-alphanumeric character as '-'>."""
+    base = Path.home() / ".claude" / "projects"
+    encoded = re.sub(r"[^A-Za-z0-9]", "-", cwd)
+    if not (base / encoded).is_dir() and (base / cwd.replace("/", "-")).is_dir():
+        return base / cwd.replace("/", "-")
+    return base / encoded
+
+
+def parse_ts(value: str) -> float | None:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def empty_totals() -> dict:
+    return {"ino": None, "offset": 0, "first": None, "last": None, "tokens": 0, "tool_uses": 0}
+
+
+def scan(path: Path, totals: dict) -> dict:
+    """fold the lines of path past totals["offset"] into totals and return it.
+    only assistant lines are decoded in full; others just give their timestamp."""
+    st = path.stat()
+    if totals.get("ino") != st.st_ino or st.st_size < totals.get("offset", 0):
+        totals = empty_totals()
+    totals["ino"] = st.st_ino
+    with path.open("rb") as fh:
+        fh.seek(totals["offset"])
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break  # still being written
+            totals["offset"] += len(line)
+            if b'"type":"assistant"' in line:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                message = event.get("message") or {}
+                usage = message.get("usage")
+                if usage:
+                    totals["tokens"] = sum(int(usage.get(k) or 0) for k in (
+                        "input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens"))
+                content = message.get("content")
+                if isinstance(content, list):
+                    totals["tool_uses"] += sum(1 for c in content if isinstance(c, dict) and c.get("type") == "tool_use")
+            m = TS_RE.search(line)
+            ts = parse_ts(m.group(1).decode()) if m else None
+            if ts is not None:
+                if totals["first"] is None:
+                    totals["first"] = ts
+                totals["last"] = ts
+    return totals
+
+
+def checkpoint_file(session: str) -> Path:
+    base = Path(os.environ.get("TMPDIR") or "/tmp") / f"exec-stats-{os.getuid()}"
+    return base / f"{session}.json"
+
+
+def load_checkpoint(path: Path | None, project: Path) -> dict:
+    if path is None:
+        return {}
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CHECKPOINT_VERSION or data.get("project") != str(project):
+        return {}
+    return data.get("logs", {})
+
+
+def save_checkpoint(path: Path | None, project: Path, logs: dict) -> None:
+    """best-effort: an unwritable $TMPDIR only costs the next run a full read."""
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(mode=0o700, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}")
+        tmp.write_text(json.dumps({"version": CHECKPOINT_VERSION, "project": str(project), "logs": logs}))
+        tmp.replace(path)
+    except OSError:
+        pass
+
+
+def collect(project: Path, session: str, logs: dict) -> dict:
+    """scan the session's logs, updating logs (the checkpoint) in place; returns the summary."""
+    main = scan(project / f"{session}.jsonl", logs.get(f"{session}.jsonl", empty_totals()))
+    logs[f"{session}.jsonl"] = main
+    agents = []
+    for meta_path in sorted((project / session / "subagents").glob("*.meta.json")):
+        log = meta_path.with_name(meta_path.name[: -len(".meta.json")] + ".jsonl")
+        try:
+            meta = json.loads(meta_path.read_text())
+            spawn = meta_path.stat().st_mtime
+        except (OSError, ValueError):
+            continue
+        key = str(log.relative_to(project))
+        totals = scan(log, logs.get(key, empty_totals())) if log.is_file() else empty_totals()
+        logs[key] = totals
+        agents.append({
+            "type": meta.get("agentType", ""),
+            "description": meta.get("description", ""),
+            "phase": phase_of(meta.get("description", "")),
+            "spawn": spawn,
+            "finish": totals["last"] if totals["last"] is not None else spawn,
+            "tokens": totals["tokens"],
+            "tool_uses": totals["tool_uses"],
+        })
+
+    phases = []
+    order = [name for name, _ in PHASES] + [OTHER]
+    for name in order:
+        members = [a for a in agents if a["phase"] == name]
+        if not members:
+            continue
+        spawns = [a["spawn"] for a in members]
+        spread = max(spawns) - min(spawns)
+        phases.append({
+            "phase": name,
+            "agents": len(members),
+            "tokens": sum(a["tokens"] for a in members),
+            "wall": max(max(a["finish"] for a in members) - min(spawns), 0),
+            "mode": "parallel" if spread <= PARALLEL_WINDOW else "sequential",
+            "spread": spread,
+        })
+    wall = main["last"] - main["first"] if main["first"] is not None else 0
+    return {
+        "session": session,
+        "wall": wall,
+        "tokens": main["tokens"] + sum(a["tokens"] for a in agents),
+        "agents": len(agents),
+        "tool_uses": main["tool_uses"] + sum(a["tool_uses"] for a in agents),
+        "phases": phases,
+    }
+
+
+def fmt_tokens(n: int) -> str:
+    if n >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if n >= 1000:
+        return f"{round(n / 1000)}k"
+    return str(n)
+
+
+def fmt_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{round(seconds * 1000)}ms"
+    if seconds <= 60:
+        return f"{round(seconds)}s"
+    total = round(seconds)
+    return f"{total // 60}m {total % 60}s"
+
+
+def render(summary: dict) -> str:
+    lines = [
+        "## Run summary",
+        "",
+        f"**Wall-clock:** {fmt_duration(summary['wall'])}   **Tokens:** {fmt_tokens(summary['tokens'])}"
+        f"   **Agents:** {summary['agents']}   **Tool uses:** {summary['tool_uses']}",
+        "",
+        "### Per-phase",
+        "",
+        "| Phase | Agents | Tokens | Wall | Mode |",
+        "|---|---|---|---|---|",
+    ]
+    for p in summary["phases"]:
+        mode = p["mode"] if p["mode"] == "parallel" else f"sequential ({fmt_duration(p['spread'])} spread)"
+        lines.append(f"| {p['phase']} | {p['agents']} | {fmt_tokens(p['tokens'])} | {fmt_duration(p['wall'])} | {mode} |")
+    if not summary["phases"]:
+        lines.append("| n/a | 0 | 0 | 0s | n/a |")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="per-phase stats of an exec run from its session logs")
+    parser.add_argument("--test", action="store_true", help="run unit tests")
+    parser.add_argument("--project-dir", help="session log dir (default: ~/.claude/projects/<encoded cwd>)")
+    parser.add_argument("--session", help="session id (default: newest *.jsonl in the project dir)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--no-checkpoint", action="store_true", help="read every log in full, leave the checkpoint alone")
+    args = parser.parse_args()
+
+    if args.test:
+        run_tests()
+        return
+
+    project = Path(args.project_dir) if args.project_dir else project_dir_for(os.getcwd())
+    session = args.session
+    if not session:
+        logs = sorted(project.glob("*.jsonl"), key=lambda p: p.stat().st_mtime) if project.is_dir() else []
+        if not logs:
+            print(f"error: no session logs in {project}", file=sys.stderr)
+            sys.exit(1)
+        session = logs[-1].stem
+    if not (project / f"{session}.jsonl").is_file():
+        print(f"error: session log not found: {project / f'{session}.jsonl'}", file=sys.stderr)
+        sys.exit(1)
+
+    cp_path = None if args.no_checkpoint else checkpoint_file(session)
+    logs = load_checkpoint(cp_path, project)
+    summary = collect(project, session, logs)
+    save_checkpoint(cp_path, project, logs)
+    print(json.dumps(summary) if args.json else render(summary))
+
+
+def run_tests() -> None:
+    """run embedded unit tests."""
+    import shutil
+    import subprocess
+    import tempfile
+    import unittest
+
+    def assistant(ts: str, tokens: tuple[int, int, int, int], tools: int = 0) -> dict:
+        content = [{"type": "text", "text": "ok"}] + [{"type": "tool_use", "id": f"t{i}", "name": "Bash"} for i in range(tools)]
+        usage = dict(zip(("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens"), tokens))
+        return {"type": "assistant", "timestamp": ts, "message": {"role": "assistant", "content": content, "usage": usage}}
+
+    def write_log(path: Path, events: list[dict], mode: str = "w") -> None:
+        with path.open(mode) as fh:
+            for e in events:
+                fh.write(json.dumps(e, separators=(",", ":")) + "\n")
+
+    class SessionCase(unittest.TestCase):
+        def setUp(self) -> None:
+            self.dir = Path(tempfile.mkdtemp(prefix="session-stats-test-"))
+            self.project = self.dir / "project"
+            self.subagents = self.project / "s1" / "subagents"
+            self.subagents.mkdir(parents=True)
+            write_log(self.project / "s1.jsonl", [
+                {"type": "user", "timestamp": "2026-01-01T10:00:00.000Z"},
+                assistant("2026-01-01T10:00:05.000Z", (10, 0, 90, 5), tools=1),
+                {"type": "user", "timestamp": "2026-01-01T10:05:00.000Z"},
+            ])
+
+        def tearDown(self) -> None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+        def agent(self, name: str, description: str, spawn: float, events: list[dict]) -> Path:
+            meta = self.subagents / f"{name}.meta.json"
+            meta.write_text(json.dumps({"agentType": "general-purpose", "description": description}))
+            os.utime(meta, (spawn, spawn))
+            log = self.subagents / f"{name}.jsonl"
+            write_log(log, events)
+            return log
+
+    class TestPhases(unittest.TestCase):
+        def test_descriptions(self) -> None:
+            cases = {
+                "Execute Task 3": "Task loop",
+                "QA review": "Review phase 1 comprehensive",
+                "Code quality review": "Review phase 1 comprehensive",
+                "Fixer for phase 1": "Review phase 1 fixer",
+                "Fixer phase 1 findings": "Review phase 1 fixer",
+                "QA critical re-check": "Review phase 1 critical re-check",
+                "Smells analysis": "Review phase 2 smells",
+                "Fixer - smells": "Smells fixer",
+                "Codex fixer": "Review phase 3 codex fixer",
+                "Implementation critical pass": "Review phase 4 critical-only",
+                "Finalize": "Finalize",
+                "something else": OTHER,
+            }
+            for description, phase in cases.items():
+                self.assertEqual(phase_of(description), phase, description)
+
+        def test_formats(self) -> None:
+            self.assertEqual([fmt_tokens(n) for n in (999, 78_400, 1_234_567)], ["999", "78k", "1.2M"])
+            self.assertEqual([fmt_duration(s) for s in (0.25, 9, 116)], ["250ms", "9s", "1m 56s"])
+
+    class TestCollect(SessionCase):
+        def test_per_phase_table(self) -> None:
+            t0 = parse_ts("2026-01-01T10:00:00Z")
+            self.agent("agent-a", "Execute task 1", t0, [assistant("2026-01-01T10:01:00Z", (1, 2, 3, 4), tools=2)])
+            self.agent("agent-b", "Execute task 2", t0 + 60, [assistant("2026-01-01T10:01:56Z", (1000, 0, 40000, 500))])
+            for i, name in enumerate(("QA review", "Test review")):
+                self.agent(f"agent-r{i}", name, t0 + 120 + i, [assistant("2026-01-01T10:02:09Z", (0, 0, 99000, 1000), tools=3)])
+            summary = collect(self.project, "s1", {})
+            self.assertEqual((summary["agents"], summary["tool_uses"], summary["wall"]), (4, 1 + 2 + 6, 300))
+            self.assertEqual(summary["tokens"], 105 + 10 + 41500 + 200000)
+            table = render(summary)
+            self.assertIn("| Task loop | 2 | 42k | 1m 56s | sequential (60s spread) |", table)
+            self.assertIn("| Review phase 1 comprehensive | 2 | 200k | 9s | parallel |", table)
+            self.assertIn("**Wall-clock:** 5m 0s", table)
+
+        def test_checkpoint_reads_only_new_lines(self) -> None:
+            t0 = parse_ts("2026-01-01T10:00:00Z")
+            log = self.agent("agent-a", "Execute task 1", t0, [assistant("2026-01-01T10:00:10Z", (1, 0, 0, 1), tools=1)])
+            logs: dict = {}
+            collect(self.project, "s1", logs)
+            offset = logs["s1/subagents/agent-a.jsonl"]["offset"]
+            self.assertEqual(offset, log.stat().st_size)
+            # a half-written line is left for the next run
+            write_log(log, [assistant("2026-01-01T10:00:20Z", (5, 0, 0, 5), tools=2)], mode="a")
+            with log.open("a") as fh:
+                fh.write('{"type":"assistant","timestamp":"2026-01-01T10:00:30Z"')
+            summary = collect(self.project, "s1", logs)
+            self.assertEqual(summary["phases"][0]["tokens"], 10)
+            self.assertEqual(summary["tool_uses"], 1 + 3)
+            with log.open("a") as fh:
+                fh.write("}\n")
+            summary = collect(self.project, "s1", logs)
+            self.assertEqual(summary["phases"][0]["wall"], 30)
+            self.assertEqual(logs["s1/subagents/agent-a.jsonl"]["offset"], log.stat().st_size)
+
+        def test_replaced_log_is_reread(self) -> None:
+            logs: dict = {}
+            collect(self.project, "s1", logs)
+            main = self.project / "s1.jsonl"
+            main.unlink()
+            write_log(main, [assistant("2026-01-01T11:00:00Z", (1, 1, 1, 1))])
+            summary = collect(self.project, "s1", logs)
+            self.assertEqual((summary["tokens"], summary["tool_uses"], summary["wall"]), (4, 0, 0))
+
+    class TestCli(SessionCase):
+        def test_cli_and_checkpoint_file(self) -> None:
+            env = dict(os.environ, TMPDIR=str(self.dir))
+            cmd = [sys.executable, str(Path(__file__).resolve()), "--project-dir", str(self.project)]
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 0, out.stderr)
+            self.assertIn("| n/a | 0 | 0 | 0s | n/a |", out.stdout)
+            checkpoint = json.loads((self.dir / f"exec-stats-{os.getuid()}" / "s1.json").read_text())
+            self.assertEqual(checkpoint["logs"]["s1.jsonl"]["offset"], (self.project / "s1.jsonl").stat().st_size)
+            out = subprocess.run(cmd + ["--json", "--session", "s1"], capture_output=True, text=True, env=env)
+            self.assertEqual(json.loads(out.stdout)["tokens"], 105)
+            out = subprocess.run(cmd + ["--session", "nope"], capture_output=True, text=True, env=env)
+            self.assertEqual(out.returncode, 1)
+            self.assertIn("session log not found", out.stderr)
+
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    for tc in [TestPhases, TestCollect, TestCli]:
+        suite.addTests(loader.loadTestsFromTestCase(tc))
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\r\033[K", end="")
+        sys.exit(130)
@@ -21,37 +21,118 @@ done
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 vcs=$(bash "$SCRIPT_DIR/detect-vcs.sh")
+# hg calls below go through chg when installed, see hg-client.sh
+# shellcheck source=/dev/null
+. "$SCRIPT_DIR/hg-client.sh"
+
+# usage: stage_listed <work-dir> — stage the listed paths into $GIT_INDEX_FILE (or the
+# real index). plain files and symlinks go through one `update-index --stdin`, which
+# takes literal paths and is linear in their number; `git add` matches every listed
+# pathspec against every file it walks, which is quadratic and costs seconds at 10k
+# paths. directories and missing paths (deletions) still go through `git add`, with
+# :(literal) pathspecs, so a directory is added recursively and a name matching
+# nothing fails the way it always has.
+stage_listed() {
+    if [ -s "$1/files" ]; then
+        git update-index --add --remove -z --stdin <"$1/files"
+    fi
+    if [ -s "$1/spec" ]; then
+        git add --pathspec-from-file="$1/spec" --pathspec-file-nul
+    fi
+}
 
 do_git() {
     local msg="$1"
     shift
-    # every name is passed as a :(literal) pathspec, so one holding '*', '?' or
-    # '[...]' matches itself rather than something else. the magic prefix is used
-    # rather than GIT_LITERAL_PATHSPECS because hooks inherit that variable and it
-    # would silently change how their own pathspecs resolve.
-    local path listed=()
+    # every list goes to git NUL-separated on stdin or through --pathspec-from-file,
+    # never as argv: a codegen or vendoring task can list thousands of paths, and
+    # the prefixed pathspec copies would push git past ARG_MAX. printf is a
+    # builtin, so writing the lists is not subject to that limit either.
+    # pathspecs carry the :(literal) magic, so a name holding '*', '?' or '[...]'
+    # matches itself rather than something else. the magic prefix is used rather
+    # than GIT_LITERAL_PATHSPECS because hooks inherit that variable and it would
+    # silently change how their own pathspecs resolve.
+    local work git_dir tmp_index path files=() spec=()
+    work=$(mktemp -d "${TMPDIR:-/tmp}/stage-and-commit-XXXXXX")
+    git_dir=$(git rev-parse --absolute-git-dir)
+    tmp_index="$git_dir/stage-and-commit-index.$$"
+    # shellcheck disable=SC2064 # expand now: the locals are gone when the trap fires
+    trap "rm -rf '$work' '$tmp_index' '$tmp_index.lock'" EXIT
     for path in "$@"; do
-        listed+=(":(literal)$path")
+        if [[ -f $path || -L $path ]]; then
+            files+=("$path")
+        else
+            spec+=(":(literal)$path")
+        fi
     done
-    git add -- "${listed[@]}"
-    git commit -m "$msg" -- "${listed[@]}"
-    # a path-scoped commit runs hooks against a temporary index, so nothing a
-    # pre-commit hook stages reaches the real index — neither a reformatted copy
-    # of a listed path nor an unlisted one the hook adds itself, such as a
-    # regenerated lockfile. reconcile every path the commit actually recorded,
-    # not just the listed ones: an unlisted path would otherwise sit in the index
-    # as a staged deletion of a file present in both HEAD and the worktree.
-    # anything staged but not committed is left alone.
-    # diff-tree reports paths from the repository root while a pathspec resolves
-    # against the current directory, so :(top) anchors them; without it the reset
-    # silently matches nothing whenever the caller sits in a subdirectory.
-    local committed=()
-    while IFS= read -r -d '' path; do
-        committed+=(":(top,literal)$path")
-    done < <(git diff-tree --no-commit-id --name-only -r --root -z HEAD)
-    if [ ${#committed[@]} -gt 0 ]; then
-        git reset -q -- "${committed[@]}"
+    # one printf per list: a redirection per path would reopen the file 10k times
+    [ ${#files[@]} -eq 0 ] || printf '%s\0' "${files[@]}" >"$work/files"
+    [ ${#spec[@]} -eq 0 ] || printf '%s\0' "${spec[@]}" >"$work/spec"
+
+    # git refuses a partial commit during a merge or cherry-pick; the temporary
+    # index below would bypass that check, so hand those states to git itself
+    if git rev-parse -q --verify MERGE_HEAD >/dev/null || git rev-parse -q --verify CHERRY_PICK_HEAD >/dev/null; then
+        printf ':(literal)%s\0' "$@" >"$work/all"
+        git add --pathspec-from-file="$work/all" --pathspec-file-nul
+        git commit -m "$msg" --pathspec-from-file="$work/all" --pathspec-file-nul
+        return
+    fi
+
+    # the same partial commit `git commit -- <paths>` makes: HEAD plus the listed
+    # paths, built in a temporary index so unrelated staged work stays out of it.
+    # read-tree -m carries the real index's stat data over for unchanged entries,
+    # so the commit does not rehash the whole tree.
+    if git rev-parse -q --verify HEAD >/dev/null; then
+        git read-tree -m --index-output="$tmp_index" HEAD
+    else
+        GIT_INDEX_FILE="$tmp_index" git read-tree --empty
     fi
+    GIT_INDEX_FILE="$tmp_index" stage_listed "$work"
+
+    # update-index stages whatever it is given, while git add refuses an untracked
+    # ignored file without -f; such a file is usually a secret or a build output.
+    # only paths new to HEAD can be untracked, and check-ignore skips the ones the
+    # real index already tracks, exactly as git add would.
+    local top ignored
+    top=$(git rev-parse --show-toplevel)
+    ignored=$(GIT_INDEX_FILE="$tmp_index" git diff --cached --name-only -z --no-renames --diff-filter=A |
+        git -C "$top" check-ignore -z --stdin | tr '\0' '\n' || true)
+    if [ -n "$ignored" ]; then
+        echo "error: the following paths are ignored by one of your .gitignore files:" >&2
+        echo "$ignored" >&2
+        exit 1
+    fi
+
+    if ! GIT_INDEX_FILE="$tmp_index" git commit -m "$msg"; then
+        # a rejected commit leaves its files staged for the retry, as git add did
+        stage_listed "$work"
+        exit 1
+    fi
+
+    # hooks run against the temporary index, so nothing a pre-commit hook stages
+    # reaches the real index — neither a reformatted copy of a listed path nor an
+    # unlisted one the hook adds itself, such as a regenerated lockfile. reconcile
+    # every path the commit actually recorded, not just the listed ones: an
+    # unlisted path would otherwise sit in the index as a staged deletion of a file
+    # present in both HEAD and the worktree. anything staged but not committed is
+    # left alone. the recorded entries are copied from the commit's raw diff with
+    # `update-index --index-info`, which is linear; a pathspec reset over the same
+    # paths is quadratic like `git add`. index-info entries carry no stat data, so
+    # a refresh follows; it only re-reads files, the objects are already written.
+    # the raw diff is rewritten in one python pass: a bash `read -d ''` loop reads
+    # the pipe a byte per syscall and alone cost more than git's whole commit at 10k
+    # paths, and awk cannot split NUL-separated records portably.
+    git diff-tree --no-commit-id -r --root -z HEAD | python3 -c '
+import sys
+# ":<old-mode> <new-mode> <old-sha> <new-sha> <status>" NUL "<path>" NUL; mode 0 removes
+fields = sys.stdin.buffer.read().split(b"\0")
+out = []
+for meta, path in zip(fields[0::2], fields[1::2]):
+    _, mode, _, sha, status = meta.split(b" ")
+    out.append(b"%s %s\t%s\0" % (b"0" if status == b"D" else mode, sha, path))
+sys.stdout.buffer.write(b"".join(out))
+' | git update-index -z --index-info
+    git update-index -q --refresh >/dev/null || true
 }
 
 do_hg() {
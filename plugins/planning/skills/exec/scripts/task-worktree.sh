@@ -0,0 +1,143 @@
+#!/bin/bash
+# run one plan task in its own git worktree and land its commits on the feature branch
+# usage: task-worktree.sh add <plan-file> <task-id>     # prints worktree path, then its plan path
+#        task-worktree.sh land <plan-file> <task-id>    # prints the plan status JSON
+#        task-worktree.sh remove <task-id>
+# <task-id> is a plan-status.py id such as "Task 3". run every call from the feature
+# branch's working tree: add forks the task branch from its HEAD, land brings the
+# task's commits back onto it. git only — hg has no worktree equivalent here.
+#
+# land exit codes: 0 landed and the task's checkboxes are all done, 2 landed but the
+# task left open checkboxes, 3 not landed (conflict with the feature branch or work
+# left uncommitted). on 2 and 3 the task is retried in place, as in sequential mode.
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+if [ "$(bash "$SCRIPT_DIR/detect-vcs.sh")" != git ]; then
+    echo "error: parallel task worktrees need git" >&2
+    exit 1
+fi
+
+# usage: names <task-id> — set feature, branch and wt for the task. the worktree lives
+# under the git common dir, out of the way of the working tree and its status.
+names() {
+    local slug
+    feature=$(git branch --show-current)
+    if [ -z "$feature" ]; then
+        echo "error: not on a branch" >&2
+        exit 1
+    fi
+    slug=$(printf '%s' "$1" | tr '[:upper:]' '[:lower:]' | tr -c 'a-z0-9.\n' '-')
+    branch="$feature-$slug"
+    wt="$(git rev-parse --path-format=absolute --git-common-dir)/exec-worktrees/${branch//\//-}"
+}
+
+# usage: plan_path <plan-file> — set rel to the plan's path relative to the top level
+plan_path() {
+    local top dir
+    top=$(git rev-parse --show-toplevel)
+    dir=$(cd "$(dirname "$1")" && pwd -P)
+    rel="${dir#"$(cd "$top" && pwd -P)"}/$(basename "$1")"
+    rel="${rel#/}"
+}
+
+remove() {
+    if [ -d "$wt" ]; then
+        git worktree remove --force "$wt" >/dev/null 2>&1 || rm -rf "$wt"
+    fi
+    git worktree prune
+    git branch -D "$branch" >/dev/null 2>&1 || true
+}
+
+do_add() {
+    names "$2"
+    plan_path "$1"
+    # a worktree left by an interrupted run starts over from the current HEAD
+    remove
+    git worktree add -q -b "$branch" "$wt" HEAD >&2
+    # the subagent reads the live plan, even when its latest checkbox updates or
+    # the plan itself are not committed yet
+    mkdir -p "$(dirname "$wt/$rel")"
+    cp "$1" "$wt/$rel"
+    echo "$wt"
+    echo "$wt/$rel"
+}
+
+do_land() {
+    local plan="$1" id="$2" work rc=0
+    names "$id"
+    plan_path "$plan"
+    if [ ! -d "$wt" ]; then
+        echo "error: no worktree for $id: $wt" >&2
+        exit 1
+    fi
+    work=$(mktemp -d "${TMPDIR:-/tmp}/task-worktree-XXXXXX")
+    # shellcheck disable=SC2064 # expand now: the locals are gone when the trap fires
+    trap "rm -rf '$work'" EXIT
+
+    # the task's checkbox updates go to the plan through plan-status.py, the single
+    # writer, below; the worktree's copy of the plan is put back before rebasing
+    cp "$wt/$rel" "$work/plan.md"
+    if git -C "$wt" ls-files --error-unmatch -- "$rel" >/dev/null 2>&1; then
+        git -C "$wt" checkout -q -- "$rel"
+    else
+        rm -f "$wt/$rel"
+    fi
+    if [ -n "$(git -C "$wt" status --porcelain)" ]; then
+        echo "error: $id left uncommitted changes in $wt, run it in place" >&2
+        remove
+        exit 3
+    fi
+
+    # earlier tasks may have landed since this one forked: replay its commits on top
+    # of the feature branch, so the branch stays linear and lands in dependency order
+    if ! git -C "$wt" rebase -q "$feature" >/dev/null 2>&1; then
+        git -C "$wt" rebase --abort >/dev/null 2>&1 || true
+        echo "error: $id conflicts with $feature, run it in place" >&2
+        remove
+        exit 3
+    fi
+    git merge -q --ff-only "$branch" >&2
+
+    python3 "$SCRIPT_DIR/plan-status.py" "$plan" --take "$work/plan.md" --task "$id" || rc=$?
+    if [ "$rc" -ne 0 ] && [ "$rc" -ne 2 ]; then
+        remove
+        exit "$rc"
+    fi
+    if [ -n "$(git status --porcelain -- "$plan")" ]; then
+        bash "$SCRIPT_DIR/stage-and-commit.sh" "docs: update plan progress for $id" "$plan" >&2
+    fi
+    remove
+    exit "$rc"
+}
+
+case "${1:-}" in
+add)
+    if [ $# -ne 3 ]; then
+        echo "error: usage: task-worktree.sh add <plan-file> <task-id>" >&2
+        exit 1
+    fi
+    do_add "$2" "$3"
+    ;;
+land)
+    if [ $# -ne 3 ]; then
+        echo "error: usage: task-worktree.sh land <plan-file> <task-id>" >&2
+        exit 1
+    fi
+    do_land "$2" "$3"
+    ;;
+remove)
+    if [ $# -ne 2 ]; then
+        echo "error: usage: task-worktree.sh remove <task-id>" >&2
+        exit 1
+    fi
+    names "$2"
+    remove
+    ;;
+*)
+    echo "error: usage: task-worktree.sh add|land|remove ..." >&2
+    exit 1
+    ;;
+esac
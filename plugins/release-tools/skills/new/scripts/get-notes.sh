@@ -58,33 +58,34 @@ forge_err=$(mktemp)
 shaped=$(mktemp)
 page_out=$(mktemp)
 pages=$(mktemp)
-trap 'rm -f "$features" "$improvements" "$fixes" "$other" "$forge_out" "$forge_err" "$shaped" "$page_out" "$pages"' EXIT
+fetched=$(mktemp)
+trap 'rm -f "$features" "$improvements" "$fixes" "$other" "$forge_out" "$forge_err" "$shaped" "$page_out" "$pages" "$fetched"' EXIT
 
-# categorize entry by conventional commit prefix
-# usage: categorize "description" "suffix"
-# suffix is "#123 @author" for PRs or "abc1234" for commits
+# categorize every entry by conventional commit prefix in one awk pass, writing
+# "- description suffix" lines to the four section files.
+# usage: <commit log> | categorize <pr file>
+# PR lines in the file are "title<TAB>suffix" with suffix "#123 @author"; commit lines
+# on stdin are "hash<TAB>subject". each side splits at its first tab, as the former
+# per-entry `read` did. the prefix is matched case-insensitively but stripped only in
+# lowercase, as the former `tr` + `sed` pair did. one process for the whole release
+# instead of two `echo | tr` / `echo | sed` spawns per entry, which took tens of
+# seconds on a release with hundreds of PRs and commits
 categorize() {
-    local desc="$1"
-    local suffix="$2"
-    local lower_desc
-    lower_desc=$(echo "$desc" | tr '[:upper:]' '[:lower:]')
-
-    # strip conventional prefix for cleaner output
-    local clean_desc
-    clean_desc=$(echo "$desc" | sed -E 's/^(feat|fix|refactor|perf|chore|docs|style|build|ci|test)(\([^)]*\))?[[:space:]]*:[[:space:]]*//')
-
-    # format: "- description suffix"
-    local entry="- ${clean_desc} ${suffix}"
-
-    if [[ "$lower_desc" =~ ^feat ]]; then
-        echo "$entry" >> "$features"
-    elif [[ "$lower_desc" =~ ^fix ]]; then
-        echo "$entry" >> "$fixes"
-    elif [[ "$lower_desc" =~ ^(refactor|perf|chore|docs|style|build|ci|test) ]]; then
-        echo "$entry" >> "$improvements"
-    else
-        echo "$entry" >> "$other"
-    fi
+    awk -F '\t' -v features="$features" -v improvements="$improvements" \
+        -v fixes="$fixes" -v other="$other" '
+        {
+            rest = index($0, "\t") ? substr($0, index($0, "\t") + 1) : ""
+            if (FILENAME == "-") { desc = rest; suffix = $1 } else { desc = $1; suffix = rest }
+            clean = desc
+            if (match(desc, /^(feat|fix|refactor|perf|chore|docs|style|build|ci|test)(\([^)]*\))?[[:space:]]*:[[:space:]]*/))
+                clean = substr(desc, RLENGTH + 1)
+            entry = "- " clean " " suffix
+            lower = tolower(desc)
+            if (lower ~ /^feat/) print entry > features
+            else if (lower ~ /^fix/) print entry > fixes
+            else if (lower ~ /^(refactor|perf|chore|docs|style|build|ci|test)/) print entry > improvements
+            else print entry > other
+        }' "$1" -
 }
 
 # run a forge CLI, collecting its output, and abort when it fails. at the head of a
@@ -123,13 +124,19 @@ json_array_length() {
 
 # gh pr list has no page flag. grow its total limit until the returned array is
 # shorter than requested; the final response then contains every merged PR. a fixed
-# limit exits 0 when truncated, which makes incomplete notes look authoritative
+# limit exits 0 when truncated, which makes incomplete notes look authoritative.
+# with a fetch_from date the search qualifier makes github return only PRs merged
+# since then, so the doubling covers the new PRs rather than the whole history
 run_github_prs() {
-    local fields="$1"
     local limit=50
     local count
+    local search=()
+    if [ -n "$fetch_from" ]; then
+        search=(--search "merged:>=$fetch_from")
+    fi
     while true; do
-        run_forge gh pr list --state merged --limit "$limit" --json "$fields"
+        run_forge gh pr list --state merged --limit "$limit" "${search[@]}" \
+            --json number,title,mergedAt,author
         count=$(json_array_length "$forge_out")
         [ "$count" -lt "$limit" ] && break
         limit=$((limit * 2))
@@ -137,19 +144,26 @@ run_github_prs() {
 }
 
 # glab exposes a page number but reads only one 30-item page by default. request the
-# API maximum explicitly and combine pages until the first short response
+# API maximum explicitly and combine pages until the first short response. pages come
+# newest merge first, so with a fetch_from date paging also stops at the first page
+# reaching back to that date: everything older is cached or shipped already
 run_gitlab_prs() {
     local page=1
     local per_page=100
     local count
+    local oldest
     : >"$pages"
     while true; do
         run_forge_to "$page_out" glab mr list --merged -F json \
-            --page "$page" --per-page "$per_page"
+            --order merged_at --sort desc --page "$page" --per-page "$per_page"
         count=$(json_array_length "$page_out")
         cat "$page_out" >>"$pages"
         printf '\n' >>"$pages"
         [ "$count" -lt "$per_page" ] && break
+        if [ -n "$fetch_from" ]; then
+            oldest=$(jq -r 'map(.merged_at // "") | min' <"$page_out")
+            [[ "$oldest" > "$fetch_from" ]] || break
+        fi
         page=$((page + 1))
     done
     if ! jq -s 'add' "$pages" >"$forge_out" 2>"$forge_err"; then
@@ -158,7 +172,81 @@ run_gitlab_prs() {
     fi
 }
 
-# feed collected PR/MR JSON through jq and categorize each entry
+# merged PR/MR metadata is cached per repository under the git dir, one file per
+# platform: {"remote", "since", "prs"}. since is the merge date the cache is complete
+# from ("" for the whole history) and prs holds the forge's own objects, newest merge
+# first, so the jq filters below read cached and fetched entries alike. a cache that
+# covers the last tag's date is topped up with only the PRs merged since its newest
+# entry; one for another remote, or starting after the tag, is refetched from the tag.
+# merged PRs rarely change, but a title edited after the merge keeps its cached text
+# until the entry is refetched. RELEASE_NOTES_NO_CACHE=1 skips the cache entirely
+cache_file=""
+if [ -z "${RELEASE_NOTES_NO_CACHE:-}" ]; then
+    git_common_dir=$(git rev-parse --path-format=absolute --git-common-dir 2>/dev/null) || git_common_dir=""
+    [ -n "$git_common_dir" ] && cache_file="$git_common_dir/release-tools/merged-$platform.json"
+fi
+remote=$(git remote get-url origin 2>/dev/null) || remote=""
+
+# usage: cache_covers — print the cached since date and newest merge when the cache
+# belongs to this remote and reaches back to tag_date; print nothing otherwise
+cache_covers() {
+    [ -n "$cache_file" ] && [ -s "$cache_file" ] || return 0
+    jq -r --arg remote "$remote" --arg tag "$tag_date" --arg at "$merged_key" '
+        select(.remote == $remote and (.prs | type) == "array")
+        | select(.since == "" or ($tag != "" and .since <= $tag))
+        | "\(.since)\t\([.prs[][$at] // ""] | max // "")"' "$cache_file" 2>/dev/null || true
+}
+
+# decide the date to fetch from: the newest cached merge (or the tag, if later) when
+# the cache covers the release, otherwise the tag date ("" fetches everything)
+# usage: plan_fetch <merged-at key>
+plan_fetch() {
+    merged_key="$1"
+    cache_since=""
+    cache_hit=0
+    fetch_from="$tag_date"
+    local covers newest
+    covers=$(cache_covers)
+    if [ -n "$covers" ]; then
+        cache_hit=1
+        cache_since="${covers%%$'\t'*}"
+        newest="${covers#*$'\t'}"
+        if [[ "$newest" > "$fetch_from" ]]; then
+            fetch_from="$newest"
+        fi
+    fi
+}
+
+# merge the fetched PRs into the cache and leave the combined list in forge_out for
+# collect_prs. the fetch runs from the newest cached merge inclusive, so a PR seen on
+# both sides keeps its fetched copy. writing the cache is best-effort: a read-only
+# git dir only costs the next run its full fetch
+# usage: merge_cache <id key>
+merge_cache() {
+    local id_key="$1"
+    [ -n "$cache_file" ] || return 0
+    cp "$forge_out" "$fetched"
+    local since="$fetch_from"
+    [ "$cache_hit" -eq 1 ] && since="$cache_since"
+    local cached="[]"
+    [ "$cache_hit" -eq 1 ] && cached=$(jq -c '.prs' "$cache_file")
+    if ! jq --argjson cached "$cached" --arg remote "$remote" --arg since "$since" \
+        --arg id "$id_key" --arg at "$merged_key" '
+        {remote: $remote, since: $since,
+         prs: ((. + $cached) | unique_by(.[$id]) | sort_by(.[$at], .[$id]) | reverse)}' \
+        "$fetched" >"$pages" 2>"$forge_err"; then
+        echo "error: jq failed to merge the $platform PR cache: $(cat "$forge_err")" >&2
+        exit 1
+    fi
+    jq '.prs' "$pages" >"$forge_out"
+    if mkdir -p "$(dirname "$cache_file")" 2>/dev/null && cp "$pages" "$cache_file.$$" 2>/dev/null; then
+        mv -f "$cache_file.$$" "$cache_file"
+    else
+        rm -f "$cache_file.$$"
+    fi
+}
+
+# shape collected PR/MR JSON with jq into "title<TAB>suffix" lines for categorize
 # usage: collect_prs <jq args...>
 # jq's exit status is checked too: an absent jq (not installed by default on macOS)
 # would otherwise drain the pipeline and leave the same "no PRs" notes. it does not
@@ -171,9 +259,6 @@ collect_prs() {
         echo "error: jq failed to shape the $platform PR list: $(cat "$forge_err")" >&2
         exit 1
     fi
-    while IFS=$'\t' read -r title suffix; do
-        categorize "$title" "$suffix"
-    done <"$shaped"
 }
 
 # collect PRs/MRs.
@@ -181,16 +266,19 @@ collect_prs() {
 # shell expansion -- the directive covers the whole if-statement below
 # shellcheck disable=SC2016
 if [ "$platform" = "github" ]; then
+    plan_fetch mergedAt
+    run_github_prs
+    merge_cache number
     if [ -n "$tag_date" ]; then
-        run_github_prs number,title,mergedAt,author
         collect_prs --arg date "$tag_date" \
             '.[] | select(.mergedAt > $date) | "\(.title)\t#\(.number) @\(.author.login)"'
     else
-        run_github_prs number,title,author
         collect_prs '.[] | "\(.title)\t#\(.number) @\(.author.login)"'
     fi
 elif [ "$platform" = "gitlab" ]; then
+    plan_fetch merged_at
     run_gitlab_prs
+    merge_cache iid
     if [ -n "$tag_date" ]; then
         collect_prs --arg date "$tag_date" \
             '.[] | select(.merged_at > $date) | "\(.title)\t!\(.iid) @\(.author.username)"'
@@ -208,17 +296,11 @@ elif [ "$platform" = "gitea" ]; then
     echo "warning: gitea PR metadata is unavailable, notes are commit-derived only" >&2
 fi
 
-# collect commits (exclude merge commits)
+# collect commits (exclude merge commits) and categorize them with the PRs
 if [ -n "$last_tag" ]; then
-    git log "${last_tag}..HEAD" --oneline --no-merges --pretty="%h%x09%s" | \
-        while IFS=$'\t' read -r hash msg; do
-            categorize "$msg" "$hash"
-        done
+    git log "${last_tag}..HEAD" --oneline --no-merges --pretty="%h%x09%s" | categorize "$shaped"
 else
-    git log --oneline --no-merges --pretty="%h%x09%s" -20 | \
-        while IFS=$'\t' read -r hash msg; do
-            categorize "$msg" "$hash"
-        done
+    git log --oneline --no-merges --pretty="%h%x09%s" -20 | categorize "$shaped"
 fi
 
 # build output
@@ -9,6 +9,7 @@ usage:
     git-review.py                          # auto-detect: uncommitted or branch vs default
     git-review.py <base>                   # diff against specific ref (branch, tag, HEAD~3)
     git-review.py <base> --branch <name>   # diff branch against base (without checkout)
+    git-review.py --interdiff [<base>]     # only what changed since the last review (rebased branch)
     git-review.py --test                   # run embedded tests
 
 auto-detect logic:
@@ -57,24 +58,76 @@ def git_ok(*args: str, cwd: str | None = None) -> bool:
     return result.returncode == 0
 
 
-def detect_default_branch() -> str:
-    """detect the default branch (master, main, trunk)."""
-    # try origin/HEAD first
-    ref = git("symbolic-ref", "refs/remotes/origin/HEAD")
-    if ref:
-        return ref.replace("refs/remotes/origin/", "")
+DEFAULT_BRANCH_CANDIDATES = ("main", "master", "trunk", "develop")
+
+
+def default_branch_cache_key(common: Path) -> str:
+    """key of the refs the default branch depends on, in the format of the exec
+    skill's detect-branch.sh, which shares the cache file: the content of
+    refs/remotes/origin/HEAD, then for each candidate whether it exists as a loose
+    ref under refs/heads/ and refs/remotes/origin/."""
+    try:
+        head = (common / "refs/remotes/origin/HEAD").read_text().split("\n", 1)[0]
+    except OSError:
+        head = ""
+    flags = "".join(("h" if (common / "refs/heads" / c).is_file() else "-")
+                    + ("r" if (common / "refs/remotes/origin" / c).is_file() else "-") + ","
+                    for c in DEFAULT_BRANCH_CANDIDATES)
+    return f"v1|{head}|{flags}"
 
-    # probe common branch names
-    for branch in ("master", "main", "trunk"):
-        if git_ok("rev-parse", "--verify", f"origin/{branch}"):
-            return branch
 
-    # last resort: try local branches
-    for branch in ("master", "main", "trunk"):
-        if git_ok("rev-parse", "--verify", branch):
-            return branch
+def detect_default_branch() -> str:
+    """detect the default branch (main, master, trunk, develop).
+
+    the answer is cached in <git-common-dir>/default-branch.cache, shared with the
+    planning plugin's detect-branch.sh. the cache stays valid while the key of the
+    refs matches and packed-refs is not newer than it, so a hit costs one rev-parse
+    and a few stats. an empty cached branch means detect-branch.sh asked the remote
+    and got nothing; this function never asks the remote itself."""
+    common_dir = git("rev-parse", "--path-format=absolute", "--git-common-dir")
+    cache = Path(common_dir) / "default-branch.cache" if common_dir else None
+    key = ""
+    if cache and not (cache.parent / "reftable").is_dir():
+        key = default_branch_cache_key(cache.parent)
+        try:
+            packed = (cache.parent / "packed-refs").stat().st_mtime_ns
+        except OSError:
+            packed = 0
+        try:
+            if packed <= cache.stat().st_mtime_ns:
+                cached_key, branch = (cache.read_text().split("\n") + [""])[:2]
+                if cached_key == key:
+                    return branch or "master"
+        except OSError:
+            pass
+    else:
+        cache = None
 
-    return "master"
+    branch = ""
+    # try origin/HEAD first
+    ref = git("symbolic-ref", "-q", "refs/remotes/origin/HEAD")
+    if ref:
+        branch = ref.replace("refs/remotes/origin/", "")
+    else:
+        # probe common branch names: local branches, then remote-tracking ones
+        patterns = [f"refs/{kind}/{c}" for c in DEFAULT_BRANCH_CANDIDATES for kind in ("heads", "remotes/origin")]
+        refs = set(git("for-each-ref", "--format=%(refname)", *patterns).splitlines())
+        for kind in ("heads", "remotes/origin"):
+            branch = next((c for c in DEFAULT_BRANCH_CANDIDATES if f"refs/{kind}/{c}" in refs), "")
+            if branch:
+                break
+    if not branch:
+        return "master"
+
+    # best-effort: an unwritable git dir only costs the next call a fresh resolution
+    if cache:
+        tmp = cache.with_name(f"{cache.name}.{os.getpid()}")
+        try:
+            tmp.write_text(f"{key}\n{branch}\n")
+            tmp.replace(cache)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+    return branch
 
 
 def has_uncommitted_changes() -> bool:
@@ -144,8 +197,20 @@ def generate_untracked_diff(files: list[str]) -> str:
     return "\n\n".join(sections) + "\n" if sections else ""
 
 
-def generate_clean_diff(diff_args: list[str]) -> str:
-    """generate cleaned-up diff with friendly headers."""
+# moved-code detection, after git's --color-moved: a block counts as moved when at
+# least MOVE_MIN_LINES lines holding MOVE_MIN_ALNUM alphanumeric characters match
+MOVE_MIN_LINES = 3
+MOVE_MIN_ALNUM = 20
+# a moved block may carry edits: up to MOVE_MAX_GAP differing lines in a row, on
+# both sides at once, are stepped over and stay in the diff in full
+MOVE_MAX_GAP = 2
+# lines this common ("}", "return nil") never start a match, keeping it near-linear
+MOVE_MAX_ANCHORS = 64
+HUNK_RE = re.compile(r"@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+
+def generate_clean_diff(diff_args: list[str], collapse_moves: bool = True) -> str:
+    """generate cleaned-up diff with friendly headers; moved blocks collapse to markers."""
     raw_diff = git("diff", *diff_args)
     if not raw_diff:
         return ""
@@ -154,9 +219,13 @@ def generate_clean_diff(diff_args: list[str]) -> str:
 
     # parse and reformat
     lines = raw_diff.splitlines()
-    output = []
+    output: list[str | None] = []
     current_file = None
     skip_header = True
+    # (output index, file, line number, change block, key) of every removed and added line
+    removed: list[tuple[int, str, int, int, str]] = []
+    added: list[tuple[int, str, int, int, str]] = []
+    old_no = new_no = block = 0
 
     for line in lines:
         # detect file header
@@ -183,6 +252,10 @@ def generate_clean_diff(diff_args: list[str]) -> str:
         # replace @@ hunk headers with separator
         if line.startswith("@@"):
             skip_header = False
+            numbers = HUNK_RE.match(line)
+            if numbers:
+                old_no, new_no = int(numbers.group(1)), int(numbers.group(2))
+            block += 1
             # extract function context if present (after the second @@)
             context_match = re.search(r"@@ .+? @@\s*(.+)", line)
             if context_match:
@@ -192,9 +265,163 @@ def generate_clean_diff(diff_args: list[str]) -> str:
             continue
 
         skip_header = False
+        if line.startswith("-"):
+            removed.append((len(output), current_file or "", old_no, block, line[1:].strip()))
+            old_no += 1
+        elif line.startswith("+"):
+            added.append((len(output), current_file or "", new_no, block, line[1:].strip()))
+            new_no += 1
+        else:
+            old_no += 1
+            new_no += 1
+            block += 1
         output.append(line)
 
-    return "\n".join(output) + "\n"
+    if collapse_moves:
+        collapse_moved_blocks(output, removed, added)
+    return "\n".join(line for line in output if line is not None) + "\n"
+
+
+def collapse_moved_blocks(output: list[str | None], removed: list[tuple], added: list[tuple]) -> None:
+    """replace moved lines in output with "··· moved from/to <file>:<lines>" markers, in place.
+
+    removed and added hold (output index, file, line number, change block, key) in
+    diff order; key is the line without its indentation, so a block that was
+    re-indented on the way still matches. every added line is looked up by key in
+    a hash of the removed lines and the match is extended line by line, so the
+    pass is linear in the diff size. lines removed and added in the same change
+    block are an edit in place, never a move. collapsed lines become None; the
+    lines that differ inside a moved block stay in full between the markers."""
+    anchors: dict[str, list[int]] = {}
+    for j, r in enumerate(removed):
+        anchors.setdefault(r[4], []).append(j)
+    used = bytearray(len(removed))
+
+    def extend(i: int, j: int) -> list[tuple[int, int]]:
+        a_block, r_block = added[i][3], removed[j][3]
+        pairs = []
+        while i < len(added) and j < len(removed) and not used[j]:
+            if added[i][3] != a_block or removed[j][3] != r_block:
+                break
+            if added[i][4] == removed[j][4]:
+                pairs.append((i, j))
+                i += 1
+                j += 1
+                continue
+            for gap in range(1, MOVE_MAX_GAP + 1):
+                a, r = i + gap, j + gap
+                if (a < len(added) and r < len(removed) and not used[r] and added[a][3] == a_block
+                        and removed[r][3] == r_block and added[a][4] == removed[r][4]):
+                    i, j = a, r
+                    break
+            else:
+                break
+        return pairs
+
+    i = 0
+    while i < len(added):
+        candidates = anchors.get(added[i][4], [])
+        best: list[tuple[int, int]] = []
+        if len(candidates) <= MOVE_MAX_ANCHORS:
+            for j in candidates:
+                if not used[j] and removed[j][3] != added[i][3]:
+                    pairs = extend(i, j)
+                    if len(pairs) > len(best):
+                        best = pairs
+        if len(best) < MOVE_MIN_LINES or sum(ch.isalnum() for a, _ in best for ch in added[a][4]) < MOVE_MIN_ALNUM:
+            i += 1
+            continue
+        for _, j in best:
+            used[j] = 1
+        # one marker per run of matched lines; an edit inside the block splits it
+        start = 0
+        for k in range(1, len(best) + 1):
+            if k < len(best) and best[k][0] == best[k - 1][0] + 1 and best[k][1] == best[k - 1][1] + 1:
+                continue
+            seg = best[start:k]
+            (a0, r0), (a1, r1) = seg[0], seg[-1]
+            count = f"{len(seg)} line{'s' if len(seg) > 1 else ''}"
+            span_a = f"{added[a0][1]}:{added[a0][2]}" + (f"-{added[a1][2]}" if a1 > a0 else "")
+            span_r = f"{removed[r0][1]}:{removed[r0][2]}" + (f"-{removed[r1][2]}" if r1 > r0 else "")
+            for a, r in seg:
+                output[added[a][0]] = None
+                output[removed[r][0]] = None
+            output[added[a0][0]] = f"··· moved from {span_r} ({count})"
+            output[removed[r0][0]] = f"··· moved to {span_a} ({count})"
+            start = k
+        i = best[-1][0] + 1
+
+
+def split_range(diff_args: list[str]) -> tuple[str, str]:
+    """base and target of a branch review's diff args ("a...b", "a..b" or a single ref)."""
+    arg = diff_args[0] if diff_args else ""
+    if "..." in arg:
+        return tuple(arg.split("...", 1))
+    if ".." in arg:
+        return tuple(arg.split("..", 1))
+    return arg, "HEAD"
+
+
+def load_last_review(review_dir: Path) -> dict | None:
+    """base and tip of the last completed branch review in review_dir, if recorded."""
+    import json
+
+    try:
+        last = json.loads((review_dir / "last-review.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return last if isinstance(last, dict) and last.get("base") and last.get("head") else None
+
+
+def save_last_review(review_dir: Path, base: str, head: str) -> None:
+    """record the merge-base and tip a completed branch review showed. the file sits
+    next to review.diff but is never added to the review repo, so it stays out of
+    the annotations."""
+    import json
+
+    (review_dir / "last-review.json").write_text(json.dumps({"base": base, "head": head}) + "\n")
+
+
+MERGE_TREE_MIN_GIT = (2, 38)  # first release with `git merge-tree --write-tree`
+
+
+def git_version() -> tuple[int, int]:
+    """major and minor version of the installed git, (0, 0) if unknown."""
+    m = re.search(r"(\d+)\.(\d+)", git("--version"))
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+
+def interdiff_args(last: dict, base: str, head: str) -> tuple[list[str], str]:
+    """diff args showing only what changed on the branch since the last review, and a header note.
+
+    the last reviewed series is replayed onto the current merge-base with
+    `git merge-tree --write-tree`: merging the new base with the old tip, whose
+    common ancestor is the old fork point, gives the old changes on top of the new
+    upstream. diffing that tree against the new tip leaves out everything the
+    rebase brought in from upstream, so a rebase with no edits renders empty and a
+    rebase with a fix renders just the fix. when the replay conflicts, or git is
+    older than 2.38 and cannot replay at all, the tips are compared directly,
+    limited to files either series touches, and the note says which happened."""
+    result = subprocess.run(["git", "merge-tree", "--write-tree", base, last["head"]],
+                            capture_output=True, text=True)
+    tree = result.stdout.split("\n", 1)[0].strip()
+    note = f"Interdiff: {last['head'][:12]} -> {head[:12]}"
+    if result.returncode == 0 and tree:
+        return [tree, head], note
+    # exit 1 with a tree is a conflicted merge; anything else is merge-tree failing
+    # to run, most often a git without --write-tree, which prints its usage
+    if result.returncode == 1 and tree:
+        reason = "replay conflicted"
+    elif git_version() < MERGE_TREE_MIN_GIT:
+        reason = (f"git {git('--version').split()[-1]} cannot replay, needs "
+                  f"{'.'.join(map(str, MERGE_TREE_MIN_GIT))}+; per-commit changes: git range-diff "
+                  f"{last['base'][:12]}..{last['head'][:12]} {base[:12]}..{head[:12]}")
+    else:
+        err = result.stderr.strip().split("\n", 1)[0]
+        reason = f"replay failed: {err}" if err else "replay failed"
+    files = set(git("diff", "--name-only", f"{base}..{head}").splitlines())
+    files.update(git("diff", "--name-only", f"{last['base']}..{last['head']}").splitlines())
+    return [last["head"], head, "--", *sorted(files)], f"{note} ({reason}, upstream changes included)"
 
 
 def make_header(diff_args: list[str], mode: str, branch_override: str | None = None) -> str:
@@ -211,14 +438,7 @@ def make_header(diff_args: list[str], mode: str, branch_override: str | None = N
         if untracked:
             parts.append(f"Untracked: {untracked}")
     else:
-        # extract base and target from diff_args
-        arg = diff_args[0] if diff_args else ""
-        if "..." in arg:
-            base, target = arg.split("...", 1)
-        elif ".." in arg:
-            base, target = arg.split("..", 1)
-        else:
-            base, target = arg, "HEAD"
+        base, target = split_range(diff_args)
         commit_count = git("rev-list", "--count", f"{base}..{target}")
         file_count = len(git("diff", "--name-only", *diff_args).splitlines())
         parts.append(f"Base: {base}")
@@ -274,11 +494,13 @@ def build_editor_cmd(editor: str) -> str:
     return " ".join(shlex.quote(p) for p in parts)
 
 
-def open_editor(filepath: Path) -> int:
+def open_editor(filepath: Path, *more: Path) -> int:
     """open file in $EDITOR via agterm overlay, tmux popup, kitty overlay, or wezterm split-pane,
     blocking until editor closes. tries agterm first (if $AGTERM_SESSION_ID is set), then tmux
-    (if $TMUX), then kitty, then wezterm. returns non-zero if none is available."""
+    (if $TMUX), then kitty, then wezterm. returns non-zero if none is available.
+    extra files open in the same editor session (a queue review with --together)."""
     editor_cmd = build_editor_cmd(os.environ.get("EDITOR", "vi"))
+    files_arg = " ".join(shlex.quote(str(f)) for f in (filepath, *more))
 
     # agterm: overlay open --block runs the editor full-pane and blocks (like tmux's -E), no
     # sentinel needed. checked first so agterm wins over a stray KITTY_LISTEN_ON. needs
@@ -294,7 +516,7 @@ def open_editor(filepath: Path) -> int:
         agterm_pane = os.environ.get("AGTERM_PANE")
         status_pane_args = ["--pane", agterm_pane] if agterm_pane else []
         overlay_pane_args = ["--pane", agterm_pane] if agterm_pane in ("left", "right") else []
-        overlay_cmd = f"{editor_cmd} {shlex.quote(str(filepath))}"
+        overlay_cmd = f"{editor_cmd} {files_arg}"
         subprocess.run(
             ["agtermctl", "session", "status", "blocked", "--blink", *target, *status_pane_args],
             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
@@ -316,7 +538,7 @@ def open_editor(filepath: Path) -> int:
         result = subprocess.run(
             ["tmux", "display-popup", "-E", "-w", "90%", "-h", "90%",
              "-T", " Git Review ", "--", "sh", "-c",
-             f"{editor_cmd} {shlex.quote(str(filepath))}"],
+             f"{editor_cmd} {files_arg}"],
             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         )
         return result.returncode
@@ -331,7 +553,7 @@ def open_editor(filepath: Path) -> int:
         os.close(fd)
         os.unlink(sentinel_path)
         sentinel = Path(sentinel_path)
-        wrapper = f'{editor_cmd} {shlex.quote(str(filepath))}; touch {shlex.quote(str(sentinel))}'
+        wrapper = f'{editor_cmd} {files_arg}; touch {shlex.quote(str(sentinel))}'
         cmd = ["kitty", "@", "--to", kitty_sock, "launch", "--type=overlay",
                f"--title=Git Review: {filepath.name}"]
         # target the kitty window where claude is running, not the active one
@@ -352,7 +574,7 @@ def open_editor(filepath: Path) -> int:
         os.close(fd)
         os.unlink(sentinel_path)
         sentinel = Path(sentinel_path)
-        wrapper = f'{editor_cmd} {shlex.quote(str(filepath))}; touch {shlex.quote(str(sentinel))}'
+        wrapper = f'{editor_cmd} {files_arg}; touch {shlex.quote(str(sentinel))}'
         subprocess.run(
             ["wezterm", "cli", "split-pane", "--bottom", "--percent", "80",
              "--pane-id", wezterm_pane, "--", "sh", "-c", wrapper],
@@ -371,12 +593,19 @@ def get_annotations(review_dir: Path) -> str:
     return git("diff", cwd=str(review_dir))
 
 
-def run_review(base_ref: str | None = None, branch: str | None = None) -> None:
-    """main review flow: generate diff, open editor, return annotations."""
-    if not git_ok("rev-parse", "--is-inside-work-tree"):
-        print("error: not inside a git repository", file=sys.stderr)
-        sys.exit(1)
+def prepare_review(base_ref: str | None = None, branch: str | None = None, interdiff: bool = False,
+                   collapse_moves: bool = True) -> dict:
+    """build the review file for one review and set up its review repo, without opening the editor.
+
+    returns {"branch", "review_dir", "reviewed", "ready", "messages"}: ready is False when
+    there is nothing to review, reviewed the (merge-base, tip) to record once the user
+    has seen it, messages the notes to show the user. prints nothing, so several
+    reviews can be prepared at once on a worker pool.
 
+    with interdiff, a branch review shows only what changed since the last completed
+    review of the branch (see interdiff_args), so a rebased or force-pushed branch
+    costs a re-read of the real change, not of the whole branch."""
+    messages = []
     # determine diff mode and args
     if base_ref:
         # explicit base provided
@@ -394,8 +623,30 @@ def run_review(base_ref: str | None = None, branch: str | None = None) -> None:
         diff_args = [f"{default_branch}...HEAD"]
         mode = "branch"
 
+    # the merge-base and tip this review shows, recorded once the editor closes
+    review_dir = get_review_dir(branch_override=branch)
+    range_args = diff_args
+    reviewed = None
+    note = ""
+    if mode == "branch":
+        base, target = split_range(diff_args)
+        head = git("rev-parse", "--verify", "-q", f"{target or 'HEAD'}^{{commit}}")
+        if "..." in diff_args[0]:
+            fork = git("merge-base", base, head) if head else ""
+        else:
+            fork = git("rev-parse", "--verify", "-q", f"{base}^{{commit}}")
+        reviewed = (fork, head) if fork and head else None
+    if interdiff:
+        last = load_last_review(review_dir)
+        if mode != "branch" or not reviewed:
+            messages.append("interdiff: only for committed branch reviews, showing the full diff")
+        elif not last or not git_ok("cat-file", "-e", f"{last['head']}^{{commit}}"):
+            messages.append("interdiff: no earlier review of this branch to compare with, showing the full diff")
+        else:
+            diff_args, note = interdiff_args(last, *reviewed)
+
     # generate cleaned diff
-    clean_diff = generate_clean_diff(diff_args)
+    clean_diff = generate_clean_diff(diff_args, collapse_moves=collapse_moves)
 
     # append untracked files for uncommitted mode
     untracked_diff = ""
@@ -404,12 +655,15 @@ def run_review(base_ref: str | None = None, branch: str | None = None) -> None:
         if untracked:
             untracked_diff = generate_untracked_diff(untracked)
 
+    prepared = {"branch": branch, "review_dir": review_dir, "reviewed": reviewed, "ready": False, "messages": messages}
     if not clean_diff and not untracked_diff:
-        print("no changes to review", file=sys.stderr)
-        sys.exit(0)
+        messages.append("no changes since the last review" if note else "no changes to review")
+        return prepared
 
     # add header
-    header = make_header(diff_args, mode, branch_override=branch)
+    header = make_header(range_args, mode, branch_override=branch)
+    if note:
+        header += f" | {note}"
     parts = [f"# {header}"]
     if clean_diff:
         parts.append(clean_diff)
@@ -417,21 +671,96 @@ def run_review(base_ref: str | None = None, branch: str | None = None) -> None:
         parts.append(untracked_diff)
     content = "\n\n".join(parts) + "\n"
 
-    # set up review repo and open editor
-    review_dir = get_review_dir(branch_override=branch)
+    # set up review repo
     setup_review_repo(review_dir, content)
+    prepared["ready"] = True
+    return prepared
 
-    review_file = review_dir / "review.diff"
+
+def finish_review(prepared: dict) -> str:
+    """record a review the user has seen and return their annotations."""
+    if prepared["reviewed"]:
+        save_last_review(prepared["review_dir"], *prepared["reviewed"])
+    return get_annotations(prepared["review_dir"])
+
+
+def run_review(base_ref: str | None = None, branch: str | None = None, interdiff: bool = False,
+               collapse_moves: bool = True) -> None:
+    """main review flow: generate diff, open editor, return annotations."""
+    if not git_ok("rev-parse", "--is-inside-work-tree"):
+        print("error: not inside a git repository", file=sys.stderr)
+        sys.exit(1)
+
+    prepared = prepare_review(base_ref, branch=branch, interdiff=interdiff, collapse_moves=collapse_moves)
+    for message in prepared["messages"]:
+        print(message, file=sys.stderr)
+    if not prepared["ready"]:
+        sys.exit(0)
+
+    review_file = prepared["review_dir"] / "review.diff"
     if open_editor(review_file) != 0:
         print("error: no overlay terminal available (requires agterm, tmux, kitty, or wezterm)", file=sys.stderr)
         sys.exit(1)
 
     # get annotations
-    annotations = get_annotations(review_dir)
+    annotations = finish_review(prepared)
     if annotations:
         print(annotations)
 
 
+def run_queue(branches: list[str], base_ref: str | None = None, together: bool = False,
+              interdiff: bool = False, collapse_moves: bool = True) -> None:
+    """review several branches in one go: prepare every diff and review repo concurrently,
+    then open them one after another, or all together in one editor session.
+
+    git does the work in subprocesses, so a thread pool runs the preparations in
+    parallel and the first editor opens once every branch is ready. annotations
+    come back per branch, each under a "=== branch: <name> ===" line."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not git_ok("rev-parse", "--is-inside-work-tree"):
+        print("error: not inside a git repository", file=sys.stderr)
+        sys.exit(1)
+    branches = list(dict.fromkeys(branches))
+    for name in branches:
+        if not git_ok("rev-parse", "--verify", "-q", f"{name}^{{commit}}"):
+            print(f"error: unknown branch: {name}", file=sys.stderr)
+            sys.exit(1)
+    dirs: dict[Path, str] = {}
+    for name in branches:
+        review_dir = get_review_dir(branch_override=name)
+        if review_dir in dirs:
+            print(f"error: branches {dirs[review_dir]} and {name} share the review dir {review_dir}", file=sys.stderr)
+            sys.exit(1)
+        dirs[review_dir] = name
+    base = base_ref or detect_default_branch()
+
+    with ThreadPoolExecutor(max_workers=min(len(branches), os.cpu_count() or 4, 8)) as pool:
+        results = list(pool.map(
+            lambda name: prepare_review(base, branch=name, interdiff=interdiff, collapse_moves=collapse_moves),
+            branches))
+
+    ready = []
+    for prepared in results:
+        for message in prepared["messages"]:
+            print(f"{prepared['branch']}: {message}", file=sys.stderr)
+        if prepared["ready"]:
+            ready.append(prepared)
+    if not ready:
+        sys.exit(0)
+
+    batches = [ready] if together else [[p] for p in ready]
+    for batch in batches:
+        if open_editor(*(p["review_dir"] / "review.diff" for p in batch)) != 0:
+            print("error: no overlay terminal available (requires agterm, tmux, kitty, or wezterm)", file=sys.stderr)
+            sys.exit(1)
+        for prepared in batch:
+            annotations = finish_review(prepared)
+            if annotations:
+                print(f"=== branch: {prepared['branch']} ===")
+                print(annotations)
+
+
 def main() -> None:
     import argparse
 
@@ -439,8 +768,20 @@ def main() -> None:
     parser.add_argument("--test", action="store_true", help="run embedded tests")
     parser.add_argument("--clean", action="store_true", help="remove review repo from /tmp")
     parser.add_argument("--branch", help="branch to review (when not checked out on it)")
+    parser.add_argument("--full-moves", action="store_true",
+                        help="show moved code in full instead of collapsing it to moved from/to markers")
+    parser.add_argument("--interdiff", action="store_true",
+                        help="show only what changed since the last review of the branch (after a rebase or force-push)")
+    parser.add_argument("--queue", nargs="+", metavar="BRANCH",
+                        help="review several branches: prepare all diffs in parallel, then open them in turn")
+    parser.add_argument("--together", action="store_true",
+                        help="with --queue, open every branch's review in one editor session")
     parser.add_argument("base_ref", nargs="?", help="base ref to diff against (branch, tag, commit)")
     args = parser.parse_args()
+    if args.together and not args.queue:
+        parser.error("--together requires --queue")
+    if args.queue and args.branch:
+        parser.error("--queue and --branch are mutually exclusive")
 
     if args.test:
         run_tests()
@@ -455,7 +796,12 @@ def main() -> None:
             print("no review repo to clean", file=sys.stderr)
         return
 
-    run_review(args.base_ref, branch=args.branch)
+    if args.queue:
+        run_queue(args.queue, args.base_ref, together=args.together, interdiff=args.interdiff,
+                  collapse_moves=not args.full_moves)
+        return
+
+    run_review(args.base_ref, branch=args.branch, interdiff=args.interdiff, collapse_moves=not args.full_moves)
 
 
 def run_tests() -> None:
@@ -468,6 +814,44 @@ def run_tests() -> None:
             self.assertIsInstance(result, str)
             self.assertTrue(len(result) > 0)
 
+        def _repo(self, branch: str) -> Path:
+            repo = Path(tempfile.mkdtemp(prefix="git-review-branch-"))
+            self.addCleanup(shutil.rmtree, repo, True)
+            old_cwd = os.getcwd()
+            os.chdir(repo)
+            self.addCleanup(os.chdir, old_cwd)
+            subprocess.run(["git", "init", "-q", "-b", branch], check=True)
+            subprocess.run(["git", "-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "--allow-empty",
+                            "-m", "init"], check=True)
+            return repo
+
+        def test_cache_follows_refs(self) -> None:
+            repo = self._repo("trunk")
+            cache = repo / ".git" / "default-branch.cache"
+            self.assertEqual(detect_default_branch(), "trunk")
+            self.assertEqual(cache.read_text(), "v1||--,--,h-,--,\ntrunk\n")
+            cache.write_text(cache.read_text().replace("trunk\n", "cached\n"))
+            self.assertEqual(detect_default_branch(), "cached", "a matching key must be served from the cache")
+            subprocess.run(["git", "branch", "master"], check=True)
+            self.assertEqual(detect_default_branch(), "master", "a new candidate branch must invalidate")
+            subprocess.run(["git", "pack-refs", "--all"], check=True)
+            subprocess.run(["git", "symbolic-ref", "refs/remotes/origin/HEAD", "refs/remotes/origin/trunk"], check=True)
+            self.assertEqual(detect_default_branch(), "trunk")
+            self.assertTrue(cache.read_text().startswith("v1|ref: refs/remotes/origin/trunk|"))
+
+        def test_shared_with_detect_branch_sh(self) -> None:
+            script = Path(__file__).resolve().parents[4] / "planning/skills/exec/scripts/detect-branch.sh"
+            if not script.is_file():
+                self.skipTest("planning plugin not alongside")
+            repo = self._repo("develop")
+            subprocess.run(["git", "update-ref", "refs/remotes/origin/main", "HEAD"], check=True)
+            out = subprocess.run(["bash", str(script)], capture_output=True, text=True, check=True).stdout.strip()
+            self.assertEqual(out, "develop")
+            cache = repo / ".git" / "default-branch.cache"
+            self.assertEqual(cache.read_text().split("\n")[0], default_branch_cache_key(repo / ".git"))
+            cache.write_text(cache.read_text().replace("develop\n", "from-shell\n"))
+            self.assertEqual(detect_default_branch(), "from-shell")
+
     class TestGetProjectName(unittest.TestCase):
         def test_returns_string(self) -> None:
             result = get_project_name()
@@ -491,6 +875,55 @@ def run_tests() -> None:
             result = generate_clean_diff(["HEAD", "--", "/dev/null"])
             self.assertEqual(result, "")
 
+    class TestMovedBlocks(unittest.TestCase):
+        def setUp(self) -> None:
+            self.repo = Path(tempfile.mkdtemp(prefix="git-review-moves-"))
+            self.addCleanup(shutil.rmtree, self.repo, True)
+            old_cwd = os.getcwd()
+            os.chdir(self.repo)
+            self.addCleanup(os.chdir, old_cwd)
+            subprocess.run(["git", "init", "-q"], check=True)
+
+        def commit_then_change(self, before: dict[str, str], after: dict[str, str]) -> str:
+            for name, content in before.items():
+                Path(name).write_text(content)
+            subprocess.run(["git", "add", "-A"], check=True)
+            subprocess.run(["git", "-c", "user.email=t@t", "-c", "user.name=t", "-c", "commit.gpgsign=false",
+                            "commit", "-q", "-m", "init"], check=True)
+            for name, content in after.items():
+                Path(name).write_text(content)
+            return generate_clean_diff(["HEAD"])
+
+        def test_moved_block_with_an_edit(self) -> None:
+            body = [f"value_{i} = compute_thing({i})" for i in range(8)]
+            edited = list(body)
+            edited[3] = "value_3 = compute_other(3)"
+            diff = self.commit_then_change(
+                {"a.py": "head\n" + "\n".join(body) + "\ntail\n", "b.py": "top\n"},
+                {"a.py": "head\ntail\n", "b.py": "top\nclass K:\n" + "".join(f"    {line}\n" for line in edited)})
+            self.assertIn("··· moved to b.py:3-5 (3 lines)\n-value_3 = compute_thing(3)\n··· moved to b.py:7-10 (4 lines)", diff)
+            self.assertIn("+class K:\n··· moved from a.py:2-4 (3 lines)\n+    value_3 = compute_other(3)\n"
+                          "··· moved from a.py:6-9 (4 lines)\n", diff)
+            self.assertNotIn("compute_thing(0)", diff)
+            self.assertIn("compute_thing(0)", generate_clean_diff(["HEAD"], collapse_moves=False))
+
+        def test_edit_in_place_and_short_blocks_stay(self) -> None:
+            lines = "alpha_value = 1\nbeta_value = 2\ngamma_value = 3\n"
+            diff = self.commit_then_change(
+                {"a.py": "if True:\n" + lines, "b.py": "one_long_line = 1\ntwo_long_line = 2\nend\n"},
+                {"a.py": "if True:\n" + "".join(f"    {line}\n" for line in lines.splitlines()),
+                 "b.py": "end\n", "c.py": "one_long_line = 1\ntwo_long_line = 2\n"})
+            self.assertNotIn("moved", diff)
+            self.assertIn("+    beta_value = 2", diff)
+
+        def test_large_move_is_fast(self) -> None:
+            body = "".join(f"line_{i} = call({i % 7})\n" for i in range(20000)) + "}\n" * 500
+            start = time.monotonic()
+            diff = self.commit_then_change({"a.py": body, "b.py": ""}, {"a.py": "", "b.py": body})
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertEqual(diff.count("moved from"), 1)
+            self.assertIn("··· moved from a.py:1-20500 (20500 lines)", diff)
+
     class TestHasUncommittedChanges(unittest.TestCase):
         def test_returns_bool(self) -> None:
             result = has_uncommitted_changes()
@@ -507,6 +940,174 @@ def run_tests() -> None:
             self.assertIn("Branch:", result)
             self.assertIn("Staged:", result)
 
+    class TestInterdiff(unittest.TestCase):
+        def setUp(self) -> None:
+            self.repo = Path(tempfile.mkdtemp(prefix="git-review-interdiff-"))
+            self.addCleanup(shutil.rmtree, self.repo, True)
+            old_cwd = os.getcwd()
+            os.chdir(self.repo)
+            self.addCleanup(os.chdir, old_cwd)
+            self.run_git("init", "-q", "-b", "master")
+            self.commit("base.txt", "base\n", "init")
+            self.run_git("checkout", "-q", "-b", "feature")
+            self.commit("feature.txt", "one\ntwo\n", "feature")
+
+        def run_git(self, *args: str) -> None:
+            subprocess.run(["git", "-c", "user.email=t@t", "-c", "user.name=t", "-c", "commit.gpgsign=false", *args],
+                           check=True, capture_output=True)
+
+        def commit(self, name: str, content: str, msg: str) -> None:
+            Path(name).write_text(content)
+            self.run_git("add", name)
+            self.run_git("commit", "-q", "-m", msg)
+
+        def reviewed(self) -> tuple[str, str]:
+            head = git("rev-parse", "HEAD")
+            return git("merge-base", "master", head), head
+
+        def rebase_onto_new_upstream(self, upstream_file: str = "upstream.txt") -> None:
+            self.run_git("checkout", "-q", "master")
+            self.commit(upstream_file, "upstream\n", "upstream")
+            self.run_git("checkout", "-q", "feature")
+            self.run_git("rebase", "-q", "master")
+
+        def test_pure_rebase_is_empty(self) -> None:
+            last = dict(zip(("base", "head"), self.reviewed()))
+            self.rebase_onto_new_upstream()
+            args, note = interdiff_args(last, *self.reviewed())
+            self.assertIn("Interdiff:", note)
+            self.assertEqual(generate_clean_diff(args), "")
+            self.assertIn("upstream.txt", generate_clean_diff([last["head"], "HEAD"]), "the tips alone differ by upstream")
+
+        def test_rebase_with_fix_shows_only_the_fix(self) -> None:
+            last = dict(zip(("base", "head"), self.reviewed()))
+            self.rebase_onto_new_upstream()
+            self.commit("feature.txt", "one\nTWO\n", "address review")
+            diff = generate_clean_diff(interdiff_args(last, *self.reviewed())[0])
+            self.assertEqual(diff, "=== feature.txt (modified) ===\n\n···\n one\n-two\n+TWO\n")
+
+        def test_conflicting_replay_compares_tips(self) -> None:
+            last = dict(zip(("base", "head"), self.reviewed()))
+            self.run_git("checkout", "-q", "master")
+            self.commit("feature.txt", "upstream version\n", "clash")
+            self.commit("other.txt", "unrelated\n", "unrelated upstream")
+            self.run_git("checkout", "-q", "feature")
+            self.run_git("reset", "-q", "--hard", "master")
+            self.commit("feature.txt", "one\ntwo\nthree\n", "redo feature")
+            args, note = interdiff_args(last, *self.reviewed())
+            self.assertIn("replay conflicted", note)
+            diff = generate_clean_diff(args)
+            self.assertIn("+three", diff)
+            self.assertNotIn("other.txt", diff)
+
+        def test_old_git_is_not_reported_as_a_conflict(self) -> None:
+            last = dict(zip(("base", "head"), self.reviewed()))
+            self.rebase_onto_new_upstream()
+            # a git before 2.38: merge-tree has no --write-tree and prints its usage
+            bin_dir = self.repo / "old-git"
+            bin_dir.mkdir()
+            stub = bin_dir / "git"
+            stub.write_text(
+                "#!/bin/sh\n"
+                'case "$1 $2" in\n'
+                '"merge-tree --write-tree") echo "usage: git merge-tree <base-tree> <branch1> <branch2>" >&2; exit 129 ;;\n'
+                '"--version ") echo "git version 2.37.1"; exit 0 ;;\n'
+                "esac\n"
+                f'exec {shutil.which("git")} "$@"\n')
+            stub.chmod(0o755)
+            old_path = os.environ["PATH"]
+            os.environ["PATH"] = f"{bin_dir}{os.pathsep}{old_path}"
+            self.addCleanup(os.environ.__setitem__, "PATH", old_path)
+            args, note = interdiff_args(last, *self.reviewed())
+            self.assertNotIn("conflicted", note)
+            self.assertIn("git 2.37.1 cannot replay, needs 2.38+", note)
+            self.assertIn("git range-diff", note)
+            self.assertIn("upstream changes included", note)
+            self.assertEqual(args[:2], [last["head"], git("rev-parse", "HEAD")])
+
+        def test_last_review_roundtrip(self) -> None:
+            review_dir = self.repo / "review"
+            self.assertIsNone(load_last_review(review_dir))
+            review_dir.mkdir()
+            save_last_review(review_dir, "aaa", "bbb")
+            self.assertEqual(load_last_review(review_dir), {"base": "aaa", "head": "bbb"})
+            setup_review_repo(review_dir, "diff\n")
+            self.assertEqual(get_annotations(review_dir), "", "the record must stay out of the annotations")
+
+    class TestQueue(unittest.TestCase):
+        def setUp(self) -> None:
+            self.repo = Path(tempfile.mkdtemp(prefix="git-review-queue-"))
+            self.addCleanup(shutil.rmtree, self.repo, True)
+            old_cwd = os.getcwd()
+            os.chdir(self.repo)
+            self.addCleanup(os.chdir, old_cwd)
+            self.run_git("init", "-q", "-b", "master")
+            self.commit("base.txt", "base\n", "init")
+            for name in ("feat-b", "feat-a"):
+                self.run_git("checkout", "-q", "-b", name, "master")
+                self.commit(f"{name}.txt", f"{name}\n", name)
+            self.run_git("branch", "empty", "master")
+            self.run_git("checkout", "-q", "master")
+            for name in ("feat-b", "feat-a", "empty"):
+                self.addCleanup(shutil.rmtree, get_review_dir(branch_override=name), True)
+            self.opened: list[list[Path]] = []
+
+        def run_git(self, *args: str) -> None:
+            subprocess.run(["git", "-c", "user.email=t@t", "-c", "user.name=t", "-c", "commit.gpgsign=false", *args],
+                           check=True, capture_output=True)
+
+        def commit(self, name: str, content: str, msg: str) -> None:
+            Path(name).write_text(content)
+            self.run_git("add", name)
+            self.run_git("commit", "-q", "-m", msg)
+
+        def fake_editor(self, *files: Path) -> int:
+            # annotate every opened review by appending a comment line
+            self.opened.append(list(files))
+            for f in files:
+                f.write_text(f.read_text() + f"# note on {f.parent.name}\n")
+            return 0
+
+        def run_queue(self, *branches: str, together: bool = False) -> tuple[str, str]:
+            import contextlib
+            import io
+            from unittest import mock
+
+            out, err = io.StringIO(), io.StringIO()
+            with mock.patch.object(sys.modules[__name__], "open_editor", self.fake_editor), \
+                    contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                run_queue(list(branches), together=together)
+            return out.getvalue(), err.getvalue()
+
+        def test_prepare_is_independent_of_checkout(self) -> None:
+            prepared = prepare_review("master", branch="feat-a")
+            self.assertTrue(prepared["ready"])
+            content = (prepared["review_dir"] / "review.diff").read_text()
+            self.assertIn("feat-a.txt", content)
+            self.assertNotIn("feat-b.txt", content)
+            self.assertEqual(git("rev-parse", "--abbrev-ref", "HEAD"), "master")
+
+        def test_sequential_in_queue_order(self) -> None:
+            out, err = self.run_queue("feat-b", "feat-a", "empty")
+            self.assertEqual([[f.parent for f in files] for files in self.opened],
+                             [[get_review_dir(branch_override="feat-b")], [get_review_dir(branch_override="feat-a")]])
+            self.assertLess(out.index("=== branch: feat-b ==="), out.index("=== branch: feat-a ==="))
+            self.assertNotIn("empty", out)
+            self.assertIn("empty: no changes to review", err)
+            self.assertIn("+# note on", out)
+            self.assertIsNotNone(load_last_review(get_review_dir(branch_override="feat-a")))
+
+        def test_together_opens_one_session(self) -> None:
+            out, _ = self.run_queue("feat-a", "feat-b", together=True)
+            self.assertEqual(len(self.opened), 1)
+            self.assertEqual(len(self.opened[0]), 2)
+            self.assertEqual(out.count("=== branch:"), 2)
+
+        def test_unknown_branch_fails_before_preparing(self) -> None:
+            with self.assertRaises(SystemExit):
+                self.run_queue("feat-a", "no-such-branch")
+            self.assertEqual(self.opened, [])
+
     class TestSetupReviewRepo(unittest.TestCase):
         def test_creates_repo(self) -> None:
             test_dir = Path(tempfile.mkdtemp(prefix="git-review-test-"))
@@ -586,9 +1187,9 @@ def run_tests() -> None:
 
     loader = unittest.TestLoader()
     suite = unittest.TestSuite()
-    for tc in [TestDetectDefaultBranch, TestGetProjectName, TestGetCurrentBranch,
+    for tc in [TestDetectDefaultBranch, TestInterdiff, TestMovedBlocks, TestGetProjectName, TestGetCurrentBranch,
                TestGetReviewDir, TestGenerateCleanDiff, TestHasUncommittedChanges,
-               TestGetFileStatus, TestMakeHeader, TestSetupReviewRepo,
+               TestGetFileStatus, TestMakeHeader, TestQueue, TestSetupReviewRepo,
                TestGetUntrackedFiles, TestGenerateUntrackedDiff, TestBuildEditorCmd]:
         suite.addTests(loader.loadTestsFromTestCase(tc))
     runner = unittest.TextTestRunner(verbosity=2)
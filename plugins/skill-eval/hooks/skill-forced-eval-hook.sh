@@ -2,8 +2,29 @@
 # skill-forced-eval-hook.sh - UserPromptSubmit hook for Claude Code.
 #
 # forces Claude to evaluate and activate relevant skills before implementation.
+#
+# the installed skills (~/.claude/skills, the plugin cache, the project's
+# .claude/skills) are indexed from their SKILL.md frontmatter and trigger phrases by
+# skill-index.awk, and each prompt is ranked against the index by skill-match.awk,
+# so the instruction names the few skills worth checking instead of leaving every
+# skill's description to be weighed on every turn. a prompt matching nothing gets
+# a one-line reminder. without any skills, or when matching fails, the full
+# instruction is printed as before.
+#
+# the index lives in ${TMPDIR:-/tmp}/skill-eval-$USER/ and is rebuilt when a
+# SKILL.md is added, removed or newer than the index. a warm prompt costs one awk
+# process; only the shell builtins check the index.
+#
+# SKILL_EVAL_TOP sets how many skills are named at most (default 3).
 
-cat <<'EOF'
+case "$0" in
+*/*) hooks=${0%/*} ;;
+*) hooks=. ;;
+esac
+project=${CLAUDE_PROJECT_DIR:-$PWD}
+
+full() {
+    cat <<'EOF'
 INSTRUCTION: MANDATORY SKILL ACTIVATION
 
 Check available skills for relevance before proceeding.
@@ -24,3 +45,128 @@ CRITICAL: Activate ALL relevant skills via Skill() tool before implementation.
 Multiple skills can and should be activated when applicable.
 Mentioning a skill without activating it is worthless.
 EOF
+}
+
+# newer <dir> <dir> - whether the first plugin version dir is newer than the second:
+# dotted numeric versions compare field by field (1.10.0 after 1.9.0), anything
+# else, such as a commit sha, by mtime
+newer() {
+    va=${1##*/}
+    vb=${2##*/}
+    case "$va$vb" in
+    *[!0-9.]* | *..* | .* | *.)
+        [ "$1" -nt "$2" ]
+        return
+        ;;
+    esac
+    while [ -n "$va$vb" ]; do
+        a=${va%%.*}
+        b=${vb%%.*}
+        if [ "${a:-0}" -ne "${b:-0}" ]; then
+            [ "${a:-0}" -gt "${b:-0}" ]
+            return
+        fi
+        case "$va" in *.*) va=${va#*.} ;; *) va="" ;; esac
+        case "$vb" in *.*) vb=${vb#*.} ;; *) vb="" ;; esac
+    done
+    return 1
+}
+
+# the plugin cache keeps old versions beside the installed one
+# (<marketplace>/<plugin>/<version>/); only the newest version of each plugin is
+# indexed, so stale descriptions and skills a later version removed stay out
+picked="|"
+for p in "$HOME"/.claude/plugins/cache/*/*/; do
+    best=""
+    for v in "$p"*/; do
+        v=${v%/}
+        [ -d "$v/skills" ] || continue
+        if [ -z "$best" ] || newer "$v" "$best"; then
+            best=$v
+        fi
+    done
+    picked="$picked$best|"
+done
+
+# the index signature lists every indexed file, so an added or removed skill, or a
+# newer plugin version, changes it; an edited one is newer than the index
+cache="${TMPDIR:-/tmp}/skill-eval-${USER:-$(id -u)}"
+index="$cache/index"
+for f in "$project"/.claude/skills/*/SKILL.md; do
+    # project skills get an index of their own, so projects do not evict each other
+    if [ -f "$f" ]; then
+        index="$cache/index-$(printf '%s' "$project" | cksum | cut -d' ' -f1)"
+        break
+    fi
+done
+sig=""
+stale=""
+set --
+for f in "$HOME"/.claude/skills/*/SKILL.md "$HOME"/.claude/plugins/cache/*/*/*/skills/*/SKILL.md \
+    "$project"/.claude/skills/*/SKILL.md; do
+    [ -f "$f" ] || continue
+    case "$f" in
+    "$HOME"/.claude/plugins/cache/*)
+        case "$picked" in
+        *"|${f%/skills/*}|"*) ;;
+        *) continue ;;
+        esac
+        ;;
+    esac
+    set -- "$@" "$f"
+    sig="$sig|$f"
+    if [ "$f" -nt "$index" ]; then
+        stale=1
+    fi
+done
+
+if [ $# -eq 0 ]; then
+    full
+    exit 0
+fi
+
+head=""
+if [ -z "$stale" ] && [ -f "$index" ]; then
+    IFS= read -r head <"$index"
+fi
+if [ "$head" != "skill-eval-index v1 $sig" ]; then
+    if ! { [ -d "$cache" ] || mkdir -m 700 "$cache"; } 2>/dev/null ||
+        ! SKILL_EVAL_SIG="$sig" awk -f "$hooks/skill-index.awk" "$@" >"$index.$$" 2>/dev/null ||
+        ! mv -f "$index.$$" "$index" 2>/dev/null; then
+        rm -f "$index.$$"
+        full
+        exit 0
+    fi
+fi
+
+if ! skills=$(awk -v top="${SKILL_EVAL_TOP:-3}" -f "$hooks/skill-match.awk" "$index" - 2>/dev/null); then
+    full
+    exit 0
+fi
+
+if [ -z "$skills" ]; then
+    echo "INSTRUCTION: if any available skill is relevant to this prompt, activate it with Skill(skill-name) before implementation."
+    exit 0
+fi
+
+echo "INSTRUCTION: MANDATORY SKILL ACTIVATION"
+echo ""
+echo "Skills matching this prompt, best first:"
+for s in $skills; do
+    echo "  - $s"
+done
+cat <<'EOF'
+
+Check these, and any other available skill, for relevance before proceeding.
+
+IF any skills are relevant:
+  1. State which skills and why (can be multiple)
+  2. Immediately activate ALL relevant skills with Skill(skill-name) tool calls
+  3. Then proceed with task
+
+IF no skills are relevant:
+  - Proceed directly
+
+CRITICAL: Activate ALL relevant skills via Skill() tool before implementation.
+Mentioning a skill without activating it is worthless.
+EOF
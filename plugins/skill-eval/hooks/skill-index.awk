@@ -0,0 +1,121 @@
+# skill-index.awk - build the skill-eval index from installed SKILL.md files.
+#
+# usage: SKILL_EVAL_SIG=<signature> awk -f skill-index.awk <SKILL.md>...
+#
+# prints the index skill-match.awk reads:
+#   skill-eval-index v1 <signature>       header; the signature lists the indexed files
+#   S <tab> <skill> <tab> <terms>         terms of the skill, repeated by weight
+#   P <tab> <skill> <tab> <phrase>        trigger phrase, matched verbatim
+#
+# a skill is the frontmatter name (its directory without one), "<plugin>:<name>" for
+# a skill under a plugin's skills/ dir, so the id is what Skill() takes. terms come
+# from the name (weight 3), trigger phrases (2) and the description (1). trigger phrases are the quoted
+# strings of the description and the bullets under a "Trigger" heading.
+# the hook passes one version of each cached plugin, the newest; should two files
+# still give the same id (a user and a project skill of one name), the first wins.
+
+BEGIN {
+    split("a an and are as at be by can for from has have in into is it its of on or that the this to use used uses using via when with without you your", sw, " ")
+    for (i in sw) stop[sw[i]] = 1
+    print "skill-eval-index v1 " ENVIRON["SKILL_EVAL_SIG"]
+}
+
+# lowercase words of s, stopwords dropped and a plural "s" stripped, space-separated
+function terms(s,    n, w, i, out) {
+    s = tolower(s)
+    gsub(/[^a-z0-9]+/, " ", s)
+    n = split(s, w, " ")
+    out = ""
+    for (i = 1; i <= n; i++) {
+        if (length(w[i]) < 2 || (w[i] in stop)) continue
+        if (length(w[i]) > 3 && w[i] ~ /[^s]s$/) w[i] = substr(w[i], 1, length(w[i]) - 1)
+        out = out " " w[i]
+    }
+    return out
+}
+
+# every word of s, lowercase and space-separated, as phrases are matched
+function words(s) {
+    s = tolower(s)
+    gsub(/[^a-z0-9]+/, " ", s)
+    gsub(/^ +| +$/, "", s)
+    return s
+}
+
+function unquote(s) {
+    gsub(/^[ \t]+|[ \t]+$/, "", s)
+    if (s ~ /^".*"$/ || s ~ /^'.*'$/) s = substr(s, 2, length(s) - 2)
+    return s
+}
+
+# add the quoted strings of s as phrases
+function quoted(s,    rest) {
+    rest = s
+    while (match(rest, /"[^"]+"/)) {
+        phrase(substr(rest, RSTART + 1, RLENGTH - 2))
+        rest = substr(rest, RSTART + RLENGTH)
+    }
+}
+
+function phrase(s) {
+    s = words(s)
+    if (s == "" || (s in seen_phrase)) return
+    seen_phrase[s] = 1
+    trig = trig " " s
+    phrases[++nphrases] = s
+}
+
+function flush(    id, plugin, n, parts, i, t) {
+    if (FILENAME_PREV == "") return
+    n = split(FILENAME_PREV, parts, "/")
+    if (name == "") name = parts[n - 1]
+    id = name
+    # <plugin>/skills/<name>/SKILL.md, <plugin> being a version dir in the plugin cache
+    if (n >= 4 && parts[n - 2] == "skills" && FILENAME_PREV ~ /\/plugins\/cache\//) {
+        plugin = parts[n - 4]
+        id = plugin ":" name
+    }
+    if (!(id in done)) {
+        done[id] = 1
+        t = terms(name " " name " " name) terms(trig trig) terms(desc)
+        printf "S\t%s\t%s\n", id, t
+        for (i = 1; i <= nphrases; i++) printf "P\t%s\t%s\n", id, phrases[i]
+    }
+}
+
+FNR == 1 {
+    flush()
+    FILENAME_PREV = FILENAME
+    name = desc = trig = ""
+    nphrases = 0
+    delete seen_phrase
+    in_fm = ($0 == "---")
+    block = in_trig = 0
+    next
+}
+
+in_fm && $0 == "---" { in_fm = 0; block = 0; quoted(desc); next }
+
+in_fm {
+    if (block && /^[ \t]/) { desc = desc " " $0; next }
+    block = 0
+    if (/^name:/) name = unquote(substr($0, 6))
+    else if (/^description:/) {
+        desc = unquote(substr($0, 13))
+        if (desc ~ /^[>|][-+]?$/) { desc = ""; block = 1 }
+    }
+    next
+}
+
+/^#/ { in_trig = (tolower($0) ~ /trigger/); next }
+
+in_trig && /^[ \t]*[-*] / {
+    line = $0
+    sub(/^[ \t]*[-*] /, "", line)
+    if (line ~ /"/) quoted(line)
+    else phrase(line)
+}
+
+END {
+    flush()
+}
@@ -0,0 +1,121 @@
+# skill-match.awk - rank indexed skills against a UserPromptSubmit prompt.
+#
+# usage: awk -v top=3 -f skill-match.awk <index> - < event.json
+#
+# reads the index skill-index.awk builds, then the hook event from stdin, and prints
+# the ids of the best matching skills, best first, at most `top` of them. a skill's
+# score is the BM25 score of the prompt's words against the skill's terms plus
+# PHRASE_BONUS per trigger phrase the prompt contains verbatim. skills under
+# MIN_SCORE, or under RELATIVE times the best score, are left out: one shared
+# description word is not a match, and a clear winner is not padded with
+# runners-up. a prompt matching nothing prints nothing.
+#
+# PHRASE_BONUS and MIN_SCORE are in units of the idf of a term only one skill has,
+# about what one such word scores, so they hold however many skills are installed.
+
+BEGIN {
+    K1 = 1.2
+    B = 0.75
+    PHRASE_BONUS = 1.5
+    MIN_SCORE = 1.25
+    RELATIVE = 0.4
+    MAX_PROMPT = 20000
+    if (top == "") top = 3
+    # same stopwords and plural stripping as skill-index.awk
+    split("a an and are as at be by can for from has have in into is it its of on or that the this to use used uses using via when with without you your", sw, " ")
+    for (i in sw) stop[sw[i]] = 1
+}
+
+function terms(s,    n, w, i, out) {
+    s = tolower(s)
+    gsub(/[^a-z0-9]+/, " ", s)
+    n = split(s, w, " ")
+    out = ""
+    for (i = 1; i <= n; i++) {
+        if (length(w[i]) < 2 || (w[i] in stop)) continue
+        if (length(w[i]) > 3 && w[i] ~ /[^s]s$/) w[i] = substr(w[i], 1, length(w[i]) - 1)
+        out = out " " w[i]
+    }
+    return out
+}
+
+function words(s) {
+    s = tolower(s)
+    gsub(/[^a-z0-9]+/, " ", s)
+    gsub(/^ +| +$/, "", s)
+    return s
+}
+
+# the "prompt" string of the event JSON, escapes dropped; the raw text when there is none
+function prompt_of(s,    rest, out, j, k, bs) {
+    if (!match(s, /"prompt"[ \t\r\n]*:[ \t\r\n]*"/)) return s
+    rest = substr(s, RSTART + RLENGTH)
+    out = ""
+    while ((j = index(rest, "\"")) > 0) {
+        bs = 0
+        for (k = j - 1; k > 0 && substr(rest, k, 1) == "\\"; k--) bs++
+        out = out substr(rest, 1, j - 1)
+        if (bs % 2 == 0) break
+        out = out "\""
+        rest = substr(rest, j + 1)
+    }
+    gsub(/\\u[0-9a-fA-F][0-9a-fA-F][0-9a-fA-F][0-9a-fA-F]|\\[nrt]/, " ", out)
+    return out
+}
+
+FNR == NR {
+    if (FNR == 1) next
+    split($0, f, "\t")
+    if (f[1] == "S") {
+        id = f[2]
+        ids[++nids] = id
+        n = split(f[3], w, " ")
+        dl[id] = n
+        total += n
+        for (i = 1; i <= n; i++) {
+            if (!((id, w[i]) in tf)) df[w[i]]++
+            tf[id, w[i]]++
+        }
+    } else if (f[1] == "P") {
+        phrase_id[++nphrases] = f[2]
+        phrase[nphrases] = f[3]
+    }
+    next
+}
+
+{ event = event $0 "\n" }
+
+END {
+    if (nids == 0) exit
+    text = substr(prompt_of(event), 1, MAX_PROMPT)
+    avgdl = total / nids
+    unit = log(1 + (nids - 0.5) / 1.5)
+    n = split(terms(text), q, " ")
+    for (i = 1; i <= n; i++) {
+        t = q[i]
+        if ((t in queried) || !(t in df)) continue
+        queried[t] = 1
+        idf = log(1 + (nids - df[t] + 0.5) / (df[t] + 0.5))
+        for (j = 1; j <= nids; j++) {
+            id = ids[j]
+            if (!((id, t) in tf)) continue
+            c = tf[id, t]
+            score[id] += idf * c * (K1 + 1) / (c + K1 * (1 - B + B * dl[id] / avgdl))
+        }
+    }
+    padded = " " words(text) " "
+    for (i = 1; i <= nphrases; i++) {
+        if (index(padded, " " phrase[i] " ")) score[phrase_id[i]] += PHRASE_BONUS * unit
+    }
+    for (k = 1; k <= top; k++) {
+        best = ""
+        for (j = 1; j <= nids; j++) {
+            id = ids[j]
+            if (!(id in printed) && score[id] >= MIN_SCORE * unit && (best == "" || score[id] > score[best])) best = id
+        }
+        if (best == "" || (k > 1 && score[best] < RELATIVE * first)) break
+        if (k == 1) first = score[best]
+        printed[best] = 1
+        print best
+    }
+}
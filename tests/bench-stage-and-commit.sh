@@ -0,0 +1,101 @@
+#!/bin/bash
+# benchmark for stage-and-commit.sh on a large task commit. builds two identical
+# git repos holding BENCH_FILES new files (default 10000) spread over nested
+# directories, commits them once with plain `git add -A && git commit` (git's own
+# cost) and once through stage-and-commit.sh with every path listed, then reports
+# the median wall time of each over BENCH_ROUNDS fresh pairs (default 5): a single
+# hashing pass over 10k files swings by 2x or more on a busy machine. fails if the
+# script takes more than BENCH_MAX_RATIO (default 2) times git's own cost, or if
+# the commit is incomplete or leaves the index dirty.
+# not run by CI (tests/test-*.sh only); run it by hand after touching do_git().
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_ROOT="$(dirname "$SCRIPT_DIR")"
+STAGE_AND_COMMIT="$REPO_ROOT/plugins/planning/skills/exec/scripts/stage-and-commit.sh"
+
+BENCH_FILES="${BENCH_FILES:-10000}"
+BENCH_MAX_RATIO="${BENCH_MAX_RATIO:-2}"
+BENCH_ROUNDS="${BENCH_ROUNDS:-5}"
+
+TMP_ROOT="$(mktemp -d)"
+trap 'rm -rf "$TMP_ROOT"' EXIT
+
+# usage: make_repo <dir> — a seeded repo plus BENCH_FILES untracked files with long names
+make_repo() {
+    local dir="$1" i
+    git init -q "$dir"
+    git -C "$dir" config user.email "bench@example.com"
+    git -C "$dir" config user.name "bench"
+    git -C "$dir" config commit.gpgsign false
+    # the first commit of 10k loose objects starts a background `gc --auto`, which
+    # would still be packing while the second repo is timed
+    git -C "$dir" config gc.auto 0
+    echo "seed" >"$dir/seed.txt"
+    git -C "$dir" add seed.txt
+    git -C "$dir" commit -q -m "seed"
+    for ((i = 0; i < BENCH_FILES; i++)); do
+        local sub="$dir/generated/module_$((i % 100))/package_$((i % 7))"
+        [ -d "$sub" ] || mkdir -p "$sub"
+        echo "$i" >"$sub/generated_source_file_with_a_long_descriptive_name_$i.txt"
+    done
+}
+
+# wall seconds of a command, from bash's time keyword
+seconds() {
+    local TIMEFORMAT=%R
+    { time "$@" >/dev/null 2>&1; } 2>&1
+}
+
+# usage: median <seconds...>
+median() {
+    printf '%s\n' "$@" | sort -n | awk '{ t[NR] = $1 } END { print t[int((NR + 1) / 2)] }'
+}
+
+echo "benchmark: stage-and-commit.sh with $BENCH_FILES paths"
+echo "=================================================="
+
+git_times=()
+script_times=()
+for ((round = 1; round <= BENCH_ROUNDS; round++)); do
+    rm -rf "$TMP_ROOT/git" "$TMP_ROOT/script"
+    make_repo "$TMP_ROOT/git"
+    make_repo "$TMP_ROOT/script"
+
+    t="$(cd "$TMP_ROOT/git" && seconds sh -c 'git add -A && git commit -q -m bench')"
+    git_times+=("$t")
+
+    (cd "$TMP_ROOT/script" && git ls-files -o --exclude-standard -z >"$TMP_ROOT/paths")
+    mapfile -d '' paths <"$TMP_ROOT/paths"
+    s="$(cd "$TMP_ROOT/script" && seconds bash "$STAGE_AND_COMMIT" "bench" "${paths[@]}")"
+    script_times+=("$s")
+    echo "round $round: git ${t}s, stage-and-commit.sh ${s}s"
+done
+git_time="$(median "${git_times[@]}")"
+script_time="$(median "${script_times[@]}")"
+argv_bytes="$(tr '\0' '\n' <"$TMP_ROOT/paths" | wc -c | tr -d ' ')"
+
+committed="$(git -C "$TMP_ROOT/script" show --name-only --pretty=format: HEAD | sed '/^$/d' | wc -l | tr -d ' ')"
+dirty="$(git -C "$TMP_ROOT/script" status --porcelain | wc -l | tr -d ' ')"
+
+echo "paths: ${#paths[@]} (${argv_bytes} bytes of names, ARG_MAX $(getconf ARG_MAX))"
+echo "git add -A && git commit: ${git_time}s (median of $BENCH_ROUNDS)"
+echo "stage-and-commit.sh:      ${script_time}s (median of $BENCH_ROUNDS)"
+ratio="$(awk -v a="$script_time" -v b="$git_time" 'BEGIN { printf "%.2f", (b > 0 ? a / b : 0) }')"
+echo "ratio: ${ratio}x (limit ${BENCH_MAX_RATIO}x)"
+
+failed=0
+if [ "$committed" != "${#paths[@]}" ]; then
+    echo "FAIL: commit holds $committed paths, expected ${#paths[@]}"
+    failed=1
+fi
+if [ "$dirty" != "0" ]; then
+    echo "FAIL: $dirty paths left dirty after the commit"
+    failed=1
+fi
+if awk -v r="$ratio" -v m="$BENCH_MAX_RATIO" 'BEGIN { exit !(r > m) }'; then
+    echo "FAIL: stage-and-commit.sh is more than ${BENCH_MAX_RATIO}x git's own cost"
+    failed=1
+fi
+exit "$failed"
@@ -0,0 +1,159 @@
+#!/bin/bash
+# tests for task-worktree.sh — plan tasks run in their own git worktrees and land back
+# on the feature branch in order. a "subagent" is simulated by committing in the
+# worktree with stage-and-commit.sh and ticking the worktree's copy of the plan; the
+# checkbox updates reach the real plan only through plan-status.py --take.
+
+set -uo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_ROOT="$(dirname "$SCRIPT_DIR")"
+SCRIPTS="$REPO_ROOT/plugins/planning/skills/exec/scripts"
+TW="$SCRIPTS/task-worktree.sh"
+
+passed=0
+failed=0
+
+TMP_ROOT="$(mktemp -d)"
+trap 'rm -rf "$TMP_ROOT"' EXIT
+export TMPDIR="$TMP_ROOT"
+export GIT_AUTHOR_NAME="Test"
+export GIT_AUTHOR_EMAIL="test@example.com"
+export GIT_COMMITTER_NAME="Test"
+export GIT_COMMITTER_EMAIL="test@example.com"
+
+assert_eq() {
+    local test_name="$1" expected="$2" actual="$3"
+    if [ "$expected" = "$actual" ]; then
+        echo "  PASS: $test_name"; passed=$((passed + 1))
+    else
+        echo "  FAIL: $test_name"; echo "    expected: $(printf '%q' "$expected")"; echo "    actual: $(printf '%q' "$actual")"; failed=$((failed + 1))
+    fi
+}
+
+assert_contains() {
+    local test_name="$1" needle="$2" haystack="$3"
+    case "$haystack" in
+        *"$needle"*) echo "  PASS: $test_name"; passed=$((passed + 1)) ;;
+        *) echo "  FAIL: $test_name"; echo "    expected to contain: $needle"; echo "    actual: $(printf '%q' "$haystack")"; failed=$((failed + 1)) ;;
+    esac
+}
+
+# usage: new_repo <dir> — feature branch "feat" with a committed plan of three tasks,
+# tasks 2 and 3 independent of each other
+new_repo() {
+    mkdir -p "$1/docs/plans"
+    cd "$1" || exit 1
+    git init -q -b master
+    echo base > base.txt
+    cat > docs/plans/plan.md <<'PLAN'
+# Plan
+
+### Task 1: base
+- [x] base
+
+### Task 2: left
+**Depends on:** Task 1
+- [ ] write left
+
+### Task 3: right
+**Depends on:** Task 1
+- [ ] write right
+
+### Task 4: verify
+- [ ] verify
+PLAN
+    git add -A && git commit -q -m init
+    git checkout -q -b feat
+}
+
+# usage: work <worktree> <file> <content> <task-line> [plan] — commit a file in the
+# worktree and tick the task's checkbox in the worktree's plan copy, the way a task
+# subagent does
+work() {
+    (
+        cd "$1" || exit 1
+        echo "$3" > "$2"
+        bash "$SCRIPTS/stage-and-commit.sh" "feat: $2" "$2" >/dev/null
+        sed -i "s/- \[ \] $4/- [x] $4/" "${5:-docs/plans/plan.md}"
+    )
+}
+
+echo "test 1: independent tasks land in order"
+new_repo "$TMP_ROOT/r1"
+out=$(bash "$TW" add docs/plans/plan.md "Task 2")
+wt2=$(echo "$out" | sed -n 1p)
+assert_eq "plan copy path" "$wt2/docs/plans/plan.md" "$(echo "$out" | sed -n 2p)"
+assert_eq "task branch" "feat-task-2" "$(git -C "$wt2" branch --show-current)"
+wt3=$(bash "$TW" add docs/plans/plan.md "Task 3" | sed -n 1p)
+work "$wt2" left.txt left "write left"
+work "$wt3" right.txt right "write right"
+status=$(bash "$TW" land docs/plans/plan.md "Task 2" 2>/dev/null)
+assert_eq "land task 2 exit code" "0" "$?"
+assert_contains "status after task 2" '"ready":["Task 3"]' "$status"
+bash "$TW" land docs/plans/plan.md "Task 3" >/dev/null 2>&1
+assert_eq "land task 3 exit code" "0" "$?"
+assert_eq "both files on feat" "left right" "$(cat left.txt right.txt | tr '\n' ' ' | sed 's/ $//')"
+assert_eq "linear history" "0" "$(git rev-list --merges --count master..feat)"
+assert_eq "plan ticked by the single writer" "2" "$(grep -c '^- \[x\] write' docs/plans/plan.md)"
+assert_eq "plan committed, tree clean" "" "$(git status --porcelain)"
+assert_eq "worktrees removed" "1" "$(git worktree list | wc -l | tr -d ' ')"
+assert_eq "task branches removed" "" "$(git branch --list 'feat-task-*')"
+
+echo ""
+echo "test 2: open checkboxes land the commits and exit 2"
+new_repo "$TMP_ROOT/r2"
+wt=$(bash "$TW" add docs/plans/plan.md "Task 2" | sed -n 1p)
+work "$wt" left.txt left "nothing to tick"
+bash "$TW" land docs/plans/plan.md "Task 2" >/dev/null 2>&1
+assert_eq "exit code" "2" "$?"
+assert_eq "commit landed" "left" "$(cat left.txt)"
+assert_eq "task still open" "1" "$(grep -c '^- \[ \] write left' docs/plans/plan.md)"
+
+echo ""
+echo "test 3: a conflicting task is not landed"
+new_repo "$TMP_ROOT/r3"
+wt2=$(bash "$TW" add docs/plans/plan.md "Task 2" | sed -n 1p)
+wt3=$(bash "$TW" add docs/plans/plan.md "Task 3" | sed -n 1p)
+work "$wt2" base.txt left "write left"
+work "$wt3" base.txt right "write right"
+bash "$TW" land docs/plans/plan.md "Task 2" >/dev/null 2>&1
+head=$(git rev-parse HEAD)
+err=$(bash "$TW" land docs/plans/plan.md "Task 3" 2>&1 >/dev/null)
+assert_eq "exit code" "3" "$?"
+assert_contains "reason" "conflicts with feat" "$err"
+assert_eq "feat untouched" "$head" "$(git rev-parse HEAD)"
+assert_eq "task 3 still open" "1" "$(grep -c '^- \[ \] write right' docs/plans/plan.md)"
+assert_eq "worktree removed" "false" "$([ -d "$wt3" ] && echo true || echo false)"
+
+echo ""
+echo "test 4: uncommitted work is not landed"
+new_repo "$TMP_ROOT/r4"
+wt=$(bash "$TW" add docs/plans/plan.md "Task 2" | sed -n 1p)
+echo stray > "$wt/stray.txt"
+err=$(bash "$TW" land docs/plans/plan.md "Task 2" 2>&1 >/dev/null)
+assert_eq "exit code" "3" "$?"
+assert_contains "reason" "uncommitted changes" "$err"
+
+echo ""
+echo "test 5: add starts over from a stale worktree, an untracked plan is copied in"
+new_repo "$TMP_ROOT/r5"
+cp docs/plans/plan.md docs/plans/new.md
+wt=$(bash "$TW" add docs/plans/new.md "Task 2" | sed -n 1p)
+echo stale > "$wt/stale.txt"
+wt=$(bash "$TW" add docs/plans/new.md "Task 2" | sed -n 1p)
+assert_eq "stale file gone" "false" "$([ -e "$wt/stale.txt" ] && echo true || echo false)"
+assert_eq "untracked plan copied" "true" "$([ -f "$wt/docs/plans/new.md" ] && echo true || echo false)"
+work "$wt" left.txt left "write left" docs/plans/new.md
+bash "$TW" land docs/plans/new.md "Task 2" >/dev/null 2>&1
+assert_eq "exit code" "0" "$?"
+assert_eq "new plan committed" "docs/plans/new.md" "$(git ls-files docs/plans/new.md)"
+
+# summary
+echo ""
+echo "===================="
+echo "results: $passed passed, $failed failed"
+
+if [ "$failed" -gt 0 ]; then
+    exit 1
+fi
@@ -1,12 +1,14 @@
 #!/bin/bash
 # automated tests for detect-vcs.sh
-# covers git, hg, colocated git+hg (git wins), nested subdir resolution, and non-VCS failure
+# covers git, hg, colocated git+hg (git wins), nested subdir resolution, and non-VCS failure,
+# the per-directory hg answer cache, and routing hg calls through chg via hg-client.sh
 
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 REPO_ROOT="$(dirname "$SCRIPT_DIR")"
 DETECT_SCRIPT="$REPO_ROOT/plugins/planning/skills/exec/scripts/detect-vcs.sh"
+BRANCH_SCRIPT="$REPO_ROOT/plugins/planning/skills/exec/scripts/detect-branch.sh"
 
 passed=0
 failed=0
@@ -34,12 +36,14 @@ GIT_DIR="$(mktemp -d)"
 HG_DIR="$(mktemp -d)"
 COLOCATED_DIR="$(mktemp -d)"
 EMPTY_DIR="$(mktemp -d)"
+CACHE_TMP="$(mktemp -d)"
 assert_temp_dir "$GIT_DIR"
 assert_temp_dir "$HG_DIR"
 assert_temp_dir "$COLOCATED_DIR"
 assert_temp_dir "$EMPTY_DIR"
+assert_temp_dir "$CACHE_TMP"
 
-cleanup() { rm -rf "$GIT_DIR" "$HG_DIR" "$COLOCATED_DIR" "$EMPTY_DIR"; }
+cleanup() { rm -rf "$GIT_DIR" "$HG_DIR" "$COLOCATED_DIR" "$EMPTY_DIR" "$CACHE_TMP"; }
 trap cleanup EXIT
 
 assert_output() {
@@ -161,6 +165,61 @@ rc=$?
 set -e
 assert_exit_nonzero "non-VCS dir exits non-zero" "$rc"
 
+# tests 7-10: hg answer cache and chg routing (skipped if hg not available)
+if [ "$HG_AVAILABLE" -eq 1 ]; then
+    REAL_HG="$(command -v hg)"
+    mkdir -p "$CACHE_TMP/tmp" "$CACHE_TMP/bin" "$CACHE_TMP/repo/sub" "$CACHE_TMP/gone"
+    hg init "$CACHE_TMP/repo" >/dev/null
+    hg init "$CACHE_TMP/gone" >/dev/null
+    # an hg that fails loudly proves a cached answer did not start mercurial
+    printf '#!/bin/sh\necho "hg started" >&2\nexit 99\n' > "$CACHE_TMP/bin/hg"
+    chmod +x "$CACHE_TMP/bin/hg"
+
+    echo ""
+    echo "test 7: hg answer is cached per working directory"
+    output="$(cd "$CACHE_TMP/repo/sub" && TMPDIR="$CACHE_TMP/tmp" bash "$DETECT_SCRIPT")"
+    assert_output "first call detects hg" "hg" "$output"
+    output="$(cd "$CACHE_TMP/repo/sub" && TMPDIR="$CACHE_TMP/tmp" PATH="$CACHE_TMP/bin:$PATH" bash "$DETECT_SCRIPT" 2>&1)"
+    assert_output "second call answers from cache without starting hg" "hg" "$output"
+
+    echo ""
+    echo "test 8: cache entry is dropped when the .hg directory goes away"
+    output="$(cd "$CACHE_TMP/gone" && TMPDIR="$CACHE_TMP/tmp" bash "$DETECT_SCRIPT")"
+    assert_output "repo detected and cached" "hg" "$output"
+    rm -rf "$CACHE_TMP/gone/.hg"
+    set +e
+    (cd "$CACHE_TMP/gone" && TMPDIR="$CACHE_TMP/tmp" bash "$DETECT_SCRIPT" >/dev/null 2>&1)
+    rc=$?
+    set -e
+    assert_exit_nonzero "stale cache entry is not trusted" "$rc"
+
+    echo ""
+    echo "test 9: git still wins over a cached hg answer"
+    git -C "$CACHE_TMP/repo" init -q
+    output="$(cd "$CACHE_TMP/repo/sub" && TMPDIR="$CACHE_TMP/tmp" bash "$DETECT_SCRIPT")"
+    assert_output "colocated git after caching resolves to 'git'" "git" "$output"
+    rm -rf "$CACHE_TMP/repo/.git"
+
+    echo ""
+    echo "test 10: hg calls go through chg when it is installed"
+    # the stub chg logs each command and hands it to the real hg
+    cat > "$CACHE_TMP/bin/chg" <<STUB
+#!/bin/sh
+echo "\$1" >> "$CACHE_TMP/chg.log"
+exec "$REAL_HG" "\$@"
+STUB
+    chmod +x "$CACHE_TMP/bin/chg"
+    rm -f "$CACHE_TMP/bin/hg"
+    output="$(cd "$CACHE_TMP/repo" && TMPDIR="$CACHE_TMP/tmp" PATH="$CACHE_TMP/bin:$PATH" bash "$BRANCH_SCRIPT")"
+    assert_output "detect-branch.sh works through chg" "default" "$output"
+    # detect-vcs.sh's `hg root` (repo root not cached yet) and detect-branch.sh's `hg log`
+    assert_output "hg root and hg log ran through chg" "$(printf 'log\nroot')" "$(sort -u "$CACHE_TMP/chg.log" 2>/dev/null)"
+    rm -f "$CACHE_TMP/chg.log"
+    output="$(cd "$CACHE_TMP/repo" && TMPDIR="$CACHE_TMP/tmp" EXEC_HG=hg PATH="$CACHE_TMP/bin:$PATH" bash "$BRANCH_SCRIPT")"
+    assert_output "EXEC_HG=hg still answers" "default" "$output"
+    assert_output "EXEC_HG=hg bypasses chg" "" "$(cat "$CACHE_TMP/chg.log" 2>/dev/null)"
+fi
+
 # summary
 echo ""
 echo "========================"
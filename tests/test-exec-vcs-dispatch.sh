@@ -170,6 +170,41 @@ make_git_repo "$GIT_MASTER" master
 output="$(cd "$GIT_MASTER" && bash "$DETECT_BRANCH")"
 assert_output "git repo on master outputs 'master'" "master" "$output"
 
+# test 2b: the answer is cached under the git dir and served while the refs are unchanged
+echo ""
+echo "test 2b: git default branch cached until the refs change"
+cache="$GIT_MASTER/.git/default-branch.cache"
+assert_output "cache: key and branch recorded" "v1|ref: refs/remotes/origin/master|--,h-,--,--,
+master" "$(cat "$cache")"
+printf '%s\n%s\n' "$(head -1 "$cache")" "from-cache" >"$cache"
+output="$(cd "$GIT_MASTER" && bash "$DETECT_BRANCH")"
+assert_output "cache: matching key served from the cache" "from-cache" "$output"
+git -C "$GIT_MASTER" symbolic-ref refs/remotes/origin/HEAD refs/remotes/origin/trunk
+output="$(cd "$GIT_MASTER" && bash "$DETECT_BRANCH")"
+assert_output "cache: origin/HEAD change invalidates" "trunk" "$output"
+git -C "$GIT_MASTER" symbolic-ref refs/remotes/origin/HEAD refs/remotes/origin/master
+git -C "$GIT_MASTER" pack-refs --all
+printf '%s\n%s\n' "$(head -1 "$cache")" "stale" >"$cache"
+touch -d '2000-01-01' "$cache"
+output="$(cd "$GIT_MASTER" && bash "$DETECT_BRANCH")"
+assert_output "cache: newer packed-refs invalidates" "master" "$output"
+
+# test 2c: a remote answer is cached too, so the round trip is not repeated
+echo ""
+echo "test 2c: git remote answer cached"
+GIT_REMOTE_SRC="$(mk_tmp)"
+git -C "$GIT_REMOTE_SRC" init -q -b release
+git -C "$GIT_REMOTE_SRC" commit --allow-empty -q -m "initial"
+GIT_NO_CANDIDATES="$(mk_tmp)"
+git -C "$GIT_NO_CANDIDATES" init -q -b feature
+git -C "$GIT_NO_CANDIDATES" commit --allow-empty -q -m "initial"
+git -C "$GIT_NO_CANDIDATES" remote add origin "$GIT_REMOTE_SRC"
+output="$(cd "$GIT_NO_CANDIDATES" && bash "$DETECT_BRANCH")"
+assert_output "remote: asked the remote" "release" "$output"
+rm -rf "$GIT_REMOTE_SRC"
+output="$(cd "$GIT_NO_CANDIDATES" && bash "$DETECT_BRANCH")"
+assert_output "remote: second call served from the cache" "release" "$output"
+
 # test 3: vanilla hg repo with no remote refs -> outputs 'default' fallback
 if [ "$HG_AVAILABLE" -eq 1 ]; then
     echo ""
@@ -658,6 +693,59 @@ status="$(git -C "$GIT_SC_DEL" show --name-status --pretty=format: HEAD | sed '/
 assert_output "git/deleted: removal recorded" "D	gone.txt" "$status"
 assert_output "git/deleted: other.txt still staged" "other.txt" "$(git -C "$GIT_SC_DEL" diff --cached --name-only)"
 
+# test 11j: plain files are staged with update-index, which takes anything it is given.
+# an untracked ignored file must still be refused the way git add refuses it, while an
+# ignored file that is already tracked commits normally
+echo ""
+echo "test 11j: git repo, ignored untracked file -> refused, tracked ignored file committed"
+GIT_SC_IGNORED="$(mk_tmp)"
+make_git_repo "$GIT_SC_IGNORED" main
+(
+    cd "$GIT_SC_IGNORED"
+    echo "*.env" >.gitignore
+    echo "old" >tracked.env
+    git add .gitignore
+    git add -f tracked.env
+    git commit -q -m "seed"
+    echo "SECRET=1" >local.env
+    echo "new" >tracked.env
+)
+before="$(git -C "$GIT_SC_IGNORED" rev-parse HEAD)"
+rc=0
+err="$( (cd "$GIT_SC_IGNORED" && bash "$STAGE_AND_COMMIT" "add env" local.env 2>&1 >/dev/null) )" || rc=$?
+assert_exit_nonzero "git/ignored: untracked ignored file refused" "$rc"
+assert_contains "git/ignored: names the ignored path" "$err" "local.env"
+assert_output "git/ignored: no commit made" "$before" "$(git -C "$GIT_SC_IGNORED" rev-parse HEAD)"
+assert_output "git/ignored: nothing left staged" "" "$(git -C "$GIT_SC_IGNORED" diff --cached --name-only)"
+rc=0
+(cd "$GIT_SC_IGNORED" && bash "$STAGE_AND_COMMIT" "update env" tracked.env >/dev/null 2>&1) || rc=$?
+assert_output "git/ignored: tracked ignored file exit code 0" "0" "$rc"
+files="$(git -C "$GIT_SC_IGNORED" show --name-only --pretty=format: HEAD | sed '/^$/d')"
+assert_output "git/ignored: commit contains tracked.env" "tracked.env" "$files"
+
+# test 11k: a large task commit lists thousands of files, plus directories that git add
+# expands. everything listed lands in one commit and the index ends up agreeing with HEAD
+echo ""
+echo "test 11k: git repo, 2000 listed paths plus a directory -> one commit, clean index"
+GIT_SC_MANY="$(mk_tmp)"
+make_git_repo "$GIT_SC_MANY" main
+(
+    cd "$GIT_SC_MANY"
+    echo "seed" >seed.txt
+    git add seed.txt
+    git commit -q -m "seed"
+    mkdir -p gen vendor/lib
+    for i in $(seq 1 2000); do echo "$i" >"gen/file_$i.txt"; done
+    echo "lib" >vendor/lib/lib.txt
+    echo "seed2" >seed.txt
+)
+rc=0
+(cd "$GIT_SC_MANY" && bash "$STAGE_AND_COMMIT" "generate" seed.txt vendor gen/file_*.txt >/dev/null 2>&1) || rc=$?
+assert_output "git/many: exit code 0" "0" "$rc"
+count="$(git -C "$GIT_SC_MANY" show --name-only --pretty=format: HEAD | sed '/^$/d' | wc -l | tr -d ' ')"
+assert_output "git/many: commit holds every listed path" "2002" "$count"
+assert_output "git/many: worktree clean afterwards" "" "$(git -C "$GIT_SC_MANY" status --porcelain)"
+
 if [ "$HG_AVAILABLE" -eq 1 ]; then
     # test 12: hg repo, modified tracked file -> committed via hg commit -A
     echo ""
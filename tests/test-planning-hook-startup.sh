@@ -0,0 +1,103 @@
+#!/bin/bash
+# startup budget for the ExitPlanMode hook entry points. plan-review-hook.py runs on
+# every ExitPlanMode and plan-annotate.py on every fallback, so their fast exits
+# (review disabled, CLAUDE_PLUGIN_ROOT unset, empty event) must answer before any
+# heavy module loads. each fast path runs under `python3 -X importtime`; modules
+# beyond what a bare interpreter already imports must stay off the heavy list and
+# their combined self time must stay under IMPORT_BUDGET_US.
+
+set -uo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_ROOT="$(dirname "$SCRIPT_DIR")"
+HOOK="$REPO_ROOT/plugins/planning/scripts/plan-review-hook.py"
+ANNOTATE="$REPO_ROOT/plugins/planning/scripts/plan-annotate.py"
+
+# microseconds of import time allowed on a fast path, on top of the bare interpreter
+IMPORT_BUDGET_US="${IMPORT_BUDGET_US:-3000}"
+# modules whose presence on a fast path is a regression, whatever the timing
+HEAVY="json re subprocess tempfile difflib shutil shlex argparse pathlib glob typing hashlib sqlite3 concurrent.futures"
+
+passed=0
+failed=0
+
+TMP_ROOT="$(mktemp -d)"
+trap 'rm -rf "$TMP_ROOT"' EXIT
+
+# join needs both sides sorted under one collation
+export LC_ALL=C
+
+# run from the temp dir so a sitecustomize or .pth in the repo cannot skew the baseline
+cd "$TMP_ROOT" || exit 1
+
+# print "<self-us> <module>" for every module an -X importtime stderr dump lists
+import_table() {
+    awk -F'|' '/^import time:/ && $1 !~ /self/ { sub(/^import time:[[:space:]]*/, "", $1); gsub(/[[:space:]]/, "", $3); print $1 + 0, $3 }' "$1"
+}
+
+python3 -X importtime -c pass 2>"$TMP_ROOT/base.err"
+import_table "$TMP_ROOT/base.err" | awk '{ print $2 }' | sort -u > "$TMP_ROOT/base.mods"
+
+# usage: check_fast_path <name> <stdin> <env...> -- <script>
+check_fast_path() {
+    local name="$1" input="$2"
+    shift 2
+    local envs=()
+    while [ "$1" != "--" ]; do envs+=("$1"); shift; done
+    shift
+    local out err="$TMP_ROOT/run.err"
+    out="$(printf '%s' "$input" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_ROOT "${envs[@]}" \
+        python3 -X importtime "$@" 2>"$err")"
+
+    case "$out" in
+        *'"permissionDecision": "ask"'*) echo "  PASS: $name answers ask"; passed=$((passed + 1)) ;;
+        *) echo "  FAIL: $name answers ask"; echo "    actual: $(printf '%q' "$out")"; failed=$((failed + 1)) ;;
+    esac
+
+    local extra heavy_hit="" total
+    extra="$(import_table "$err" | sort -k2 | join -1 2 -2 1 -v 1 - "$TMP_ROOT/base.mods" 2>/dev/null)"
+    for mod in $HEAVY; do
+        if printf '%s\n' "$extra" | awk -v m="$mod" '$1 == m { found = 1 } END { exit !found }'; then
+            heavy_hit="$heavy_hit $mod"
+        fi
+    done
+    if [ -z "$heavy_hit" ]; then
+        echo "  PASS: $name imports no heavy module"; passed=$((passed + 1))
+    else
+        echo "  FAIL: $name imports no heavy module"; echo "    imported:$heavy_hit"; failed=$((failed + 1))
+    fi
+
+    total="$(printf '%s\n' "$extra" | awk '{ s += $2 } END { print s + 0 }')"
+    if [ "$total" -le "$IMPORT_BUDGET_US" ]; then
+        echo "  PASS: $name import time ${total}us <= ${IMPORT_BUDGET_US}us"; passed=$((passed + 1))
+    else
+        echo "  FAIL: $name import time ${total}us > ${IMPORT_BUDGET_US}us"
+        printf '%s\n' "$extra" | sort -k2 -n -r | head -5 | sed 's/^/    /'
+        failed=$((failed + 1))
+    fi
+}
+
+event='{"tool_input":{"plan":"# Plan\n- task 1\n"}}'
+
+echo "testing hook startup budget"
+echo "==========================="
+
+echo ""
+echo "plan-review-hook.py"
+check_fast_path "hook: review disabled" "$event" PLANNING_DISABLE_REVDIFF=1 -- "$HOOK"
+check_fast_path "hook: CLAUDE_PLUGIN_ROOT unset" "$event" -- "$HOOK"
+check_fast_path "hook: empty event" "" CLAUDE_PLUGIN_ROOT="$TMP_ROOT" -- "$HOOK"
+
+echo ""
+echo "plan-annotate.py"
+check_fast_path "annotate: review disabled" "$event" PLANNING_DISABLE_REVDIFF=1 -- "$ANNOTATE"
+check_fast_path "annotate: empty event" "" -- "$ANNOTATE"
+
+# summary
+echo ""
+echo "==========================="
+echo "results: $passed passed, $failed failed"
+
+if [ "$failed" -gt 0 ]; then
+    exit 1
+fi
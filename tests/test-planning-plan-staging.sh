@@ -0,0 +1,195 @@
+#!/bin/bash
+# tests for plan staging in plan-review-hook.py — the plan is written once to a
+# spool file named by its content hash and the hook's pid, revdiff's launcher and
+# the plan-annotate.py fallback both receive that path instead of a re-fed JSON
+# copy, and each hook removes only its own spool file however the review ends,
+# even while another session reviews the same plan. revdiff's output file is kept
+# next to the staged plan until the round completes, so annotations saved by a round whose
+# hook was killed are recovered on the next run. the launcher, the fallback and
+# revdiff itself are stubbed so no overlay terminal is needed.
+
+set -uo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_ROOT="$(dirname "$SCRIPT_DIR")"
+HOOK="$REPO_ROOT/plugins/planning/scripts/plan-review-hook.py"
+
+passed=0
+failed=0
+
+TMP_ROOT="$(mktemp -d)"
+trap 'rm -rf "$TMP_ROOT"' EXIT
+
+assert_contains() {
+    local test_name="$1" needle="$2" haystack="$3"
+    case "$haystack" in
+        *"$needle"*) echo "  PASS: $test_name"; passed=$((passed + 1)) ;;
+        *) echo "  FAIL: $test_name"; echo "    expected to contain: $needle"; echo "    actual: $(printf '%q' "$haystack")"; failed=$((failed + 1)) ;;
+    esac
+}
+
+assert_rc() {
+    local test_name="$1" expected="$2" actual="$3"
+    if [ "$expected" = "$actual" ]; then
+        echo "  PASS: $test_name"; passed=$((passed + 1))
+    else
+        echo "  FAIL: $test_name"; echo "    expected rc: $expected, actual: $actual"; failed=$((failed + 1))
+    fi
+}
+
+assert_spool_empty() {
+    local test_name="$1" spool_tmp="$2" left
+    left="$(find "$spool_tmp" -path '*plan-review-spool-*' -type f 2>/dev/null)"
+    if [ -z "$left" ]; then
+        echo "  PASS: $test_name"; passed=$((passed + 1))
+    else
+        echo "  FAIL: $test_name"; echo "    spool files left behind: $left"; failed=$((failed + 1))
+    fi
+}
+
+# plugin root with stub helpers; each stub records the argv and the content it was given
+PLUGIN_ROOT="$TMP_ROOT/plugin"
+mkdir -p "$PLUGIN_ROOT/scripts" "$TMP_ROOT/bin"
+cat > "$PLUGIN_ROOT/scripts/launch-plan-review.sh" <<'STUB'
+#!/bin/bash
+printf '%s\n' "$1" > "$STUB_LOG"
+cat "$1" >> "$STUB_LOG"
+printf '## plan:2 ( )\nuse websockets\n'
+STUB
+chmod +x "$PLUGIN_ROOT/scripts/launch-plan-review.sh"
+cat > "$PLUGIN_ROOT/scripts/plan-annotate.py" <<'STUB'
+import json, sys
+args = sys.argv[1:]
+with open(__import__("os").environ["STUB_LOG"], "w") as log:
+    log.write(" ".join(args) + "\n" + open(args[1]).read() + "stdin:" + sys.stdin.read())
+print(json.dumps({"hookSpecificOutput": {"hookEventName": "PreToolUse", "permissionDecision": "ask"}}))
+STUB
+printf '#!/bin/sh\nexit 0\n' > "$TMP_ROOT/bin/revdiff"
+chmod +x "$TMP_ROOT/bin/revdiff"
+
+event='{"tool_input":{"plan":"# Plan\n- task 1\n"}}'
+
+echo "testing plan staging"
+echo "===================="
+
+# test 1: revdiff route passes the staged spool path to the launcher, then removes it
+echo ""
+echo "test 1: revdiff launcher reads the staged plan by path"
+SPOOL_TMP="$TMP_ROOT/tmp1" && mkdir -p "$SPOOL_TMP"
+STUB_LOG="$TMP_ROOT/log1"
+err="$(printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$STUB_LOG" CLAUDE_PLUGIN_ROOT="$PLUGIN_ROOT" PATH="$TMP_ROOT/bin:$PATH" \
+    python3 "$HOOK" 2>&1 >/dev/null)"
+rc=$?
+assert_rc "hook denies with annotations" 2 "$rc"
+assert_contains "annotations reach Claude" "use websockets" "$err"
+log="$(cat "$STUB_LOG" 2>/dev/null)"
+assert_contains "launcher got a spool path" "plan-review-spool-" "$log"
+assert_contains "spool file holds the plan" "- task 1" "$log"
+assert_spool_empty "spool file removed after review" "$SPOOL_TMP"
+
+# test 2: fallback route hands plan-annotate.py the staged path, not JSON on stdin
+echo ""
+echo "test 2: plan-annotate.py fallback reads the staged plan by path"
+SPOOL_TMP="$TMP_ROOT/tmp2" && mkdir -p "$SPOOL_TMP"
+STUB_LOG="$TMP_ROOT/log2"
+NO_REVDIFF_PATH="$(printf '%s' "$PATH" | tr ':' '\n' | while read -r d; do [ -x "$d/revdiff" ] || printf '%s:' "$d"; done)"
+out="$(printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$STUB_LOG" CLAUDE_PLUGIN_ROOT="$PLUGIN_ROOT" PATH="${NO_REVDIFF_PATH%:}" \
+    python3 "$HOOK" 2>/dev/null)"
+rc=$?
+assert_rc "hook exits 0" 0 "$rc"
+assert_contains "fallback response relayed" '"permissionDecision": "ask"' "$out"
+log="$(cat "$STUB_LOG" 2>/dev/null)"
+assert_contains "fallback called with --plan-path" "--plan-path" "$log"
+assert_contains "staged file holds the plan" "- task 1" "$log"
+assert_rc "fallback stdin is empty" "stdin:" "$(tail -1 "$STUB_LOG" 2>/dev/null)"
+assert_spool_empty "spool file removed after fallback" "$SPOOL_TMP"
+
+# test 3: a hook killed while revdiff is open leaves its annotations for the next run
+echo ""
+echo "test 3: annotations from a killed round are recovered"
+SPOOL_TMP="$TMP_ROOT/tmp3" && mkdir -p "$SPOOL_TMP"
+STUB_LOG="$TMP_ROOT/log3"
+CRASH_ROOT="$TMP_ROOT/crash-plugin"
+mkdir -p "$CRASH_ROOT/scripts"
+# revdiff saves its output file, then the hook dies before reading the launcher's stdout
+cat > "$CRASH_ROOT/scripts/launch-plan-review.sh" <<'STUB'
+#!/bin/bash
+printf '%s\n' "${PLAN_REVIEW_OUTPUT:-unset}" > "$STUB_LOG"
+printf '## plan:2 ( )\nsplit task 1\n' > "$PLAN_REVIEW_OUTPUT"
+kill -9 "$PPID"
+STUB
+chmod +x "$CRASH_ROOT/scripts/launch-plan-review.sh"
+# subshell keeps bash's "Killed" job notice out of the test output
+(printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$STUB_LOG" CLAUDE_PLUGIN_ROOT="$CRASH_ROOT" PATH="$TMP_ROOT/bin:$PATH" \
+    python3 "$HOOK" >/dev/null 2>&1) 2>/dev/null
+assert_contains "launcher got a spool output path" "plan-review-spool-" "$(cat "$STUB_LOG" 2>/dev/null)"
+saved="$(find "$SPOOL_TMP" -path '*plan-review-spool-*' -name '*.annotations' -type f)"
+assert_contains "annotations survive the kill" "split task 1" "$(cat "$saved" 2>/dev/null)"
+
+rm -f "$STUB_LOG"
+err="$(printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$STUB_LOG" CLAUDE_PLUGIN_ROOT="$CRASH_ROOT" PATH="$TMP_ROOT/bin:$PATH" \
+    python3 "$HOOK" 2>&1 >/dev/null)"
+rc=$?
+assert_rc "rerun denies with recovered annotations" 2 "$rc"
+assert_contains "recovered annotations reach Claude" "split task 1" "$err"
+assert_contains "feedback marked as recovered" "recovered annotations" "$err"
+assert_rc "overlay not reopened" "no" "$([ -e "$STUB_LOG" ] && echo yes || echo no)"
+assert_spool_empty "spool emptied after recovery" "$SPOOL_TMP"
+
+# test 4: a completed round removes its output file, so the next round opens revdiff again
+echo ""
+echo "test 4: completed round leaves nothing to recover"
+SPOOL_TMP="$TMP_ROOT/tmp4" && mkdir -p "$SPOOL_TMP"
+STUB_LOG="$TMP_ROOT/log4"
+for _ in 1 2; do
+    printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+        STUB_LOG="$STUB_LOG" CLAUDE_PLUGIN_ROOT="$PLUGIN_ROOT" PATH="$TMP_ROOT/bin:$PATH" \
+        python3 "$HOOK" >/dev/null 2>&1
+done
+assert_contains "second round reached the launcher" "- task 1" "$(cat "$STUB_LOG" 2>/dev/null)"
+assert_spool_empty "no annotation file left behind" "$SPOOL_TMP"
+
+# test 5: two sessions reviewing the same plan text each keep their own staged file
+echo ""
+echo "test 5: concurrent sessions on the same plan do not remove each other's file"
+SPOOL_TMP="$TMP_ROOT/tmp5" && mkdir -p "$SPOOL_TMP"
+WAIT_ROOT="$TMP_ROOT/wait-plugin"
+mkdir -p "$WAIT_ROOT/scripts"
+# the launcher holds until $WAIT_FOR exists, then reads the staged plan it was given
+cat > "$WAIT_ROOT/scripts/launch-plan-review.sh" <<'STUB'
+#!/bin/bash
+while [ -n "${WAIT_FOR:-}" ] && [ ! -e "$WAIT_FOR" ]; do sleep 0.05; done
+cat "$1" > "$STUB_LOG" 2>&1 || echo "staged plan missing" > "$STUB_LOG"
+printf '## plan:2 ( )\nuse websockets\n'
+STUB
+chmod +x "$WAIT_ROOT/scripts/launch-plan-review.sh"
+printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$TMP_ROOT/log5a" WAIT_FOR="$TMP_ROOT/go5" CLAUDE_PLUGIN_ROOT="$WAIT_ROOT" \
+    PATH="$TMP_ROOT/bin:$PATH" python3 "$HOOK" >/dev/null 2>&1 &
+first=$!
+for _ in $(seq 100); do
+    [ -n "$(find "$SPOOL_TMP" -name 'plan-*.md' 2>/dev/null)" ] && break
+    sleep 0.05
+done
+printf '%s' "$event" | env -u PLANNING_DISABLE_REVDIFF -u CLAUDE_PLUGIN_DATA TMPDIR="$SPOOL_TMP" \
+    STUB_LOG="$TMP_ROOT/log5b" CLAUDE_PLUGIN_ROOT="$WAIT_ROOT" PATH="$TMP_ROOT/bin:$PATH" \
+    python3 "$HOOK" >/dev/null 2>&1
+assert_contains "second session reviewed the plan" "- task 1" "$(cat "$TMP_ROOT/log5b" 2>/dev/null)"
+touch "$TMP_ROOT/go5"
+wait "$first"
+assert_rc "first session denies with annotations" 2 "$?"
+assert_contains "first session's plan outlived the second session" "- task 1" "$(cat "$TMP_ROOT/log5a" 2>/dev/null)"
+assert_spool_empty "both sessions cleaned up" "$SPOOL_TMP"
+
+# summary
+echo ""
+echo "===================="
+echo "results: $passed passed, $failed failed"
+
+if [ "$failed" -gt 0 ]; then
+    exit 1
+fi
@@ -362,6 +362,43 @@ assert_contains "get-notes/no-tag: chore entry loses its prefix" "$output" "- ti
 assert_contains "get-notes/no-tag: other section" "$output" "**Other**"
 assert_contains "get-notes/no-tag: unprefixed entry kept verbatim" "$output" "- unprefixed subject line"
 
+# test 9b: the exact rendering of awkward subjects. pins what the per-entry echo | tr,
+# echo | sed classification produced before it became one awk pass: the prefix is
+# matched case-insensitively but stripped only in lowercase, a scope may hold spaces,
+# a prefix glued to a word still classifies, and a tab inside a subject survives
+echo ""
+echo "test 9b: awkward subjects -> exact notes"
+GN_EXACT="$(mk_tmp)"
+make_git_repo "$GN_EXACT"
+(
+    cd "$GN_EXACT"
+    for msg in "Feat: capital prefix" "FIX(core) : spaced colon" "feat(a b): scope with space" \
+        "featured item" "docs:no space" "perf!: breaking" "refactor(x)(y): double scope" \
+        "  leading spaces" "$(printf 'tab\tinside')" "chore:   wide gap"; do
+        commit_msg "$msg"
+    done
+)
+output="$(cd "$GN_EXACT" && PATH="$STUB_EMPTY_PATH" bash "$GET_NOTES" github | sed -E 's/ [0-9a-f]{7}$/ HASH/')"
+expected="**New Features**
+- featured item HASH
+- scope with space HASH
+- Feat: capital prefix HASH
+
+**Improvements**
+- wide gap HASH
+- refactor(x)(y): double scope HASH
+- perf!: breaking HASH
+- no space HASH
+
+**Bug Fixes**
+- FIX(core) : spaced colon HASH
+
+**Other**
+- $(printf 'tab\tinside') HASH
+-   leading spaces HASH
+- initial HASH"
+assert_output "get-notes/exact: byte-identical notes" "$expected" "$output"
+
 # test 10: tagged repo -> only commits after the last tag
 echo ""
 echo "test 10: tagged repo -> only commits after the last tag"
@@ -563,6 +600,101 @@ STUB
     output="$(cd "$GN_ANNOTATED" && PATH="$STUB_TAGDATE_DIR:$PATH" bash "$GET_NOTES" github)"
     assert_contains "get-notes/tag-date: post-release PR included" "$output" "- merged after the release was cut #71 @someone"
     assert_not_contains "get-notes/tag-date: pre-release PR excluded" "$output" "#70 @other"
+
+    # test 12f: merged PRs are cached under the git dir. the first run asks github only
+    # for PRs merged since the tag; the next asks only for those merged since the newest
+    # cached one, and its notes still list the cached PR. the stub serves whatever
+    # PR_FILE holds and logs the search qualifier it was given
+    echo ""
+    echo "test 12f: github PR cache -> incremental fetch from the newest cached merge"
+    GN_CACHE="$(mk_tmp)"
+    make_git_repo "$GN_CACHE"
+    (
+        cd "$GN_CACHE"
+        GIT_COMMITTER_DATE="2026-08-20T00:00:00Z" git tag -a v1.0.0 -m "release v1.0.0"
+    )
+    STUB_CACHE_DIR="$(mk_tmp)"
+    GH_SEARCHES="$STUB_CACHE_DIR/searches"
+    cat >"$STUB_CACHE_DIR/gh" <<STUB
+#!/bin/sh
+search=none
+while [ "\$#" -gt 0 ]; do
+    case "\$1" in
+        --search)
+            search="\$2"
+            shift 2
+            ;;
+        *) shift ;;
+    esac
+done
+printf '%s\n' "\$search" >>"$GH_SEARCHES"
+cat "\$PR_FILE"
+STUB
+    chmod +x "$STUB_CACHE_DIR/gh"
+    printf '[{"number":80,"title":"feat: first batch","mergedAt":"2026-08-21T10:00:00Z","author":{"login":"a"}}]\n' \
+        >"$STUB_CACHE_DIR/first.json"
+    printf '[{"number":81,"title":"fix: second batch","mergedAt":"2026-08-22T10:00:00Z","author":{"login":"b"}}]\n' \
+        >"$STUB_CACHE_DIR/second.json"
+    (cd "$GN_CACHE" && PR_FILE="$STUB_CACHE_DIR/first.json" PATH="$STUB_CACHE_DIR:$PATH" bash "$GET_NOTES" github >/dev/null)
+    output="$(cd "$GN_CACHE" && PR_FILE="$STUB_CACHE_DIR/second.json" PATH="$STUB_CACHE_DIR:$PATH" bash "$GET_NOTES" github)"
+    assert_output "get-notes/cache: fetches since the tag, then since the newest cached merge" \
+        $'merged:>=2026-08-20T00:00:00Z\nmerged:>=2026-08-21T10:00:00Z' "$(cat "$GH_SEARCHES")"
+    assert_contains "get-notes/cache: cached PR still listed" "$output" "- first batch #80 @a"
+    assert_contains "get-notes/cache: newly merged PR listed" "$output" "- second batch #81 @b"
+    cached="$(jq -r '.prs | map(.number) | join(",")' "$GN_CACHE/.git/release-tools/merged-github.json" 2>/dev/null)"
+    assert_output "get-notes/cache: cache holds both, newest first" "81,80" "$cached"
+
+    # test 12g: RELEASE_NOTES_NO_CACHE=1 neither reads nor writes the cache
+    echo ""
+    echo "test 12g: RELEASE_NOTES_NO_CACHE=1 -> full fetch from the tag, cache untouched"
+    : >"$GH_SEARCHES"
+    before="$(cat "$GN_CACHE/.git/release-tools/merged-github.json")"
+    output="$(cd "$GN_CACHE" && RELEASE_NOTES_NO_CACHE=1 PR_FILE="$STUB_CACHE_DIR/second.json" \
+        PATH="$STUB_CACHE_DIR:$PATH" bash "$GET_NOTES" github)"
+    assert_output "get-notes/no-cache: fetches from the tag" "merged:>=2026-08-20T00:00:00Z" "$(cat "$GH_SEARCHES")"
+    assert_not_contains "get-notes/no-cache: cached PR not read" "$output" "#80 @a"
+    assert_output "get-notes/no-cache: cache file unchanged" "$before" "$(cat "$GN_CACHE/.git/release-tools/merged-github.json")"
+
+    # test 12h: gitlab pages newest merge first and stops at the first page that
+    # reaches back to the tag, instead of walking the whole merged history
+    echo ""
+    echo "test 12h: gitlab stops paging once a page passes the tag date"
+    STUB_GLAB_STOP_DIR="$(mk_tmp)"
+    GLAB_STOP_PAGES="$STUB_GLAB_STOP_DIR/pages"
+    cat >"$STUB_GLAB_STOP_DIR/glab" <<STUB
+#!/bin/sh
+page=1
+while [ "\$#" -gt 0 ]; do
+    case "\$1" in
+        --page)
+            page="\$2"
+            shift 2
+            ;;
+        *) shift ;;
+    esac
+done
+printf '%s\n' "\$page" >>"$GLAB_STOP_PAGES"
+# history ends after page 2, so a regression that pages on shows up as "1 2 3"
+if [ "\$page" -gt 2 ]; then
+    echo '[]'
+    exit 0
+fi
+printf '['
+i=1
+while [ "\$i" -le 100 ]; do
+    [ "\$i" -gt 1 ] && printf ','
+    # page 1 runs from 2026-08-22 back to 2026-08-18, past the 2026-08-20 tag
+    day=\$((22 - (i - 1) / 25))
+    printf '{"title":"feat: mr %s-%s","iid":%s,"merged_at":"2026-08-%02dT12:00:00Z","author":{"username":"u"}}' "\$page" "\$i" "\$(((page - 1) * 100 + i))" "\$day"
+    i=\$((i + 1))
+done
+printf ']\n'
+STUB
+    chmod +x "$STUB_GLAB_STOP_DIR/glab"
+    output="$(cd "$GN_CACHE" && PATH="$STUB_GLAB_STOP_DIR:$PATH" bash "$GET_NOTES" gitlab)"
+    assert_output "get-notes/gitlab-stop: only the first page requested" "1" "$(cat "$GLAB_STOP_PAGES")"
+    assert_contains "get-notes/gitlab-stop: post-tag MR listed" "$output" "- mr 1-1 !1 @u"
+    assert_not_contains "get-notes/gitlab-stop: pre-tag MR dropped" "$output" "- mr 1-100 !100"
 fi
 
 # test 12e: the release workflow creates and pushes an annotated tag before asking
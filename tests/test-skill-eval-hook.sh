@@ -0,0 +1,160 @@
+#!/bin/bash
+# tests for skill-forced-eval-hook.sh — the installed SKILL.md files are indexed once
+# and each prompt names only the matching skills. skills live under a temp HOME (user
+# skills and the plugin cache) and a temp project; the index under a temp TMPDIR.
+
+set -uo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_ROOT="$(dirname "$SCRIPT_DIR")"
+HOOK="$REPO_ROOT/plugins/skill-eval/hooks/skill-forced-eval-hook.sh"
+
+# average milliseconds a warm prompt may take, interpreter start included
+HOOK_BUDGET_MS="${HOOK_BUDGET_MS:-50}"
+
+passed=0
+failed=0
+
+TMP_ROOT="$(mktemp -d)"
+trap 'rm -rf "$TMP_ROOT"' EXIT
+
+assert_contains() {
+    local test_name="$1" needle="$2" haystack="$3"
+    case "$haystack" in
+        *"$needle"*) echo "  PASS: $test_name"; passed=$((passed + 1)) ;;
+        *) echo "  FAIL: $test_name"; echo "    expected to contain: $needle"; echo "    actual: $(printf '%q' "$haystack")"; failed=$((failed + 1)) ;;
+    esac
+}
+
+assert_not_contains() {
+    local test_name="$1" needle="$2" haystack="$3"
+    case "$haystack" in
+        *"$needle"*) echo "  FAIL: $test_name"; echo "    expected not to contain: $needle"; failed=$((failed + 1)) ;;
+        *) echo "  PASS: $test_name"; passed=$((passed + 1)) ;;
+    esac
+}
+
+# usage: skill <SKILL.md path> <name> <description> [body]
+skill() {
+    mkdir -p "$(dirname "$1")"
+    printf -- '---\nname: %s\ndescription: %s\n---\n\n%s\n' "$2" "$3" "${4:-}" > "$1"
+}
+
+# usage: run <prompt> [env...] — the hook's output for a UserPromptSubmit event
+run() {
+    local prompt="$1"
+    shift
+    printf '{"session_id":"s1","prompt":"%s","cwd":"%s"}' "$prompt" "$PROJECT" |
+        env HOME="$HOME_DIR" TMPDIR="$TMP_DIR" CLAUDE_PROJECT_DIR="$PROJECT" "$@" sh "$HOOK"
+}
+
+HOME_DIR="$TMP_ROOT/home"
+TMP_DIR="$TMP_ROOT/tmp"
+PROJECT="$TMP_ROOT/project"
+mkdir -p "$HOME_DIR" "$TMP_DIR" "$PROJECT"
+CACHE="$HOME_DIR/.claude/plugins/cache/market"
+
+echo "test 1: no skills installed prints the full instruction"
+out=$(run "review my changes")
+assert_contains "full block" "Example of multiple skills" "$out"
+
+echo ""
+echo "test 2: matching skills are named, plugin skills with their plugin"
+skill "$CACHE/review/2.0.0/skills/git-review/SKILL.md" git-review \
+    'Interactive git diff annotation review. Activates on "git review", "review changes".'
+skill "$CACHE/review/2.0.0/skills/pr/SKILL.md" pr 'Review a GitHub pull request by number or URL.'
+skill "$CACHE/brainstorm/1.0.0/skills/brainstorm/SKILL.md" brainstorm \
+    'Collaborative design dialogue that turns ideas into designs.' \
+    $'## Activation Triggers\n\n- "let\'s brainstorm"\n- explore options for'
+skill "$HOME_DIR/.claude/skills/mongo/SKILL.md" mongo 'Query MongoDB collections and inspect documents.'
+skill "$HOME_DIR/.claude/skills/datetime/SKILL.md" datetime \
+    'Resolve relative dates into exact timestamps. Activates on "yesterday", "last week".'
+out=$(run "please review changes before I push")
+assert_contains "trigger phrase match" "  - review:git-review" "$out"
+assert_not_contains "unrelated skill left out" "mongo" "$out"
+assert_not_contains "no full block" "Example of multiple skills" "$out"
+out=$(run "check mongo documents for yesterday")
+assert_contains "user skill" "  - mongo" "$out"
+assert_contains "second user skill" "  - datetime" "$out"
+out=$(run "explore options for the cache")
+assert_contains "trigger from the body" "  - brainstorm:brainstorm" "$out"
+
+echo ""
+echo "test 3: a prompt matching nothing gets the one-line reminder"
+out=$(run "hello there")
+assert_contains "reminder" "INSTRUCTION: if any available skill is relevant" "$out"
+assert_not_contains "no list" "  - " "$out"
+
+echo ""
+echo "test 4: the index follows added, edited and removed skills"
+index="$TMP_DIR/skill-eval-${USER:-$(id -u)}/index"
+sig_before=$(head -1 "$index")
+run "deploy the stack" >/dev/null
+assert_contains "index reused" "$sig_before" "$(head -1 "$index")"
+skill "$HOME_DIR/.claude/skills/deploy/SKILL.md" deploy $'>\n  Deploy the stack with terraform\n  and ansible.'
+out=$(run "deploy with terraform")
+assert_contains "added skill with a block description" "  - deploy" "$out"
+sleep 1
+skill "$HOME_DIR/.claude/skills/mongo/SKILL.md" mongo 'Query PostgreSQL tables.'
+out=$(run "query postgresql tables")
+assert_contains "edited skill" "  - mongo" "$out"
+rm -rf "$HOME_DIR/.claude/skills/deploy"
+out=$(run "deploy with terraform")
+assert_not_contains "removed skill" "deploy" "$out"
+
+echo ""
+echo "test 5: project skills get their own index"
+skill "$PROJECT/.claude/skills/migrate/SKILL.md" migrate 'Write database schema migrations.'
+out=$(run "write a schema migration")
+assert_contains "project skill" "  - migrate" "$out"
+assert_contains "per-project index" "index-" "$(ls "$TMP_DIR/skill-eval-${USER:-$(id -u)}")"
+
+echo ""
+echo "test 6: only the newest cached version of a plugin is indexed"
+# 1.2.0 sorts before 2.0.0, and 1.10.0 after 1.9.0 only when compared as numbers
+skill "$CACHE/review/1.2.0/skills/git-review/SKILL.md" git-review 'Annotate kubernetes manifests.'
+skill "$CACHE/review/1.2.0/skills/legacy/SKILL.md" legacy 'Legacy svn changelist review.'
+skill "$CACHE/brainstorm/1.9.0/skills/brainstorm/SKILL.md" brainstorm 'Old whiteboard sketching.'
+skill "$CACHE/brainstorm/1.10.0/skills/brainstorm/SKILL.md" brainstorm \
+    'Collaborative design dialogue. Activates on "explore options for".'
+out=$(run "review changes before I push")
+assert_contains "current version matched" "  - review:git-review" "$out"
+out=$(run "annotate kubernetes manifests")
+assert_not_contains "old description left out" "git-review" "$out"
+out=$(run "svn changelist review")
+assert_not_contains "skill removed in the current version left out" "legacy" "$out"
+out=$(run "whiteboard sketching")
+assert_not_contains "1.9.0 is older than 1.10.0" "brainstorm" "$out"
+out=$(run "explore options for the cache")
+assert_contains "newest version matched" "  - brainstorm:brainstorm" "$out"
+rm -rf "$CACHE/brainstorm/1.10.0"
+out=$(run "whiteboard sketching")
+assert_contains "older version used once the newer one is gone" "  - brainstorm:brainstorm" "$out"
+
+echo ""
+echo "test 7: an unwritable index falls back to the full instruction"
+out=$(run "review changes" TMPDIR="$TMP_ROOT/missing")
+assert_contains "full block" "Example of multiple skills" "$out"
+
+echo ""
+echo "test 8: warm prompts stay within ${HOOK_BUDGET_MS}ms"
+run "review changes" >/dev/null
+start=$(date +%s%N)
+for _ in $(seq 20); do
+    run "please review changes before I push" >/dev/null
+done
+avg_ms=$(( ($(date +%s%N) - start) / 20 / 1000000 ))
+if [ "$avg_ms" -le "$HOOK_BUDGET_MS" ]; then
+    echo "  PASS: ${avg_ms}ms per prompt"; passed=$((passed + 1))
+else
+    echo "  FAIL: ${avg_ms}ms per prompt, budget ${HOOK_BUDGET_MS}ms"; failed=$((failed + 1))
+fi
+
+# summary
+echo ""
+echo "===================="
+echo "results: $passed passed, $failed failed"
+
+if [ "$failed" -gt 0 ]; then
+    exit 1
+fi